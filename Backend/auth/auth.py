@@ -6,6 +6,14 @@ from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from dotenv import load_dotenv
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+import asyncio
+import hashlib
+import threading
+import time
 import os
 
 
@@ -27,6 +35,9 @@ router = APIRouter(
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")  # Default to HS256 if not set
 TOKEN_EXPIRE_DAYS = int(os.getenv("TOKEN_EXPIRE_DAYS", 30))  # Default to 30 if not set
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 4096))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
 
 # Validate that SECRET_KEY was loaded
 if not SECRET_KEY: 
@@ -43,6 +54,61 @@ def hash_password(password: str):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+
+class PasswordPool:
+    """
+    Runs bcrypt on a few dedicated threads (bcrypt releases the GIL while hashing),
+    so a login never blocks the event loop or takes threadpool slots from other routes.
+    Once max_pending hashes are running or queued, new ones are refused with a 503
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.max_pending = max_pending
+        self.pending = 0
+
+    def _reserve(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many sign-ins in progress, please retry in a moment",
+                    headers={"Retry-After": "1"}
+                )
+            self.pending += 1
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, func, *args):
+        self._reserve()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args))
+        finally:
+            self._release()
+
+    def run_sync(self, func, *args):
+        """Same limits for sync routes, which already run on the threadpool"""
+        self._reserve()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._release()
+
+
+password_pool = PasswordPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password_async(password: str):
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict):
     """Create a long-lived access token"""
     to_encode = data.copy()
@@ -50,9 +116,68 @@ def create_access_token(data: dict):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+
+class TokenCache:
+    """
+    Claims of verified tokens keyed by the sha256 of the token, kept until the
+    token's exp so the signature of a session is checked once, not on every request.
+    Revoked tokens (logout) are refused until they expire. Both are per process.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._revoked = {}
+        # Sync dependencies resolve users on the threadpool
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def decode(self, token: str) -> dict:
+        """Verified claims of the token, raises JWTError if it is invalid, expired or revoked"""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.time()
+        with self._lock:
+            if key in self._revoked:
+                raise JWTError("Token has been revoked")
+            claims = self._entries.get(key)
+            if claims is not None:
+                if claims["exp"] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                del self._entries[key]
+
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if "exp" in claims:
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = claims
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return claims
+
+    def revoke(self, token: str):
+        """Refuse the token from now on and drop its cached claims"""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries.pop(key, None)
+            # Expired tokens are refused by jwt.decode anyway
+            self._revoked = {k: e for k, e in self._revoked.items() if e > now}
+            self._revoked[key] = exp or now + TOKEN_EXPIRE_DAYS * 86400
+
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_ENTRIES)
+
+
 def verify_token(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_cache.decode(token)
         return payload
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -61,24 +186,39 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 def get_user(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_cache.decode(token)
         return payload  # Includes: sub, user_id, role
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-def get_current_user(request: Request):
-    token = request.cookies.get("token")
+def authenticate(token: Optional[str]) -> dict:
+    """User of the token cookie as {"user": ..., "error": ...}, exactly one of them set"""
     if not token:
-        raise HTTPException(status_code=401, detail="Token missing in cookie")
+        return {"user": None, "error": "Token missing in cookie"}
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return {
+        payload = token_cache.decode(token)
+    except JWTError:
+        return {"user": None, "error": "Invalid token"}
+    return {
+        "user": {
             "email": payload.get("sub"),
             "full_name": payload.get("full_name"),
-            "user_id": payload.get("user_id")
-        }
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+            "user_id": payload.get("user_id"),
+            "role": payload.get("role")
+        },
+        "error": None
+    }
+
+def get_current_user(request: Request):
+    # Resolved once per request by AuthMiddleware, routes outside it decode here
+    auth = getattr(request.state, "auth", None)
+    if auth is None:
+        auth = authenticate(request.cookies.get("token"))
+        request.state.auth = auth
+    if auth["error"]:
+        raise HTTPException(status_code=401, detail=auth["error"])
+    # Copy, the resolved user is shared by every dependency of the request
+    return dict(auth["user"])
 
 def logout():
     response = RedirectResponse(url="/login_page")
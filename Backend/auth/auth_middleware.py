@@ -0,0 +1,24 @@
+# auth_middleware.py
+from starlette.requests import cookie_parser
+from auth.auth import authenticate
+
+
+class AuthMiddleware:
+    """
+    Resolves the user of the token cookie before the request reaches the routes and
+    stores it on request.state.auth, where get_current_user reads it.
+    Plain ASGI middleware so SSE and streaming responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith("/static"):
+            token = None
+            for name, value in scope["headers"]:
+                if name == b"cookie":
+                    token = cookie_parser(value.decode("latin-1")).get("token")
+                    break
+            scope.setdefault("state", {})["auth"] = authenticate(token)
+        await self.app(scope, receive, send)
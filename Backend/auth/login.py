@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Request, Form, HTTPException
+from fastapi import APIRouter, Request, Form, Depends, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
-from auth.auth import TOKEN_EXPIRE_DAYS, create_access_token, verify_password
-from config.config import get_db_connection, get_db_cursor, release_db_connection
+from auth.auth import TOKEN_EXPIRE_DAYS, create_access_token, verify_password_async
+from config.async_db import get_async_db
 
 
 router = APIRouter(
@@ -19,36 +19,30 @@ def login_page(request: Request):
     return response
 
 @router.post("/login")
-async def login(email: str = Form(...), password: str = Form(...)):
-    conn = get_db_connection()
-    cursor = get_db_cursor(conn)
-    try:
-        cursor.execute("SELECT id, email, password_hash, role, full_name FROM users WHERE email = %s", (email,))
-        user = cursor.fetchone()
+async def login(email: str = Form(...), password: str = Form(...), db = Depends(get_async_db)):
+    user = await db.fetchone("SELECT id, email, password_hash, role, full_name FROM users WHERE email = %s", (email,))
 
-        if not user or not verify_password(password, user[2]):
-            response = RedirectResponse(url="/login_page", status_code=303)
-            response.set_cookie("login_error", "Wrong email or password", max_age=5)
-            return response
+    if not user or not await verify_password_async(password, user[2]):
+        response = RedirectResponse(url="/login_page", status_code=303)
+        response.set_cookie("login_error", "Wrong email or password", max_age=5)
+        return response
 
-        user_id, email, password_hash, role, full_name = user
-        access_token = create_access_token({
-            "sub": email,
-            "role": role,
-            "full_name": full_name,
-            "user_id": user_id
-        })
+    user_id, email, password_hash, role, full_name = user
+    access_token = create_access_token({
+        "sub": email,
+        "role": role,
+        "full_name": full_name,
+        "user_id": user_id
+    })
 
-        response = RedirectResponse(url="/home", status_code=303)
-        response.set_cookie(
-            "token", 
-            access_token, 
-            httponly=True, 
-            #secure=True,  # Enable in production with HTTPS
-            secure=False,
-            max_age=TOKEN_EXPIRE_DAYS * 24 * 60 * 60,  # Expires in 30 days
-            samesite='lax'
-        )
-        return response
-    finally:
-        release_db_connection(conn)
\ No newline at end of file
+    response = RedirectResponse(url="/home", status_code=303)
+    response.set_cookie(
+        "token", 
+        access_token, 
+        httponly=True, 
+        #secure=True,  # Enable in production with HTTPS
+        secure=False,
+        max_age=TOKEN_EXPIRE_DAYS * 24 * 60 * 60,  # Expires in 30 days
+        samesite='lax'
+    )
+    return response
\ No newline at end of file
@@ -1,7 +1,7 @@
 # logout.py
 from fastapi import APIRouter, Request
 from fastapi.responses import RedirectResponse
-from auth.auth import get_current_user
+from auth.auth import get_current_user, token_cache
 
 router = APIRouter(
     tags=["logout_route"],
@@ -21,6 +21,7 @@ def logout(request: Request):
         # Get current user (just to verify they were logged in)
         # This will automatically handle token verification
         _ = get_current_user(request)
+        token_cache.revoke(request.cookies.get("token"))
         
         response = RedirectResponse(url="/login_page", status_code=303)
         
@@ -4,7 +4,7 @@ from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from auth.auth import hash_password, create_access_token
+from auth.auth import hash_password, create_access_token, password_pool
 from config.config import get_db_cursor, get_db_connection, release_db_connection
 
 router = APIRouter(
@@ -201,6 +201,9 @@ def process_plan(
     if not all([email, password, full_name, company_name]):
         raise HTTPException(status_code=400, detail="Missing signup data")
     
+    # Hashed before taking a database connection, bcrypt is the slow part of signup
+    hashed_pwd = password_pool.run_sync(hash_password, password)
+    
     conn = get_db_connection()
     cursor = get_db_cursor(conn)
     try:
@@ -210,7 +213,6 @@ def process_plan(
             raise HTTPException(status_code=400, detail="Email already registered")
 
         # Create user
-        hashed_pwd = hash_password(password)
         cursor.execute(
             "INSERT INTO users (email, password_hash, role, full_name, plan, is_subscription_active) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id", 
             (email, hashed_pwd, 'user', full_name, plan, plan != 'free')
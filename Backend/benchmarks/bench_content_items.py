@@ -0,0 +1,52 @@
+"""
+Content item extraction benchmark: parse_content_items (one pass over the platform
+section) against the nested find/find_all scan it replaced, on synthetic strategy
+documents with 10 platforms.
+
+    python benchmarks/bench_content_items.py
+
+Prints the document size, the html.parser parse time and the best of 5 runs of each
+extractor. Both must return the same items.
+"""
+
+# Imports
+import os
+import sys
+import time
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.strategies.prompts.digital_marketing import parse_content_items
+from tests.test_content_items import nested_scan_parse_content_items, strategy_document
+
+#---------------------------------------------------------------------------------------
+
+# (content types per platform, items per content type)
+SHAPES = [(4, 5), (10, 20)]
+
+
+def best_ms(func, *args, runs=5):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print(f"{'items':>6s} {'KB':>6s} {'parse ms':>9s} {'nested ms':>10s} {'one pass ms':>12s}")
+    for types_per_platform, items_per_type in SHAPES:
+        html = strategy_document(10, types_per_platform, items_per_type)
+        soup = BeautifulSoup(html, "html.parser")
+        items = parse_content_items(soup)
+        assert items == nested_scan_parse_content_items(soup), "extractors disagree"
+
+        print(f"{len(items):6d} {len(html) // 1024:6d} "
+              f"{best_ms(BeautifulSoup, html, 'html.parser', runs=3):9.1f} "
+              f"{best_ms(nested_scan_parse_content_items, soup, runs=3):10.1f} "
+              f"{best_ms(parse_content_items, soup):12.1f}")
+
+
+if __name__ == "__main__":
+    main()
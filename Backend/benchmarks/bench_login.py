@@ -0,0 +1,81 @@
+"""
+Login burst benchmark: bcrypt verified inline on the event loop (the previous login
+route) against auth.PasswordPool, while other requests are served on the same loop.
+
+    python benchmarks/bench_login.py [logins]
+
+For each mode prints the logins per second, and the p50/p99 latency of a cheap
+endpoint polled by 20 clients during the burst (a status poll with a short database
+round trip). A burst larger than PASSWORD_HASH_MAX_PENDING also shows the sign-ins
+refused with a 503.
+"""
+
+# Imports
+import asyncio
+import os
+import statistics
+import sys
+import time
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+from auth.auth import PASSWORD_HASH_MAX_PENDING, PasswordPool, hash_password, verify_password
+
+#---------------------------------------------------------------------------------------
+
+PASSWORD = "secret-password"
+PASSWORD_HASH = hash_password(PASSWORD)
+POLLERS = 20
+# Database round trip of a login (user lookup) and of a status poll
+QUERY_SECONDS = 0.001
+POLL_SECONDS = 0.002
+
+
+async def login_inline():
+    await asyncio.sleep(QUERY_SECONDS)
+    return verify_password(PASSWORD, PASSWORD_HASH)
+
+
+def login_on(pool: PasswordPool):
+    async def login_pool():
+        await asyncio.sleep(QUERY_SECONDS)
+        return await pool.run(verify_password, PASSWORD, PASSWORD_HASH)
+    return login_pool
+
+
+async def poller(latencies, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(POLL_SECONDS)
+        latencies.append(time.perf_counter() - start - POLL_SECONDS)
+
+
+async def burst(name, login, logins):
+    latencies, stop = [], asyncio.Event()
+    pollers = [asyncio.create_task(poller(latencies, stop)) for _ in range(POLLERS)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*pollers)
+
+    accepted = sum(1 for r in results if r is True)
+    refused = sum(1 for r in results if isinstance(r, HTTPException) and r.status_code == 503)
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000
+    print(f"{name:22s} logins/s={accepted / elapsed:6.1f}  refused={refused:3d}  "
+          f"poll p50={statistics.median(latencies) * 1000:7.2f} ms  p99={p99:7.2f} ms")
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    print(f"{logins} concurrent logins, {POLLERS} clients polling")
+    asyncio.run(burst("inline", login_inline, logins))
+    for workers in (1, 2, 4):
+        pool = PasswordPool(workers, PASSWORD_HASH_MAX_PENDING)
+        asyncio.run(burst(f"pool ({workers} workers)", login_on(pool), logins))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Logo palette benchmark: components.helpers.palette against the KMeans clustering it
+replaced (brand_kit) and the PIL adaptive quantization (image_analyzer).
+
+    python benchmarks/bench_palette.py
+
+Prints the time per image of each method, the largest CIELAB distance between the
+KMeans palette and the new one (colours covering at least 10% of either), and whether
+both agree on the dominant colour. The KMeans column needs scikit-learn.
+"""
+
+# Imports
+import os
+import sys
+import time
+from collections import Counter
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.helpers.palette import extract_palette
+
+try:
+    from sklearn.cluster import KMeans
+except ImportError:
+    KMeans = None
+
+#---------------------------------------------------------------------------------------
+
+
+def kmeans_palette(img, num_colors=3):
+    """The previous brand_kit clustering, with the cluster sizes paired correctly"""
+    img = img.convert("RGBA")
+    factor = 100 / min(img.size)
+    small = img.resize((int(img.width * factor), int(img.height * factor)), Image.Resampling.LANCZOS)
+    pixels = np.array(small).reshape((-1, 4))
+    pixels = pixels[pixels[:, 3] > 200][:, :3]
+    kmeans = KMeans(n_clusters=num_colors, random_state=42, n_init=10).fit(pixels)
+    counts = np.bincount(kmeans.labels_, minlength=num_colors)
+    return [
+        (tuple(int(v) for v in kmeans.cluster_centers_[k]), counts[k] / len(pixels))
+        for k in np.argsort(-counts)
+    ]
+
+
+def adaptive_palette(img):
+    """The previous image_analyzer quantization"""
+    small = img.convert("RGB").resize((100, 100))
+    result = small.convert("P", palette=Image.ADAPTIVE, colors=5)
+    palette = result.getpalette()
+    counts = Counter(np.asarray(result).ravel().tolist())
+    return [tuple(palette[i * 3:i * 3 + 3]) for i, _ in counts.most_common(5)]
+
+
+def to_lab(rgb):
+    c = np.array(rgb, float) / 255
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array([[0.4124, 0.3576, 0.1805], [0.2126, 0.7152, 0.0722], [0.0193, 0.1192, 0.9505]]).T
+    xyz /= [0.95047, 1.0, 1.08883]
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.array([116 * f[1] - 16, 500 * (f[0] - f[1]), 200 * (f[1] - f[2])])
+
+
+def delta_e(a, b):
+    return float(np.linalg.norm(to_lab(a) - to_lab(b)))
+
+
+def synthetic_logos():
+    """Three colour logos at the sizes companies upload, opaque and transparent"""
+    rng = np.random.default_rng(7)
+    logos = {}
+    for n in range(12):
+        w, h = [(800, 800), (1600, 400), (2000, 2000), (300, 120)][n % 4]
+        img = Image.new("RGBA", (w, h), (0, 0, 0, 0) if n % 2 else (255, 255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        colors = [tuple(int(v) for v in rng.integers(0, 256, 3)) + (255,) for _ in range(3)]
+        draw.ellipse((w * 0.05, h * 0.05, w * 0.6, h * 0.95), fill=colors[0])
+        draw.rectangle((w * 0.55, h * 0.2, w * 0.95, h * 0.6), fill=colors[1])
+        draw.text((w * 0.6, h * 0.7), "BRAND CO", fill=colors[2])
+        draw.polygon([(w * 0.6, h * 0.65), (w * 0.9, h * 0.65), (w * 0.75, h * 0.95)], fill=colors[2])
+        logos[f"logo{n}_{w}x{h}"] = img.filter(ImageFilter.SMOOTH) if n % 3 == 0 else img
+    photo = Image.fromarray(rng.integers(0, 256, (600, 600, 3), dtype=np.uint8))
+    logos["photo_like"] = photo.filter(ImageFilter.GaussianBlur(12)).convert("RGBA")
+    return logos
+
+
+def time_ms(func, img, runs=5):
+    func(img)
+    start = time.perf_counter()
+    for _ in range(runs):
+        func(img)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    print(f"{'image':18s} {'kmeans ms':>9s} {'pil ms':>7s} {'numpy ms':>8s}  {'palette dE':>10s}  dominant")
+    for name, img in synthetic_logos().items():
+        new = extract_palette(img, 3)
+        assert new == extract_palette(img.copy(), 3), f"{name}: palette is not deterministic"
+        numpy_ms = time_ms(lambda i: extract_palette(i, 3), img)
+        pil_ms = time_ms(adaptive_palette, img)
+
+        if KMeans is None:
+            print(f"{name:18s} {'-':>9s} {pil_ms:7.1f} {numpy_ms:8.2f}")
+            continue
+
+        old = kmeans_palette(img)
+        # Every colour covering 10% of either palette has a close match in the other
+        palette_de = max(
+            [min(delta_e(c, n.rgb) for n in new) for c, share in old if share >= 0.1] +
+            [min(delta_e(n.rgb, c) for c, _ in old) for n in new if n.share >= 0.1]
+        )
+        if old[0][1] - old[1][1] < 0.05:
+            dominant = "tie"
+        else:
+            dominant = "same" if delta_e(new[0].rgb, old[0][0]) < 10 else "DIFF"
+        print(f"{name:18s} {time_ms(kmeans_palette, img):9.1f} {pil_ms:7.1f} {numpy_ms:8.2f}  "
+              f"{palette_de:10.1f}  {dominant}")
+
+
+if __name__ == "__main__":
+    main()
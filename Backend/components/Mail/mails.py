@@ -8,7 +8,7 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 import googleapiclient.discovery_cache.base
-from config.config import get_db_connection, get_db_cursor, release_db_connection
+from config.async_db import db_connection
 
 
 
@@ -60,18 +60,16 @@ async def get_credentials():
 
 # Get influencers from database
 async def get_influencers(strategy_id):
-    conn = get_db_connection()
-    cursor = get_db_cursor(conn)
-    
     try:
-        cursor.execute("""
-            SELECT name, email, email_text 
-            FROM influencers 
-            WHERE strategy_id = %s AND email IS NOT NULL AND email_text IS NOT NULL
-        """, (strategy_id,))
+        async with db_connection() as db:
+            rows = await db.fetchall("""
+                SELECT name, email, email_text 
+                FROM influencers 
+                WHERE strategy_id = %s AND email IS NOT NULL AND email_text IS NOT NULL
+            """, (strategy_id,))
         
         influencers = []
-        for name, email, email_text in cursor.fetchall():
+        for name, email, email_text in rows:
             influencers.append({
                 'name': name,
                 'email': email,
@@ -82,8 +80,6 @@ async def get_influencers(strategy_id):
     except Exception as e:
         print(f"Database error: {str(e)}")
         return []
-    finally:
-        release_db_connection(conn)
 
 # Send personalized emails
 async def send_influencer_emails(strategy_id):
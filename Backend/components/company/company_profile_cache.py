@@ -0,0 +1,121 @@
+# Imports
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class CompanyProfile:
+    """Read-only snapshot of a company row, shared by every reader of the cache"""
+    id: int
+    user_id: int
+    name: str
+    slogan: Optional[str]
+    description: Optional[str]
+    website: Optional[str]
+    phone_number: Optional[str]
+    products: Optional[str]
+    services: Optional[str]
+    marketing_goals: Optional[str]
+    target_age_groups: Optional[str]
+    target_audience_types: Optional[str]
+    target_business_types: Optional[str]
+    target_geographics: Optional[str]
+    preferred_platforms: Optional[str]
+    special_events: Optional[str]
+    marketing_challenges: Optional[str]
+    brand_tone: Optional[str]
+    monthly_budget: Optional[str]
+    logo_url: Optional[str]
+    version: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        """New dict of the profile fields, safe to modify"""
+        return {name: getattr(self, name) for name in PROFILE_COLUMNS if name != "user_id"}
+
+
+# Columns selected for a profile, in field order (the version is read from profile_version)
+PROFILE_COLUMNS = tuple(f.name for f in fields(CompanyProfile) if f.name != "version")
+
+
+class CompanyProfileCache:
+    """
+    Company profiles keyed by company id, read through from the companies table.
+    Entries are checked against companies.profile_version once they are older than
+    `revalidate_after` seconds, so an edit made on another worker is seen after at
+    most that long while the full row is only read again when the version changed.
+    The company routes invalidate their own worker's entry right after a write.
+    """
+
+    def __init__(self, max_entries: int, revalidate_after: float):
+        self.max_entries = max_entries
+        self.revalidate_after = revalidate_after
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # Readers run on the database threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _set_local(self, profile: CompanyProfile):
+        with self._lock:
+            self._entries[profile.id] = (profile, time.monotonic())
+            self._entries.move_to_end(profile.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, cursor, company_id: int) -> Optional[CompanyProfile]:
+        cursor.execute(f"""
+            SELECT {", ".join(PROFILE_COLUMNS)}, profile_version
+            FROM companies WHERE id = %s
+        """, (company_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        profile = CompanyProfile(*row)
+        self._set_local(profile)
+        return profile
+
+    def get(self, cursor, company_id: int) -> Optional[CompanyProfile]:
+        """Profile of the company, or None if it doesn't exist"""
+        with self._lock:
+            entry = self._entries.get(company_id)
+            if entry is not None:
+                self._entries.move_to_end(company_id)
+
+        if entry is not None:
+            profile, checked_at = entry
+            if time.monotonic() - checked_at < self.revalidate_after:
+                self.hits += 1
+                return profile
+
+            cursor.execute("SELECT profile_version FROM companies WHERE id = %s", (company_id,))
+            row = cursor.fetchone()
+            if row is not None and row[0] == profile.version:
+                self.hits += 1
+                self._set_local(profile)
+                return profile
+            if row is None:
+                self.invalidate(company_id)
+                return None
+
+        self.misses += 1
+        return self._load(cursor, company_id)
+
+    def invalidate(self, company_id: int):
+        """Drop the cached profile of a company that was updated or deleted"""
+        with self._lock:
+            self._entries.pop(company_id, None)
+
+
+company_profile_cache = CompanyProfileCache(
+    max_entries=settings.COMPANY_PROFILE_CACHE_MAX_ENTRIES,
+    revalidate_after=settings.COMPANY_PROFILE_CACHE_REVALIDATE
+)
@@ -8,6 +8,8 @@ import logging
 from typing import List, Optional
 from config.config import get_db_connection, get_db_cursor, release_db_connection
 from auth.auth import get_current_user
+from components.company.company_profile_cache import company_profile_cache
+from components.strategies.launch_strategy_routes.brand_kit import brand_kit_cache
 
 # Initialize router without prefix since we want exact paths
 router = APIRouter(
@@ -98,16 +100,18 @@ def company_details(
 ):
     """Display company details page"""
     try:
-        # Fetch company details
+        # Fetch company details with its strategy counts (maintained by a trigger)
         cursor.execute(
             """
-            SELECT id, user_id, name, slogan, description, website,phone_number,
-                   products, services, marketing_goals,
-                   target_age_groups, target_audience_types, target_business_types,
-                   target_geographics, preferred_platforms, special_events, 
-                   marketing_challenges, brand_tone, monthly_budget, logo_url, created_at
-            FROM companies 
-            WHERE id = %s AND user_id = %s
+            SELECT c.id, c.user_id, c.name, c.slogan, c.description, c.website, c.phone_number,
+                   c.products, c.services, c.marketing_goals,
+                   c.target_age_groups, c.target_audience_types, c.target_business_types,
+                   c.target_geographics, c.preferred_platforms, c.special_events, 
+                   c.marketing_challenges, c.brand_tone, c.monthly_budget, c.logo_url, c.created_at,
+                   st.strategy_count, st.approved_count
+            FROM companies c
+            LEFT JOIN company_strategy_stats st ON st.company_id = c.id
+            WHERE c.id = %s AND c.user_id = %s
             """,
             (company_id, user["user_id"])
         )
@@ -116,10 +120,10 @@ def company_details(
         if not company:
             raise HTTPException(status_code=404, detail="Company not found")
         
-        # Fetch approved strategy
+        # Fetch approved strategy, only the start of the document is shown
         cursor.execute(
             """
-            SELECT id, content, created_at FROM strategies 
+            SELECT id, LEFT(content, 300), created_at FROM strategies 
             WHERE company_id = %s AND status = 'approved'
             LIMIT 1
             """,
@@ -127,22 +131,9 @@ def company_details(
         )
         approved_strategy = cursor.fetchone()
         
-        # Count strategies - ensure we get 0 if no results
-        cursor.execute(
-            """
-            SELECT 
-                COUNT(*) as total_count,
-                SUM(CASE WHEN status = 'approved' THEN 1 ELSE 0 END) as approved_count
-            FROM strategies 
-            WHERE company_id = %s
-            """,
-            (company_id,)
-        )
-        counts = cursor.fetchone()
-        
-        # Handle case where counts might be None
-        total_count = counts[0] or 0
-        approved_count = counts[1] or 0
+        # No stats row until the company has a strategy
+        total_count = company[21] or 0
+        approved_count = company[22] or 0
         archived_count = total_count - approved_count
         
         # Format company data
@@ -173,7 +164,7 @@ def company_details(
         if approved_strategy:
             approved_strategy_dict = {
                 "id": approved_strategy[0],
-                "content": approved_strategy[1],
+                "preview": approved_strategy[1],
                 "created_at": approved_strategy[2].strftime("%Y-%m-%d %H:%M")
             }
         
@@ -340,6 +331,7 @@ def submit_company(
         )
         company_id = cursor.fetchone()[0]
         cursor.connection.commit()
+        company_profile_cache.invalidate(company_id)
         
         response = RedirectResponse(url=f"/company/{company_id}", status_code=303)
         response.delete_cookie("pending_company_name")
@@ -391,7 +383,11 @@ def update_company(
             phone_number = re.sub(r'[^\d+]', '', phone_number)
         
         
-        logo_url = None
+        cursor.execute(
+            "SELECT logo_url FROM companies WHERE id = %s",
+            (company_id,)
+        )
+        old_logo_url = logo_url = cursor.fetchone()[0]
         if logo and logo.filename:
             try: 
                 upload_result = cloudinary.uploader.upload(
@@ -402,12 +398,6 @@ def update_company(
             except Exception as e:
                 logger.error(f"Error uploading logo: {str(e)}")
                 raise HTTPException(status_code=500, detail="Error uploading logo")
-        else:
-            cursor.execute(
-                "SELECT logo_url FROM companies WHERE id = %s",
-                (company_id,)
-            )
-            logo_url = cursor.fetchone()[0]
 
         cursor.execute(
             """
@@ -444,6 +434,9 @@ def update_company(
             )
         )
         cursor.connection.commit()
+        company_profile_cache.invalidate(company_id)
+        if logo_url != old_logo_url:
+            brand_kit_cache.invalidate(old_logo_url)
         
         return RedirectResponse(url=f"/company/{company_id}", status_code=303)
         
@@ -460,10 +453,11 @@ def delete_company(
     """Delete company with original /delete_company/{id} path"""
     try:
         cursor.execute(
-            "SELECT id FROM companies WHERE id = %s AND user_id = %s",
+            "SELECT id, logo_url FROM companies WHERE id = %s AND user_id = %s",
             (company_id, user["user_id"])
         )
-        if not cursor.fetchone():
+        company = cursor.fetchone()
+        if not company:
             raise HTTPException(status_code=404, detail="Company not found")
         
         cursor.execute(
@@ -471,6 +465,8 @@ def delete_company(
             (company_id,)
         )
         cursor.connection.commit()
+        company_profile_cache.invalidate(company_id)
+        brand_kit_cache.invalidate(company[1])
         
         return RedirectResponse(url="/home", status_code=303)
         
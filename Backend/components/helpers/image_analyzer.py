@@ -5,8 +5,8 @@ import numpy as np
 from io import BytesIO
 from PIL import Image, ImageStat, ImageFilter, ImageEnhance, ImageDraw, ImageFont, ImageOps
 import colorsys
-from collections import Counter
 import re
+from components.helpers.palette import extract_palette
 
 class LogoAnalyzer:
     """Analyze company logos to extract design characteristics"""
@@ -24,8 +24,9 @@ class LogoAnalyzer:
                 raise Exception(f"Failed to download image: {response.status_code}")
                 
             self.image = Image.open(BytesIO(response.content))
-            if self.image.mode != 'RGB':
-                self.image = self.image.convert('RGB')
+            # Alpha is kept so transparent backgrounds are left out of the colors
+            if self.image.mode != 'RGBA':
+                self.image = self.image.convert('RGBA')
             return True
         except Exception as e:
             self.analysis_results["error"] = f"Image loading error: {str(e)}"
@@ -63,15 +64,10 @@ class LogoAnalyzer:
     def extract_dominant_colors(self):
         """Extract dominant colors from logo"""
         try:
-            img_small = self.image.resize((100, 100))
-            result = img_small.convert('P', palette=Image.ADAPTIVE, colors=5)
-            palette = result.getpalette()
-            color_counts = Counter(result.getdata())
-            
             colors = []
-            for i, count in color_counts.most_common(5):
-                r, g, b = palette[i*3], palette[i*3+1], palette[i*3+2]
-                percent = count / (img_small.width * img_small.height) * 100
+            for color in extract_palette(self.image, max_colors=5):
+                r, g, b = color.rgb
+                percent = color.share * 100
                 if max(r, g, b) < 10 and percent < 5:
                     continue
                     
@@ -0,0 +1,85 @@
+# Imports
+from typing import List, NamedTuple, Tuple
+import numpy as np
+from PIL import Image
+
+#---------------------------------------------------------------------------------------
+
+# Longest side the image is sampled at, and bits kept per channel when binning
+SAMPLE_SIZE = 128
+BIN_BITS = 4
+# Bins closer than this (RGB distance) to an existing colour don't start a new one,
+# so anti-aliased edges and gradients stay part of the colour they belong to
+MIN_COLOR_DISTANCE = 48.0
+REFINE_STEPS = 3
+
+# Bumped whenever a change to the algorithm changes its output, stored palettes
+# (brand kits on disk) are keyed by it so they are computed again
+PALETTE_VERSION = 2
+
+
+class PaletteColor(NamedTuple):
+    rgb: Tuple[int, int, int]
+    share: float  # fraction of the opaque pixels
+
+
+def extract_palette(img: Image.Image, max_colors: int = 3, min_alpha: int = 200) -> List[PaletteColor]:
+    """
+    Dominant colours of an image, most common first (at most max_colors, fewer for
+    images with fewer distinct colours). Pixels are binned on a 16 levels per channel
+    grid, colours are seeded from the fullest bins and refined on the bins,
+    so the result is deterministic and takes a few milliseconds for any image size.
+    """
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    # Sampled down before converting, the full image is never copied
+    scale = SAMPLE_SIZE / max(img.size)
+    if scale < 1:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Image.Resampling.NEAREST)
+    img = img.convert("RGBA")
+
+    pixels = np.asarray(img).reshape(-1, 4)
+    pixels = pixels[pixels[:, 3] > min_alpha][:, :3]
+    if len(pixels) == 0:
+        return []
+
+    # Histogram of the pixels with the mean colour of each non-empty bin
+    shift = 8 - BIN_BITS
+    q = (pixels >> shift).astype(np.int32)
+    bin_ids = (q[:, 0] << (2 * BIN_BITS)) | (q[:, 1] << BIN_BITS) | q[:, 2]
+    all_counts = np.bincount(bin_ids, minlength=1 << (3 * BIN_BITS))
+    bins = np.flatnonzero(all_counts)
+    counts = all_counts[bins]
+    means = np.stack([
+        np.bincount(bin_ids, weights=pixels[:, c], minlength=len(all_counts))[bins]
+        for c in range(3)
+    ], axis=1) / counts[:, None]
+
+    # Seed colours from the fullest bins that are not close to an earlier seed
+    order = np.lexsort((bins, -counts))
+    nearest = np.full(len(bins), np.inf)
+    seeds = []
+    while len(seeds) < max_colors:
+        candidates = order[nearest[order] >= MIN_COLOR_DISTANCE]
+        if not len(candidates):
+            break
+        seed = candidates[0]
+        seeds.append(seed)
+        nearest = np.minimum(nearest, np.linalg.norm(means - means[seed], axis=1))
+    centers = means[seeds]
+
+    # A few k-means steps over the bins (weighted by their pixel counts)
+    for _ in range(REFINE_STEPS):
+        labels = np.argmin(((means[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+        weights = np.bincount(labels, weights=counts, minlength=len(centers))
+        for k in range(len(centers)):
+            if weights[k]:
+                centers[k] = (means[labels == k] * counts[labels == k, None]).sum(axis=0) / weights[k]
+
+    total = counts.sum()
+    order = sorted(range(len(centers)), key=lambda k: (-weights[k], k))
+    return [
+        PaletteColor(tuple(int(round(c)) for c in centers[k]), float(weights[k] / total))
+        for k in order if weights[k]
+    ]
@@ -0,0 +1,81 @@
+# Imports
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Tuple
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# (requests per minute, burst) per external provider, applied per credential
+PROVIDER_LIMITS: Dict[str, Tuple[float, int]] = {
+    "tavily": (100, 10),
+    "groq": (settings.GROQ_REQUESTS_PER_MINUTE, 5),
+    "replicate": (60, 5),
+    "facebook": (30, 3),
+    "instagram": (30, 3),
+    "linkedin": (30, 3),
+}
+
+DEFAULT_LIMIT = (60, 5)
+
+
+class TokenBucket:
+    """Classic token bucket: refills at `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    async def acquire(self, tokens: float = 1):
+        """Take tokens, waiting only as long as the bucket needs to refill"""
+        # One waiter at a time so requests are served in order
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """One token bucket per (provider, credential)"""
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def bucket(self, provider: str, credential: str = "default") -> TokenBucket:
+        # Only a digest of the credential is kept as key
+        key = (provider, hashlib.sha1(str(credential).encode("utf-8")).hexdigest())
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            per_minute, burst = PROVIDER_LIMITS.get(provider, DEFAULT_LIMIT)
+            bucket = self.buckets[key] = TokenBucket(per_minute / 60.0, burst)
+        return bucket
+
+    async def acquire(self, provider: str, credential: str = "default", tokens: float = 1):
+        bucket = self.bucket(provider, credential)
+        started = time.monotonic()
+        await bucket.acquire(tokens)
+        waited = time.monotonic() - started
+        if waited > 0.5:
+            logger.info(f"Waited {waited:.1f}s for {provider} rate limit")
+
+
+rate_limiter = RateLimiter()
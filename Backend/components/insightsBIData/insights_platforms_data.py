@@ -22,13 +22,11 @@ async def run_in_thread(func, *args):
 
 # Facebook Analytics
 # Facebook Analytics with multiple time periods
-async def get_facebook_analytics(user_id: int, db_cursor, days: int = 30):
+async def get_facebook_analytics(user_id: int, db, days: int = 30):
     """Get Facebook analytics for the user - handles token decryption internally"""
     try:
-        # Run database query in thread pool
-        facebook_account = await run_in_thread(
-            fetch_facebook_account, db_cursor, user_id
-        )
+        # Run database query on the request's connection
+        facebook_account = await db.run(fetch_facebook_account, user_id)
         
         if not facebook_account:
             return {"error": "No Facebook account linked"}
@@ -155,13 +153,11 @@ async def fetch_facebook_insight(page_id: str, access_token: str, metric: str, s
         return None
 
 # Instagram Analytics
-async def get_instagram_analytics(user_id: int, db_cursor, days: int = 14):
+async def get_instagram_analytics(user_id: int, db, days: int = 14):
     """Get Instagram analytics for the user - handles token decryption internally"""
     try:
-        # Run database query in thread pool
-        instagram_account = await run_in_thread(
-            fetch_instagram_account, db_cursor, user_id
-        )
+        # Run database query on the request's connection
+        instagram_account = await db.run(fetch_instagram_account, user_id)
         
         if not instagram_account:
             return {"error": "No Instagram account linked"}
@@ -19,7 +19,9 @@ from fastapi.responses import JSONResponse
 from fastapi import APIRouter
 
  # Import config and db
-from config.config import get_db_connection, get_db_cursor, release_db_connection, settings
+from config.config import settings
+from config.async_db import db_connection
+from components.helpers.rate_limiter import rate_limiter
 
 # Import user
 from auth.auth import get_current_user
@@ -33,6 +35,7 @@ from components.strategies.launch_strategy_routes.image_content_creation_helpers
     universal_framer, 
     generate_overlay_text
 )
+from components.strategies.launch_strategy_routes.brand_kit import brand_kit_cache
 
 # Import utils for strategy content cloud uploads
 from components.strategies.launch_strategy_routes.cloudinary_utils import (
@@ -67,37 +70,27 @@ LLAMA_API_KEY = settings.LLAMA_API_KEY
 LLAMA_API_URL = settings.LLAMA_API_URL
 together_client = Together(api_key=LLAMA_API_KEY)
 
-# Database dependency
-async def get_db():
-    conn = get_db_connection()
-    cursor = get_db_cursor(conn)
-    try:
-        yield cursor, conn
-    finally:
-        release_db_connection(conn)
-
 #---------------------------------------------------------------------------------------                
 
 
 # Function to generate posts based on paltfrom and content type :
 @router.post("/generate_for_post_type/{content_id}")
-async def generate_for_post_type(content_id: int, user: dict = Depends(get_current_user), db=Depends(get_db)):
+async def generate_for_post_type(content_id: int, user: dict = Depends(get_current_user)):
     print(f"\n[INFO] Starting content generation for content_id: {content_id}")
     
-    cursor, conn = db
-    
     try:
         # Get content item details including platform
+        # (connections are only held for the queries, never while generating or uploading)
         print("[INFO] Fetching content details from database...")
-        cursor.execute("""
-            SELECT ci.platform, ci.content_type, ci.image_prompt, ci.video_placeholder, 
-                   ci.caption, ci.hashtags, c.id as company_id, c.name as company_name, c.logo_url
-            FROM content_items ci
-            JOIN companies c ON ci.company_id = c.id
-            WHERE ci.id = %s AND ci.user_id = %s
-        """, (content_id, user["user_id"]))
+        async with db_connection() as db:
+            content_data = await db.fetchone("""
+                SELECT ci.platform, ci.content_type, ci.image_prompt, ci.video_placeholder, 
+                       ci.caption, ci.hashtags, c.id as company_id, c.name as company_name, c.logo_url
+                FROM content_items ci
+                JOIN companies c ON ci.company_id = c.id
+                WHERE ci.id = %s AND ci.user_id = %s
+            """, (content_id, user["user_id"]))
         
-        content_data = cursor.fetchone()
         if not content_data:
             print(f"[ERROR] Content not found for content_id: {content_id}")
             raise HTTPException(status_code=404, detail="Content not found")
@@ -138,7 +131,7 @@ async def generate_for_post_type(content_id: int, user: dict = Depends(get_curre
             print(f"[INFO] Generating {platform} {content_type} image...")
             
             # Generate dynamic overlay text
-            dynamic_overlay_text = await generate_overlay_text(company_id, cursor)
+            dynamic_overlay_text = await generate_overlay_text(company_id)
             
             # Add platform-specific aspect ratio to the prompt
             enhanced_prompt = f"{image_prompt} - IMPORTANT: {aspect_prompt}"
@@ -167,32 +160,28 @@ async def generate_for_post_type(content_id: int, user: dict = Depends(get_curre
                 print("[ERROR] No image URL in response")
                 return JSONResponse({"error": "No image URL in response"}, status_code=500)
             
-            # Download the generated image and logo concurrently
-            img_response, logo_response = await asyncio.gather(
+            # Download the generated image, the logo comes from its brand kit (downloaded once per logo)
+            img_response, brand_kit = await asyncio.gather(
                 loop.run_in_executor(None, lambda: requests.get(first_image.url)),
-                loop.run_in_executor(None, lambda: requests.get(logo_url)),
+                brand_kit_cache.get(logo_url),
                 return_exceptions=True
             )
             
             # Check for exceptions in downloads
             if isinstance(img_response, Exception):
                 raise img_response
-            if isinstance(logo_response, Exception):
-                raise logo_response
+            if isinstance(brand_kit, Exception):
+                raise brand_kit
                 
             img_response.raise_for_status()
-            logo_response.raise_for_status()
             
-            # Load images in thread pool
-            generated_img, logo_img = await asyncio.gather(
-                loop.run_in_executor(None, lambda: Image.open(io.BytesIO(img_response.content)).convert("RGBA")),
-                loop.run_in_executor(None, lambda: Image.open(io.BytesIO(logo_response.content)).convert("RGBA"))
-            )
+            # Load image in thread pool
+            generated_img = await loop.run_in_executor(None, lambda: Image.open(io.BytesIO(img_response.content)).convert("RGBA"))
             
             # Apply the universal frame
             framed_image = await universal_framer.create_post_from_images(
                 generated_img, 
-                logo_img, 
+                brand_kit, 
                 platform,
                 content_type,
                 company_id,
@@ -214,12 +203,13 @@ async def generate_for_post_type(content_id: int, user: dict = Depends(get_curre
             )
             
             # Save the Cloudinary URL to database
-            cursor.execute("""
-                UPDATE content_items 
-                SET media_link = %s
-                WHERE id = %s
-            """, (cloudinary_url, content_id))
-            await loop.run_in_executor(None, conn.commit)
+            async with db_connection() as db:
+                await db.execute("""
+                    UPDATE content_items 
+                    SET media_link = %s
+                    WHERE id = %s
+                """, (cloudinary_url, content_id))
+                await db.commit()
             
             # Clean up local file
             await loop.run_in_executor(None, os.remove, filepath)
@@ -274,12 +264,13 @@ async def generate_for_post_type(content_id: int, user: dict = Depends(get_curre
             await asyncio.gather(*cleanup_tasks, return_exceptions=True)
             
             # Save to database
-            cursor.execute("""
-                UPDATE content_items 
-                SET media_link = %s
-                WHERE id = %s
-            """, (cloudinary_url, content_id))
-            await loop.run_in_executor(None, conn.commit)
+            async with db_connection() as db:
+                await db.execute("""
+                    UPDATE content_items 
+                    SET media_link = %s
+                    WHERE id = %s
+                """, (cloudinary_url, content_id))
+                await db.commit()
             
             return JSONResponse({
                 "video_url": cloudinary_url,
@@ -335,6 +326,7 @@ async def generate_video_with_logo(prompt: str, logo_url: str) -> Optional[str]:
             logger.info(f"Generating video with prompt: {prompt}")
             
             # Generate video using the specific client (run in thread pool as it's blocking)
+            await rate_limiter.acquire("replicate", api_token)
             loop = asyncio.get_event_loop()
             output = await loop.run_in_executor(
                 None,
@@ -411,13 +403,11 @@ async def generate_video_with_logo(prompt: str, logo_url: str) -> Optional[str]:
                 logger.info(f"Token #{idx} is rate limited, trying next token...")
             else:
                 logger.info("Trying next API token...")
-            await asyncio.sleep(1)
             continue
             
         except Exception as e:
             logger.error(f"❌ Error with API token #{idx}: {e}")
             logger.info("Trying next API token...")
-            await asyncio.sleep(1)
             continue
     
     # If all tokens failed
@@ -434,17 +424,16 @@ async def upload_custom_media(
     file: UploadFile = File(...),
     content_id: int = Form(...),
     is_video: bool = Form(False),
-    user: dict = Depends(get_current_user),
-    db = Depends(get_db)
+    user: dict = Depends(get_current_user)
 ):
-    cursor, conn = db
     try:
         # Verify the content belongs to the user
-        cursor.execute("""
-            SELECT id FROM content_items 
-            WHERE id = %s AND user_id = %s
-        """, (content_id, user["user_id"]))
-        if not cursor.fetchone():
+        async with db_connection() as db:
+            content = await db.fetchone("""
+                SELECT id FROM content_items 
+                WHERE id = %s AND user_id = %s
+            """, (content_id, user["user_id"]))
+        if not content:
             raise HTTPException(status_code=404, detail="Content not found")
 
         # Save the file temporarily
@@ -463,22 +452,23 @@ async def upload_custom_media(
         )
 
         # Update the content item in database
-        if is_video:
-            # For videos, update both media_link and video_placeholder
-            cursor.execute("""
-                UPDATE content_items 
-                SET media_link = %s, video_placeholder = %s
-                WHERE id = %s
-            """, (cloudinary_url, cloudinary_url, content_id))
-        else:
-            # For images, just update media_link
-            cursor.execute("""
-                UPDATE content_items 
-                SET media_link = %s
-                WHERE id = %s
-            """, (cloudinary_url, content_id))
-        
-        conn.commit()
+        async with db_connection() as db:
+            if is_video:
+                # For videos, update both media_link and video_placeholder
+                await db.execute("""
+                    UPDATE content_items 
+                    SET media_link = %s, video_placeholder = %s
+                    WHERE id = %s
+                """, (cloudinary_url, cloudinary_url, content_id))
+            else:
+                # For images, just update media_link
+                await db.execute("""
+                    UPDATE content_items 
+                    SET media_link = %s
+                    WHERE id = %s
+                """, (cloudinary_url, content_id))
+            
+            await db.commit()
 
         # Clean up temp file
         os.unlink(temp_path)
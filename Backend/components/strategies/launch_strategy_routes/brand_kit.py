@@ -0,0 +1,232 @@
+# Imports
+import io
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+import requests
+from PIL import Image
+from config.config import settings
+from components.helpers.palette import PALETTE_VERSION, extract_palette
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+FALLBACK_DOMINANT = (0, 179, 173, 255)   # teal
+FALLBACK_SECONDARY = (44, 27, 71, 255)   # purple
+
+# Palettes computed by an older version of the algorithm are not read back
+PALETTE_FILE = f"palette_v{PALETTE_VERSION}.json"
+
+
+def dominant_colors(img: Image.Image, num_colors: int = 3) -> List[Tuple[int, int, int, int]]:
+    """Dominant colors of the logo as RGBA, most common first."""
+    palette = extract_palette(img, max_colors=num_colors)
+    if not palette:
+        return [FALLBACK_DOMINANT, FALLBACK_SECONDARY]
+    return [(*color.rgb, 255) for color in palette]
+
+
+def fit_inside_box(img: Image.Image, box_w: int, box_h: int) -> Image.Image:
+    """Resize img to fit within (box_w, box_h) preserving aspect ratio."""
+    iw, ih = img.size
+    img_ratio = iw / ih
+    box_ratio = box_w / box_h
+
+    if img_ratio > box_ratio:
+        new_w = box_w
+        new_h = int(new_w / img_ratio)
+    else:
+        new_h = box_h
+        new_w = int(new_h * img_ratio)
+
+    return img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+class BrandKit:
+    """
+    Everything post framing needs from a company logo: the decoded RGBA logo, its
+    palette and the logo fitted to each box it is placed in. Images are shared
+    between requests and must not be modified.
+    """
+
+    def __init__(self, logo_url: str, content_hash: str, logo: Image.Image,
+                 palette: List[Tuple[int, int, int, int]], directory: Optional[str] = None):
+        self.logo_url = logo_url
+        self.content_hash = content_hash
+        self.logo = logo
+        self.palette = palette
+        self.directory = directory
+        self._fitted: Dict[Tuple[int, int], Image.Image] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def dominant(self) -> Tuple[int, int, int, int]:
+        return self.palette[0] if self.palette else FALLBACK_DOMINANT
+
+    @property
+    def secondary(self) -> Tuple[int, int, int, int]:
+        return self.palette[1] if len(self.palette) > 1 else FALLBACK_SECONDARY
+
+    def fitted_logo(self, box_w: int, box_h: int) -> Image.Image:
+        """Logo fitted inside the box, resized once per box size"""
+        key = (box_w, box_h)
+        with self._lock:
+            fitted = self._fitted.get(key)
+        if fitted is not None:
+            return fitted
+
+        path = os.path.join(self.directory, f"logo_{box_w}x{box_h}.png") if self.directory else None
+        if path and os.path.exists(path):
+            fitted = Image.open(path).convert("RGBA")
+        else:
+            fitted = fit_inside_box(self.logo, box_w, box_h)
+            if path:
+                try:
+                    fitted.save(path, "PNG")
+                except OSError as e:
+                    logger.warning(f"Could not store fitted logo {path}: {str(e)}")
+
+        with self._lock:
+            return self._fitted.setdefault(key, fitted)
+
+
+class BrandKitCache:
+    """
+    Brand kits keyed by logo URL, in a memory LRU backed by a disk tier.
+    On disk a kit is stored under the sha256 of the logo bytes, with a small index
+    from URL to content hash, so a worker restart or the same logo uploaded under a
+    new URL skips the clustering. update_company and delete_company invalidate the
+    URL of a replaced logo, the next render downloads and indexes the new one.
+    """
+
+    def __init__(self, max_entries: int, directory: Optional[str]):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, BrandKit]" = OrderedDict()
+        # Invalidated from the sync company routes, read on the event loop
+        self._lock = threading.Lock()
+        self._building: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if directory:
+            os.makedirs(os.path.join(directory, "urls"), exist_ok=True)
+
+    def _set_local(self, kit: BrandKit):
+        with self._lock:
+            self._entries[kit.logo_url] = kit
+            self._entries.move_to_end(kit.logo_url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _url_index(self, logo_url: str) -> str:
+        return os.path.join(self.directory, "urls", _digest(logo_url))
+
+    def _load_disk(self, logo_url: str, content_hash: str) -> Optional[BrandKit]:
+        kit_dir = os.path.join(self.directory, content_hash)
+        try:
+            with open(os.path.join(kit_dir, PALETTE_FILE)) as f:
+                palette = [tuple(color) for color in json.load(f)]
+            logo = Image.open(os.path.join(kit_dir, "logo.png")).convert("RGBA")
+        except (OSError, ValueError):
+            return None
+        return BrandKit(logo_url, content_hash, logo, palette, kit_dir)
+
+    def _store_disk(self, kit: BrandKit, logo_url: str):
+        kit_dir = os.path.join(self.directory, kit.content_hash)
+        try:
+            os.makedirs(kit_dir, exist_ok=True)
+            kit.logo.save(os.path.join(kit_dir, "logo.png"), "PNG")
+            # Written last, a kit without its palette is rebuilt
+            with open(os.path.join(kit_dir, PALETTE_FILE), "w") as f:
+                json.dump(kit.palette, f)
+            with open(self._url_index(logo_url), "w") as f:
+                f.write(kit.content_hash)
+            kit.directory = kit_dir
+        except OSError as e:
+            logger.warning(f"Could not store brand kit {kit.content_hash}: {str(e)}")
+
+    def _build(self, logo_url: str) -> BrandKit:
+        """Load the kit from disk, or download the logo and index it (blocking)"""
+        if self.directory:
+            try:
+                with open(self._url_index(logo_url)) as f:
+                    kit = self._load_disk(logo_url, f.read().strip())
+                if kit is not None:
+                    return kit
+            except OSError:
+                pass
+
+        response = requests.get(logo_url, timeout=30)
+        response.raise_for_status()
+        content_hash = hashlib.sha256(response.content).hexdigest()
+
+        if self.directory:
+            kit = self._load_disk(logo_url, content_hash)
+            if kit is not None:
+                try:
+                    with open(self._url_index(logo_url), "w") as f:
+                        f.write(content_hash)
+                except OSError:
+                    pass
+                return kit
+
+        logo = Image.open(io.BytesIO(response.content)).convert("RGBA")
+        kit = BrandKit(logo_url, content_hash, logo, dominant_colors(logo))
+        logger.info(f"Built brand kit {content_hash[:12]} for {logo_url}")
+        if self.directory:
+            self._store_disk(kit, logo_url)
+        return kit
+
+    async def get(self, logo_url: str) -> BrandKit:
+        """Brand kit of the logo, concurrent renders of the same logo share one build"""
+        with self._lock:
+            kit = self._entries.get(logo_url)
+            if kit is not None:
+                self._entries.move_to_end(logo_url)
+                self.hits += 1
+                return kit
+
+        building = self._building.get(logo_url)
+        if building is None:
+            self.misses += 1
+            loop = asyncio.get_running_loop()
+            building = loop.run_in_executor(None, self._build, logo_url)
+            building.add_done_callback(partial(self._built, logo_url))
+            self._building[logo_url] = building
+        # A cancelled request must not cancel the build other requests wait for
+        return await asyncio.shield(building)
+
+    def _built(self, logo_url: str, building: asyncio.Future):
+        self._building.pop(logo_url, None)
+        if not building.cancelled() and building.exception() is None:
+            self._set_local(building.result())
+
+    def invalidate(self, logo_url: Optional[str]):
+        """Forget the kit of a logo that was replaced or whose company was deleted"""
+        if not logo_url:
+            return
+        with self._lock:
+            self._entries.pop(logo_url, None)
+        if self.directory:
+            try:
+                os.remove(self._url_index(logo_url))
+            except FileNotFoundError:
+                pass
+
+
+brand_kit_cache = BrandKitCache(
+    max_entries=settings.BRAND_KIT_CACHE_MAX_ENTRIES,
+    directory=settings.BRAND_KIT_DIR or None
+)
@@ -5,12 +5,12 @@ import tempfile
 import shutil
 import time
 import traceback
-import asyncio
 import logging
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from auth.auth import get_current_user
-from config.config import get_db_connection, get_db_cursor, release_db_connection
+from config.async_db import get_async_db
+from components.strategies.prompts.digital_marketing import parse_schedule
 from .cloudinary_utils import upload_image_to_cloudinary
 
 
@@ -27,54 +27,38 @@ router = APIRouter(
 # Logger
 logger = logging.getLogger(__name__)
 
-# Database dependency
-async def get_db():
-    conn = get_db_connection()
-    cursor = get_db_cursor(conn)
-    try:
-        yield cursor, conn
-    finally:
-        release_db_connection(conn)
-
-
 #---------------------------------------------------------------------------------------
 
 # Get Company 
-async def get_company_id_from_strategy(strategy_id: int, cursor) -> int:
+async def get_company_id_from_strategy(strategy_id: int, db) -> int:
     """Helper function to get company ID from strategy ID"""
-    cursor.execute("SELECT company_id FROM strategies WHERE id = %s", (strategy_id,))
-    result = cursor.fetchone()
+    result = await db.fetchone("SELECT company_id FROM strategies WHERE id = %s", (strategy_id,))
     return result[0] if result else None
 
 #---------------------------------------------------------------------------------------
 
 # Return Media Content
 @router.get("/get_content_items/{strategy_id}")
-async def get_content_items(strategy_id: int, user: dict = Depends(get_current_user)):
+async def get_content_items(strategy_id: int, user: dict = Depends(get_current_user), db = Depends(get_async_db)):
     """Get all content items for a strategy - Async version"""
     try:
         logger.info(f"Getting content items for strategy {strategy_id}, user {user['user_id']}")
         
-        # Get database connection
-        db_gen = get_db()
-        cursor, conn = await db_gen.__anext__()
-        
         # Verify strategy belongs to user
-        cursor.execute("""
+        result = await db.fetchone("""
             SELECT s.id 
             FROM strategies s
             JOIN companies c ON s.company_id = c.id
             WHERE s.id = %s AND c.user_id = %s
         """, (strategy_id, user["user_id"]))
         
-        result = cursor.fetchone()
         logger.info(f"Strategy verification result: {result}")
         
         if not result:
             raise HTTPException(status_code=404, detail="Strategy not found")
         
         # Get all content items for this strategy
-        cursor.execute("""
+        rows = await db.fetchall("""
             SELECT id, platform, content_type, caption, hashtags, 
                    media_link, video_placeholder, best_time, status
             FROM content_items
@@ -90,7 +74,6 @@ async def get_content_items(strategy_id: int, user: dict = Depends(get_current_u
         """, (strategy_id,))
         
         content_items = []
-        rows = cursor.fetchall()
         logger.info(f"Found {len(rows)} content items")
         
         for row in rows:
@@ -114,9 +97,6 @@ async def get_content_items(strategy_id: int, user: dict = Depends(get_current_u
         logger.error(f"Error getting content items: {str(e)}")
         logger.error(f"Error details: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if 'db_gen' in locals():
-            await db_gen.aclose()
 
 #---------------------------------------------------------------------------------------
 
@@ -131,23 +111,20 @@ async def create_content_item(
     best_time: str = Form(None),
     status: str = Form('approved'),
     media: UploadFile = File(None),
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     """Create a new content item - Async version"""
     try:
-        # Get database connection
-        db_gen = get_db()
-        cursor, conn = await db_gen.__anext__()
-        
         # Verify strategy belongs to user
-        cursor.execute("""
+        strategy = await db.fetchone("""
             SELECT s.id 
             FROM strategies s
             JOIN companies c ON s.company_id = c.id
             WHERE s.id = %s AND c.user_id = %s
         """, (strategy_id, user["user_id"]))
         
-        if not cursor.fetchone():
+        if not strategy:
             raise HTTPException(status_code=404, detail="Strategy not found")
         
         # Handle file upload if exists
@@ -174,16 +151,18 @@ async def create_content_item(
             os.unlink(temp_path)
         
         # Get company ID
-        company_id = await get_company_id_from_strategy(strategy_id, cursor)
+        company_id = await get_company_id_from_strategy(strategy_id, db)
         if not company_id:
             raise HTTPException(status_code=404, detail="Company not found for strategy")
         
         # Insert into database with the provided status
-        cursor.execute("""
+        schedule_weekday, schedule_hour = parse_schedule(best_time)
+        row = await db.fetchone("""
             INSERT INTO content_items (
                 strategy_id, company_id, user_id, platform, content_type,
-                caption, hashtags, media_link, best_time, status
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                caption, hashtags, media_link, best_time, status,
+                schedule_weekday, schedule_hour
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING id
         """, (
             strategy_id,
@@ -195,30 +174,23 @@ async def create_content_item(
             hashtags,
             media_link,
             best_time,
-            status
+            status,
+            schedule_weekday,
+            schedule_hour
         ))
         
-        content_id = cursor.fetchone()[0]
+        content_id = row[0]
         
-        # Run commit in thread pool
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, conn.commit)
+        await db.commit()
         
         return {"success": True, "content_id": content_id}
         
     except HTTPException:
         raise
     except Exception as e:
-        # Rollback on error
-        if 'conn' in locals():
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, conn.rollback)
         logger.error(f"Error creating content item: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        # Ensure database connection is properly released
-        if 'db_gen' in locals():
-            await db_gen.aclose()
         # Close media file if exists
         if media:
             await media.close()
@@ -236,16 +208,13 @@ async def update_content_item(
     best_time: str = Form(None),
     status: str = Form(None),
     media: UploadFile = File(None),
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     """Update an existing content item - Async version"""
     try:
-        # Get database connection
-        db_gen = get_db()
-        cursor, conn = await db_gen.__anext__()
-        
         # Verify content belongs to user and get current status
-        cursor.execute("""
+        result = await db.fetchone("""
             SELECT ci.id, ci.media_link, ci.status
             FROM content_items ci
             JOIN strategies s ON ci.strategy_id = s.id
@@ -253,7 +222,6 @@ async def update_content_item(
             WHERE ci.id = %s AND c.user_id = %s
         """, (content_id, user["user_id"]))
         
-        result = cursor.fetchone()
         if not result:
             raise HTTPException(status_code=404, detail="Content item not found")
         
@@ -287,7 +255,8 @@ async def update_content_item(
             os.unlink(temp_path)
         
         # Update in database
-        cursor.execute("""
+        schedule_weekday, schedule_hour = parse_schedule(best_time)
+        await db.execute("""
             UPDATE content_items
             SET platform = %s,
                 content_type = %s,
@@ -295,7 +264,9 @@ async def update_content_item(
                 hashtags = %s,
                 media_link = %s,
                 best_time = %s,
-                status = %s
+                status = %s,
+                schedule_weekday = %s,
+                schedule_hour = %s
             WHERE id = %s
         """, (
             platform,
@@ -305,28 +276,21 @@ async def update_content_item(
             media_link,
             best_time,
             final_status,
+            schedule_weekday,
+            schedule_hour,
             content_id
         ))
         
-        # Run commit in thread pool
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, conn.commit)
+        await db.commit()
         
         return {"success": True}
         
     except HTTPException:
         raise
     except Exception as e:
-        # Rollback on error
-        if 'conn' in locals():
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, conn.rollback)
         logger.error(f"Error updating content item: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        # Ensure database connection is properly released
-        if 'db_gen' in locals():
-            await db_gen.aclose()
         # Close media file if exists
         if media:
             await media.close()
@@ -335,15 +299,11 @@ async def update_content_item(
 
 # Return Content item
 @router.get("/get_content_item/{content_id}")
-async def get_content_item(content_id: int, user: dict = Depends(get_current_user)):
+async def get_content_item(content_id: int, user: dict = Depends(get_current_user), db = Depends(get_async_db)):
     """Get a specific content item - Async version"""
     try:
-        # Get database connection
-        db_gen = get_db()
-        cursor, conn = await db_gen.__anext__()
-        
         # Verify content belongs to user
-        cursor.execute("""
+        owned = await db.fetchone("""
             SELECT ci.id 
             FROM content_items ci
             JOIN strategies s ON ci.strategy_id = s.id
@@ -351,18 +311,17 @@ async def get_content_item(content_id: int, user: dict = Depends(get_current_use
             WHERE ci.id = %s AND c.user_id = %s
         """, (content_id, user["user_id"]))
         
-        if not cursor.fetchone():
+        if not owned:
             raise HTTPException(status_code=404, detail="Content item not found")
         
         # Get the content item
-        cursor.execute("""
+        item = await db.fetchone("""
             SELECT id, platform, content_type, caption, hashtags, 
                    media_link, video_placeholder, best_time, status
             FROM content_items
             WHERE id = %s
         """, (content_id,))
         
-        item = cursor.fetchone()
         if not item:
             raise HTTPException(status_code=404, detail="Content item not found")
         
@@ -383,23 +342,16 @@ async def get_content_item(content_id: int, user: dict = Depends(get_current_use
     except Exception as e:
         logger.error(f"Error getting content item: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if 'db_gen' in locals():
-            await db_gen.aclose()
 
 #---------------------------------------------------------------------------------------
 
 # Delete Content
 @router.delete("/delete_content_item/{content_id}")
-async def delete_content_item(content_id: int, user: dict = Depends(get_current_user)):
+async def delete_content_item(content_id: int, user: dict = Depends(get_current_user), db = Depends(get_async_db)):
     """Delete a content item - Async version"""
     try:
-        # Get database connection
-        db_gen = get_db()
-        cursor, conn = await db_gen.__anext__()
-        
         # Verify content belongs to user
-        cursor.execute("""
+        result = await db.fetchone("""
             SELECT ci.id, ci.media_link
             FROM content_items ci
             JOIN strategies s ON ci.strategy_id = s.id
@@ -407,28 +359,18 @@ async def delete_content_item(content_id: int, user: dict = Depends(get_current_
             WHERE ci.id = %s AND c.user_id = %s
         """, (content_id, user["user_id"]))
         
-        result = cursor.fetchone()
         if not result:
             raise HTTPException(status_code=404, detail="Content item not found")
         
         # Delete from database
-        cursor.execute("DELETE FROM content_items WHERE id = %s", (content_id,))
+        await db.execute("DELETE FROM content_items WHERE id = %s", (content_id,))
         
-        # Run commit in thread pool
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, conn.commit)
+        await db.commit()
         
         return {"success": True}
         
     except HTTPException:
         raise
     except Exception as e:
-        # Rollback on error
-        if 'conn' in locals():
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, conn.rollback)
         logger.error(f"Error deleting content item: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if 'db_gen' in locals():
-            await db_gen.aclose()
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
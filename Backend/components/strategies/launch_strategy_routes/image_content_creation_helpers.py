@@ -3,25 +3,23 @@
 import io
 import os
 import uuid
-import numpy as np
 import requests
 import shutil
 import asyncio
 import logging
 from typing import Optional, List, Tuple
-from collections import Counter
 from datetime import datetime
 from PIL import Image, ImageDraw, ImageFilter, ImageFont
-from sklearn.cluster import KMeans
 import concurrent.futures
 
 # Config db
-from config.config import get_db_cursor, get_db_connection, release_db_connection
+from config.async_db import db_connection
+from components.company.company_profile_cache import company_profile_cache
+from components.strategies.launch_strategy_routes.brand_kit import BrandKit, dominant_colors, fit_inside_box
 
 # Add Groq imports
 import logging
-from groq import AsyncGroq
-from config.config import settings
+from components.strategies.prompts.llm_gateway import llm_gateway
 
 # Logo description
 from components.helpers.image_analyzer import get_logo_description 
@@ -32,14 +30,6 @@ logger = logging.getLogger(__name__)
 # Thread pool for CPU-intensive operations
 image_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
 
-# Groq client for AI text generation
-GROQ_API_KEY = settings.GROQ_API_KEY_3
-groq_client = AsyncGroq(api_key=GROQ_API_KEY)
-
-# === DB Setup ===
-conn = get_db_connection()
-cursor = get_db_cursor(conn)
-
 #---------------------------------------------------------------------------------------
 
 
@@ -60,10 +50,7 @@ class UniversalSocialFramer:
     # Init
     
     def __init__(self):
-        # Initialize color variables (will be set from logo analysis)
-        self.BRAND_ColorDom = None   # Dominant color from logo
-        self.BRAND_ColorSec = None   # Secondary color from logo
-        self.additional_colors = []  # For logos with more than 2 colors
+        # Brand colors come from the brand kit of each post, the framer is shared by all requests
         self.TEXT_DARK = (60, 60, 60, 255)     # dark gray for text
         self.TEXT_LIGHT = (120, 120, 120, 255) # light gray for subtle text
         self.CORNER_RADIUS = 15      # 15px rounded corners
@@ -92,50 +79,8 @@ class UniversalSocialFramer:
 
     # -------- Color Detection Utilities --------
     def _get_dominant_colors(self, img: Image.Image, num_colors: int = 3) -> List[Tuple[int, int, int, int]]:
-        """Extract dominant colors from logo using K-means clustering."""
-        img = img.convert("RGBA")
-        resize_factor = 100 / min(img.size)
-        small_img = img.resize(
-            (int(img.width * resize_factor), int(img.height * resize_factor)),
-            Image.Resampling.LANCZOS
-        )
-        
-        arr = np.array(small_img)
-        arr = arr.reshape((-1, 4))
-        arr = arr[arr[:, 3] > 200]  # Filter out transparent pixels
-        
-        if len(arr) < num_colors:
-            return [(0, 179, 173, 255), (44, 27, 71, 255)]  # Fallback colors
-        
-        rgb = arr[:, :3]
-        kmeans = KMeans(n_clusters=num_colors, random_state=42)
-        kmeans.fit(rgb)
-        
-        counts = Counter(kmeans.labels_)
-        sorted_colors = sorted(
-            [(color, count) for color, count in zip(kmeans.cluster_centers_, counts.values())],
-            key=lambda x: -x[1]
-        )
-        
-        return [(int(r), int(g), int(b), 255) for (r, g, b), _ in sorted_colors]
-
-    # -------- Setting color --------
-    def _set_colors_from_logo(self, logo_image: Image.Image):
-        """Analyze logo and set color variables."""
-        colors = self._get_dominant_colors(logo_image)
-        
-        if len(colors) >= 1:
-            self.BRAND_ColorDom = colors[0]
-        else:
-            self.BRAND_ColorDom = (0, 179, 173, 255)  # Fallback teal
-            
-        if len(colors) >= 2:
-            self.BRAND_ColorSec = colors[1]
-        else:
-            self.BRAND_ColorSec = (44, 27, 71, 255)  # Fallback purple
-            
-        if len(colors) > 2:
-            self.additional_colors = colors[2:]
+        """Extract dominant colors from logo (brand kits keep the result per logo)."""
+        return dominant_colors(img, num_colors)
 
 
     # -------- Image Processing Utilities --------
@@ -258,18 +203,7 @@ class UniversalSocialFramer:
     # Fit
     def _fit_inside_box(self, img: Image.Image, box_w: int, box_h: int) -> Image.Image:
         """Resize img to fit within (box_w, box_h) preserving aspect ratio."""
-        iw, ih = img.size
-        img_ratio = iw / ih
-        box_ratio = box_w / box_h
-
-        if img_ratio > box_ratio:
-            new_w = box_w
-            new_h = int(new_w / img_ratio)
-        else:
-            new_h = box_h
-            new_w = int(new_h * img_ratio)
-
-        return img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+        return fit_inside_box(img, box_w, box_h)
 
     # Getting Font
     def get_font(self, size: int = 20, bold: bool = False):
@@ -288,7 +222,7 @@ class UniversalSocialFramer:
     async def build_frame_with_elements(
         self,
         main_image: Image.Image,
-        logo_image: Image.Image,
+        brand_kit: BrandKit,
         platform: str,
         content_type: str,
         company_id: int,  # Add company_id parameter
@@ -299,8 +233,8 @@ class UniversalSocialFramer:
         inner_pad_x: int = 40,
     ) -> Image.Image:
         """Create complete framed post with dynamic colors from logo."""
-        # First analyze the logo to set our brand colors
-        self._set_colors_from_logo(logo_image)
+        # Brand colors analyzed once per logo
+        brand_color = brand_kit.dominant
         
         # Get platform-specific dimensions
         W, H = self.get_platform_dimensions(platform, content_type)
@@ -309,8 +243,8 @@ class UniversalSocialFramer:
 
         # Add side rails for LinkedIn and Facebook, but not for Instagram Stories
         
-        draw.rectangle((0, 0, rail_w, H), fill=self.BRAND_ColorDom)
-        draw.rectangle((W - rail_w, 0, W, H), fill=self.BRAND_ColorDom)
+        draw.rectangle((0, 0, rail_w, H), fill=brand_color)
+        draw.rectangle((W - rail_w, 0, W, H), fill=brand_color)
 
         # Calculate content area
         logo_height_space = 160  # Fixed height for logo area (like original test code)
@@ -350,8 +284,7 @@ class UniversalSocialFramer:
             # Make logo bigger like in the original test code
         max_logo_w = int(W * 0.55)  # 55% of width (like original test code)
         max_logo_h = logo_height_space
-        logo_rgba = logo_image.convert("RGBA")
-        logo_fitted = self._fit_inside_box(logo_rgba, max_logo_w, max_logo_h)
+        logo_fitted = brand_kit.fitted_logo(max_logo_w, max_logo_h)
         logo_x = rail_w + inner_pad_x
         frame.paste(logo_fitted, (logo_x, top_margin), logo_fitted)
 
@@ -361,14 +294,14 @@ class UniversalSocialFramer:
         website_font = self.get_font(30)  # Larger font like original
         # website_text = "nearshorepublic.com"
         # Get website from database
-        cursor.execute("SELECT website FROM companies WHERE id = %s", (company_id,))
-        company_data = cursor.fetchone()
-        website_text = company_data[0] if company_data and company_data[0] else "CompanySite.com"
+        async with db_connection() as db:
+            company = await db.run(company_profile_cache.get, company_id)
+        website_text = company.website if company and company.website else "CompanySite.com"
     
             # Calculate position for right alignment
         bbox = draw.textbbox((0, 0), website_text, font=website_font)
         website_x = W - rail_w - inner_pad_x - (bbox[2] - bbox[0])
-        draw.text((website_x, bottom_y), website_text, font=website_font, fill=self.BRAND_ColorDom)
+        draw.text((website_x, bottom_y), website_text, font=website_font, fill=brand_color)
 
         return frame
 
@@ -376,7 +309,7 @@ class UniversalSocialFramer:
     async def create_post_from_images(
         self,
         main_image: Image.Image,
-        logo_image: Image.Image,
+        brand_kit: BrandKit,
         platform: str,
         content_type: str,
         company_id: int,
@@ -384,38 +317,33 @@ class UniversalSocialFramer:
     ) -> Image.Image:
         """High-level async method to create framed post"""
         return await self.build_frame_with_elements(
-            main_image, logo_image, platform, content_type, company_id, overlay_text
+            main_image, brand_kit, platform, content_type, company_id, overlay_text
         )
 
 
 # Text Overlay for the image
-async def generate_overlay_text(company_id: int, cursor) -> str:
+async def generate_overlay_text(company_id: int) -> str:
     """
     Generate a dynamic 4-word overlay text based on company profile - Async and non-blocking
     """
     try:
         logger.info(f"Generating overlay text for company_id: {company_id}")
         
-        # Fetch company data from database
-        cursor.execute("""
-            SELECT name, slogan, description, website, products, services,
-                   marketing_goals, target_age_groups, target_audience_types,
-                   target_business_types, target_geographics, preferred_platforms, 
-                   special_events, brand_tone, monthly_budget, logo_url
-            FROM companies 
-            WHERE id = %s
-        """, (company_id,))
-        
-        company_data = cursor.fetchone()
-        if not company_data:
+        # Fetch company data from database (released before the LLM call)
+        async with db_connection() as db:
+            company = await db.run(company_profile_cache.get, company_id)
+        
+        if not company:
             logger.warning(f"Company not found for ID: {company_id}, using fallback text")
             return "Quality Service Excellence"
         
         # Unpack company data
-        (name, slogan, description, website, products, services, 
-         marketing_goals, target_age_groups, target_audience_types,
-         target_business_types, target_geographics, preferred_platforms, 
-         special_events, brand_tone, monthly_budget, logo_url) = company_data
+        name, slogan, description, website = company.name, company.slogan, company.description, company.website
+        products, services, marketing_goals = company.products, company.services, company.marketing_goals
+        target_age_groups, target_audience_types = company.target_age_groups, company.target_audience_types
+        target_business_types, target_geographics = company.target_business_types, company.target_geographics
+        preferred_platforms, special_events = company.preferred_platforms, company.special_events
+        brand_tone, monthly_budget, logo_url = company.brand_tone, company.monthly_budget, company.logo_url
         
         # Get logo description
         logo_description = get_logo_description(logo_url) if logo_url else "No logo"
@@ -467,8 +395,8 @@ async def generate_overlay_text(company_id: int, cursor) -> str:
         Generate only the 4-word text, nothing else.
         """
         
-        # Call Groq API asynchronously (FIXED - no run_in_executor needed for AsyncGroq)
-        completion = await groq_client.chat.completions.create(
+        # Call Groq API through the shared key pool
+        completion = await llm_gateway.create(
             model="llama-3.1-8b-instant",
             messages=[
                 {
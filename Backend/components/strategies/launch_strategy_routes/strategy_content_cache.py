@@ -0,0 +1,79 @@
+# Imports
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+
+class StrategyContentCache:
+    """
+    Launch data parsed from approved strategies, keyed by strategy id and the md5
+    of the document. In-memory LRU in front of the strategy_content_cache table,
+    so a document is parsed once per edit instead of on every visit.
+    A changed document has a new hash, entries held by other workers simply miss.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # Used from the database threads, several requests at once
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _set_local(self, strategy_id: int, content_hash: str, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[strategy_id] = (content_hash, value)
+            self._entries.move_to_end(strategy_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, cursor, strategy_id: int, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Cached launch data of this version of the document, or None"""
+        with self._lock:
+            entry = self._entries.get(strategy_id)
+            if entry is not None and entry[0] == content_hash:
+                self._entries.move_to_end(strategy_id)
+                self.hits += 1
+                return entry[1]
+
+        cursor.execute("""
+            SELECT content FROM strategy_content_cache
+            WHERE strategy_id = %s AND content_hash = %s
+        """, (strategy_id, content_hash))
+        row = cursor.fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._set_local(strategy_id, content_hash, row[0])
+        return row[0]
+
+    def put(self, cursor, strategy_id: int, content_hash: str, value: Dict[str, Any]):
+        """Cache the launch data of this version of the document (caller commits)"""
+        cursor.execute("""
+            INSERT INTO strategy_content_cache (strategy_id, content_hash, content)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (strategy_id)
+            DO UPDATE SET content_hash = EXCLUDED.content_hash, content = EXCLUDED.content,
+                          created_at = NOW()
+        """, (strategy_id, content_hash, json.dumps(value)))
+        self._set_local(strategy_id, content_hash, value)
+
+    def invalidate(self, cursor, strategy_id: int):
+        """Drop the cached launch data of a strategy whose document was rewritten (caller commits)"""
+        with self._lock:
+            self._entries.pop(strategy_id, None)
+        cursor.execute("DELETE FROM strategy_content_cache WHERE strategy_id = %s", (strategy_id,))
+
+
+strategy_content_cache = StrategyContentCache(
+    max_entries=settings.STRATEGY_CONTENT_CACHE_MAX_ENTRIES
+)
@@ -1,19 +1,19 @@
-import asyncio
-from groq import AsyncGroq
-import aiohttp
-from config.config import settings
+import re
+from components.strategies.prompts.llm_stream import create_completion
+from components.strategies.prompts.prompt_budget import SECTION_BUDGETS
+from components.strategies.prompts.structured_sections import structured_output_enabled, generate_structured_section
 from datetime import datetime, timedelta
 import logging
-from config.config import get_db_connection, get_db_cursor, release_db_connection
+from psycopg2.extras import execute_values
 
-# Initialize Async Groq client
-GROQ_API_KEY = settings.GROQ_API_KEY_5
-client = AsyncGroq(api_key=GROQ_API_KEY)
 
 logger = logging.getLogger(__name__)
 
 
 async def generate_platform_strategies(company_data, current_date, logo_description):
+    # Fit the context into the section token budget
+    context_budget = SECTION_BUDGETS["platform_strategies"]
+    company_data = context_budget.fit_profile(company_data)
     
     
     # Format target audience
@@ -306,8 +306,19 @@ async def generate_platform_strategies(company_data, current_date, logo_descript
 
 
     
+    context_budget.log_prompt(prompt, 10240)
+
     try:
-        completion = await client.chat.completions.create(
+        if structured_output_enabled():
+            # Schema-validated JSON rendered with the section template
+            return await generate_structured_section(
+                "platform_strategies",
+                prompt,
+                model="openai/gpt-oss-120b",
+                temperature=0.25, max_completion_tokens=10240, top_p=1
+            )
+
+        content = await create_completion(
             model="openai/gpt-oss-120b",
             messages=[
                 {
@@ -318,146 +329,155 @@ async def generate_platform_strategies(company_data, current_date, logo_descript
             temperature=0.25,
             max_completion_tokens=10240,
             top_p=1,
-            stream=False,
             stop=None
         )
         
-        content = completion.choices[0].message.content
-        
         return content
     
     except Exception as e:
         logger.error(f"Failed to generate digital content strategy: {str(e)}")
         raise Exception(f"Event strategy generation failed: {str(e)}")
 
-async def save_content_items_to_db(strategy_id, company_id, user_id, content):
+# Columns of a content item, in insert order
+CONTENT_ITEM_FIELDS = (
+    'platform', 'content_type', 'description',
+    'frequency', 'best_time', 'image_prompt',
+    'video_idea', 'video_placeholder', 'story_idea',
+    'post_idea', 'caption', 'hashtags'
+)
+
+# Weekly slot of a schedule, ISO weekday (1 = Monday) and hour 0-23 (see 008_content_item_schedule.sql)
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+SCHEDULE_HOUR_PATTERN = re.compile(r'(\d{1,2})(?::\d{2})?\s*([AP]M)', re.IGNORECASE)
+
+def parse_schedule(best_time):
+    """(weekday, hour) of a schedule like "Thursday 9AM", None for the parts it doesn't have"""
+    if not best_time:
+        return None, None
+    weekday = next((number for number, day in enumerate(WEEKDAYS, 1) if day in best_time), None)
+    match = SCHEDULE_HOUR_PATTERN.search(best_time)
+    hour = int(match.group(1)) % 12 + (12 if match.group(2).upper() == 'PM' else 0) if match else None
+    return weekday, hour
+
+def content_items_from_data(data):
+    """Content items of a structured platform section, same fields as the parsed HTML"""
+    items = []
+    for plan in data.get('platforms', []):
+        for content_type in plan.get('content_types', []):
+            for item in content_type.get('items', []):
+                items.append({
+                    'platform': plan['platform'],
+                    'content_type': content_type['name'],
+                    'description': content_type.get('description'),
+                    'frequency': content_type.get('frequency'),
+                    'best_time': item.get('schedule') or content_type.get('best_time'),
+                    'image_prompt': item.get('image_prompt'),
+                    'video_idea': item.get('video_idea'),
+                    'video_placeholder': item.get('video_placeholder'),
+                    'story_idea': item.get('story_idea'),
+                    'post_idea': item.get('post_idea'),
+                    'caption': item.get('caption'),
+                    'hashtags': item.get('hashtags'),
+                })
+    return items
+
+# Paragraph prefixes of a content type and of an item, with the field they fill
+TYPE_PREFIXES = (
+    ('DESCRIPTION:', 'description'),
+    ('FREQUENCY:', 'frequency'),
+    ('BEST TIME:', 'best_time'),
+)
+ITEM_PREFIXES = (
+    ('IMAGE_PROMPT:', 'image_prompt'),
+    ('VIDEO_IDEA:', 'video_idea'),
+    ('VIDEO_PLACEHOLDER:', 'video_placeholder'),
+    ('STORY_IDEA:', 'story_idea'),
+    ('POST_IDEA:', 'post_idea'),
+    ('Schedule:', 'schedule'),
+    ('CAPTION:', 'caption'),
+    ('HASHTAGS:', 'hashtags'),
+)
+
+def parse_content_items(soup):
     """
-    Parse the strategy content and save individual content items to database
+    Content items of the platform section of a parsed strategy document.
+    Headings and paragraphs are read once in document order: h3 PLATFORM opens a
+    platform, h4 TYPE a content type, h5 ITEM an item, paragraphs fill the open block.
     """
-    from bs4 import BeautifulSoup
-    
-    # Run the database operations in thread pool to avoid blocking
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, _save_content_items_sync, strategy_id, company_id, user_id, content)
-
-def _save_content_items_sync(strategy_id, company_id, user_id, content):
+    # Only the platform section holds content items
+    root = soup.find('section', class_='social-media-strategy') or soup
+
+    # (platform name, content type fields, item fields) in document order
+    records = []
+    platform_name = content_type = item = None
+
+    for tag in root.find_all(['h3', 'h4', 'h5', 'p']):
+        text = tag.get_text().strip()
+
+        if tag.name == 'h3':
+            if 'PLATFORM:' in text:
+                platform_name = text.replace('PLATFORM:', '').strip()
+                content_type = item = None
+        elif tag.name == 'h4':
+            if platform_name is not None and 'TYPE:' in text:
+                content_type = {'name': text.replace('TYPE:', '').strip()}
+                item = None
+        elif tag.name == 'h5':
+            if content_type is not None and 'ITEM' in text:
+                item = {}
+                records.append((platform_name, content_type, item))
+        elif content_type is not None:
+            # The first description/frequency/best time of the content type is kept
+            for prefix, field in TYPE_PREFIXES:
+                if text.startswith(prefix):
+                    content_type.setdefault(field, text.replace(prefix, '').strip())
+                    break
+            else:
+                if item is not None:
+                    for prefix, field in ITEM_PREFIXES:
+                        if text.startswith(prefix):
+                            item[field] = text.replace(prefix, '').strip()
+                            break
+
+    items = []
+    for platform_name, content_type, item in records:
+        # Clean up any extra spaces in the schedule (Day HourAM/PM)
+        schedule_time = ' '.join((item.get('schedule') or '').split())
+        items.append({
+            'platform': platform_name,
+            'content_type': content_type['name'],
+            'description': content_type.get('description'),
+            'frequency': content_type.get('frequency'),
+            # Use schedule time if available, otherwise use best_time
+            'best_time': schedule_time or content_type.get('best_time'),
+            'image_prompt': item.get('image_prompt'),
+            'video_idea': item.get('video_idea'),
+            'video_placeholder': item.get('video_placeholder'),
+            'story_idea': item.get('story_idea'),
+            'post_idea': item.get('post_idea'),
+            'caption': item.get('caption'),
+            'hashtags': item.get('hashtags'),
+        })
+
+    return items
+
+def insert_content_items(cursor, strategy_id, company_id, user_id, items):
     """
-    Synchronous version of save_content_items_to_db to run in thread pool
+    Insert the content items extracted from the strategy (see strategy_index)
+    in one batched statement (caller commits)
     """
-    from bs4 import BeautifulSoup
-
-    conn = get_db_connection()
-    cursor = get_db_cursor(conn)
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # Find all platform divs
-    platform_divs = soup.find_all('div')
-    
-    for platform_div in platform_divs:
-        # Look for h3 with platform name
-        platform_h3 = platform_div.find('h3')
-        if not platform_h3 or 'PLATFORM:' not in platform_h3.get_text():
-            continue
-            
-        platform_name = platform_h3.get_text().replace('PLATFORM:', '').strip()
-        
-        # Find all content type divs within this platform
-        content_type_divs = platform_div.find_all('div', recursive=False)
-        
-        for content_type_div in content_type_divs:
-            # Look for h4 with content type
-            type_h4 = content_type_div.find('h4')
-            if not type_h4 or 'TYPE:' not in type_h4.get_text():
-                continue
-                
-            type_name = type_h4.get_text().replace('TYPE:', '').strip()
-            
-            # Extract description, frequency, and best_time
-            description_p = content_type_div.find('p', string=lambda t: t and t.startswith('DESCRIPTION:'))
-            frequency_p = content_type_div.find('p', string=lambda t: t and t.startswith('FREQUENCY:'))
-            best_time_p = content_type_div.find('p', string=lambda t: t and t.startswith('BEST TIME:'))
-            
-            description = description_p.get_text().replace('DESCRIPTION:', '').strip() if description_p else None
-            frequency = frequency_p.get_text().replace('FREQUENCY:', '').strip() if frequency_p else None
-            best_time = best_time_p.get_text().replace('BEST TIME:', '').strip() if best_time_p else None
-            
-            # Find all item divs (look for h5 with ITEM)
-            item_divs = []
-            for item_h5 in content_type_div.find_all('h5', string=lambda t: t and 'ITEM' in t):
-                item_div = item_h5.find_parent('div')
-                if item_div and item_div not in item_divs:
-                    item_divs.append(item_div)
-            
-            for item_div in item_divs:
-                # Initialize all fields
-                image_prompt = None
-                video_idea = None
-                video_placeholder = None
-                story_idea = None
-                post_idea = None
-                caption = None
-                hashtags = None
-                schedule_time = None
-                
-                # Extract all paragraphs in this item
-                all_ps = item_div.find_all('p')
-                
-                for p in all_ps:
-                    text = p.get_text().strip()
-                    
-                    if text.startswith('IMAGE_PROMPT:'):
-                        image_prompt = text.replace('IMAGE_PROMPT:', '').strip()
-                    elif text.startswith('VIDEO_IDEA:'):
-                        video_idea = text.replace('VIDEO_IDEA:', '').strip()
-                    elif text.startswith('VIDEO_PLACEHOLDER:'):
-                        video_placeholder = text.replace('VIDEO_PLACEHOLDER:', '').strip()
-                    elif text.startswith('STORY_IDEA:'):
-                        story_idea = text.replace('STORY_IDEA:', '').strip()
-                    elif text.startswith('POST_IDEA:'):
-                        post_idea = text.replace('POST_IDEA:', '').strip()
-                    elif text.startswith('Schedule:'):
-                        schedule_time = text.replace('Schedule:', '').strip()
-                        # Ensure the format is correct (Day HourAM/PM)
-                        if schedule_time:
-                            # Clean up any extra spaces or formatting issues
-                            schedule_time = ' '.join(schedule_time.split())
-                    elif text.startswith('CAPTION:'):
-                        caption = text.replace('CAPTION:', '').strip()
-                    elif text.startswith('HASHTAGS:'):
-                        hashtags = text.replace('HASHTAGS:', '').strip()
-                
-                # Use schedule time if available, otherwise use best_time
-                final_time = schedule_time if schedule_time else best_time
-                
-                # Save to database
-                try:
-                    cursor.execute("""
-                        INSERT INTO content_items (
-                            strategy_id, company_id, user_id,
-                            platform, content_type, description,
-                            frequency, best_time, image_prompt,
-                            video_idea, video_placeholder, story_idea,
-                            post_idea, caption, hashtags
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        strategy_id, company_id, user_id,
-                        platform_name, type_name, description,
-                        frequency, final_time, image_prompt,
-                        video_idea, video_placeholder, story_idea,
-                        post_idea, caption, hashtags
-                    ))
-                    print(f"Saved item for {platform_name} - {type_name}")
-                    print(f"Schedule time: {final_time}")
-                    print(f"Caption length: {len(caption) if caption else 0}")
-                except Exception as e:
-                    print(f"Error saving item: {e}")
-                    logger.error(f"Error saving content item: {e}")
-    
-    try:
-        conn.commit()
-        print("Successfully committed all content items to database")
-    except Exception as e:
-        print(f"Error committing to database: {e}")
-        logger.error(f"Error committing content items: {e}")
-    finally:
-        release_db_connection(conn)
\ No newline at end of file
+    if not items:
+        return
+
+    execute_values(cursor, f"""
+        INSERT INTO content_items (
+            strategy_id, company_id, user_id, {', '.join(CONTENT_ITEM_FIELDS)},
+            schedule_weekday, schedule_hour
+        ) VALUES %s
+    """, [
+        (strategy_id, company_id, user_id)
+        + tuple(item[field] for field in CONTENT_ITEM_FIELDS)
+        + parse_schedule(item['best_time'])
+        for item in items
+    ], page_size=1000)
+    logger.info(f"Saved {len(items)} content items for strategy {strategy_id}")
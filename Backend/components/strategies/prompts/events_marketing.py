@@ -2,14 +2,11 @@ import logging
 import re
 import asyncio
 from fastapi import logger
-from groq import AsyncGroq
-import aiohttp
-from config.config import settings
+from components.strategies.prompts.llm_stream import create_completion
+from components.strategies.prompts.prompt_budget import SECTION_BUDGETS
+from components.strategies.prompts.structured_sections import structured_output_enabled, generate_structured_section
 from datetime import datetime, timedelta
 
-# Initialize Async Groq client
-GROQ_API_KEY = settings.GROQ_API_KEY_3
-client = AsyncGroq(api_key=GROQ_API_KEY)
 
 logger = logging.getLogger(__name__)
    
@@ -46,6 +43,11 @@ async def generate_event_strategy(summary_part: str, budget_part: str, company_d
     """
     Generate an event participation strategy focusing on the most relevant events
     """
+    # Fit the context into the section token budget
+    context_budget = SECTION_BUDGETS["events_marketing"]
+    company_data = context_budget.fit_profile(company_data)
+    events_text = context_budget.fit_events_text(events_text)
+    events_list = context_budget.fit_events(events_list)
     # Current Date
     current_time = await get_current_datetime()
  
@@ -164,8 +166,19 @@ async def generate_event_strategy(summary_part: str, budget_part: str, company_d
     </section>
     """
 
+    context_budget.log_prompt(prompt, 4096)
+
     try:
-        completion = await client.chat.completions.create(
+        if structured_output_enabled():
+            # Schema-validated JSON rendered with the section template
+            return await generate_structured_section(
+                "events_marketing",
+                prompt,
+                model="openai/gpt-oss-120b",
+                temperature=0.3, max_completion_tokens=4096, top_p=1
+            )
+
+        content = await create_completion(
             model="openai/gpt-oss-120b",
             messages=[
                 {
@@ -176,12 +189,9 @@ async def generate_event_strategy(summary_part: str, budget_part: str, company_d
             temperature=0.3,
             max_completion_tokens=4096,
             top_p=1,
-            stream=False,
             stop=None
         )
         
-        content = completion.choices[0].message.content
-        
         # Clean the response to remove markdown formatting
         cleaned_content = await clean_html_response(content)
         print(events_text)
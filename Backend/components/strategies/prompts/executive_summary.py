@@ -2,7 +2,10 @@
 import re
 import asyncio
 import aiohttp
-from groq import AsyncGroq
+from components.strategies.prompts.llm_stream import create_completion
+from components.strategies.prompts.prompt_budget import SECTION_BUDGETS
+from components.strategies.prompts.structured_sections import structured_output_enabled, generate_structured_section
+from components.strategies.prompts.research_cache import tavily_search
 from config.config import settings
 from datetime import datetime
 import logging
@@ -12,9 +15,6 @@ from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
-# Initialize async Groq client
-GROQ_API_KEY = settings.GROQ_API_KEY_7
-client = AsyncGroq(api_key=GROQ_API_KEY)
 
 # Tavily Search tool api
 TAVILY_API_KEY = settings.TAVILY_API_KEY_3
@@ -27,8 +27,6 @@ async def search_company_info(company_name: str, slogan: str) -> Optional[str]:
     Async search for additional company information and industry insights
     """
     try:
-        tavily_url = "https://api.tavily.com/search"
-        
         search_queries = [
             f"marketing trends",
             f"digital marketing strategies",
@@ -36,41 +34,38 @@ async def search_company_info(company_name: str, slogan: str) -> Optional[str]:
         
         all_results = []
         
-        async with aiohttp.ClientSession() as session:
-            for query in search_queries:
-                payload = {
-                    "api_key": TAVILY_API_KEY,
-                    "query": query,
-                    "search_depth": "advanced",
-                    "include_answer": True,
-                    "include_images": False,
-                    "include_raw_content": False,
-                    "max_results": 1
-                }
+        for query in search_queries:
+            try:
+                # Company independent queries, usually answered by the research cache
+                data = await tavily_search(
+                    TAVILY_API_KEY,
+                    query,
+                    search_depth="advanced",
+                    include_answer=True,
+                    include_images=False,
+                    include_raw_content=False,
+                    max_results=1
+                )
                 
-                try:
-                    async with session.post(tavily_url, json=payload, timeout=30) as response:
-                        response.raise_for_status()
-                        data = await response.json()
-                        
-                        if data.get('results'):
-                            for result in data['results']:
-                                all_results.append({
-                                    'title': result.get('title', ''),
-                                    'content': result.get('content', ''),
-                                    'url': result.get('url', '')
-                                })
-                        
-                        await asyncio.sleep(1)  # Rate limiting
-                
-                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                    logger.warning(f"Search query failed for '{query}': {str(e)}")
-                    continue
+                if data.get('results'):
+                    for result in data['results']:
+                        all_results.append({
+                            'title': result.get('title', ''),
+                            'content': result.get('content', ''),
+                            'url': result.get('url', ''),
+                            'score': result.get('score', 0)
+                        })
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Search query failed for '{query}': {str(e)}")
+                continue
         
         if all_results:
+            # Best snippets that fit the section research budget
+            findings = SECTION_BUDGETS["executive_summary"].fit_research(all_results, f"{company_name} {slogan}")
             return f"""
             Company & Industry Research Findings:
-            {str(all_results)[:2500]}
+            {findings}
             """
         
         return None
@@ -153,6 +148,9 @@ async def generate_executive_summary(company_data: Dict[str, Any], current_date:
     """
     Async generate executive summary with real-time company research and market insights
     """
+    # Fit the context into the section token budget
+    context_budget = SECTION_BUDGETS["executive_summary"]
+    company_data = context_budget.fit_profile(company_data)
     current_year = current_date.year
     
     # Format target audience
@@ -251,8 +249,20 @@ async def generate_executive_summary(company_data: Dict[str, Any], current_date:
     
     """
 
+    context_budget.log_prompt(prompt, 2048)
+
     try:
-        completion = await client.chat.completions.create(
+        if structured_output_enabled():
+            # Schema-validated JSON rendered with the section template
+            return await generate_structured_section(
+                "executive_summary",
+                prompt,
+                context={"company_name": company_data['name'], "period": current_date.strftime('%B %Y')},
+                model="openai/gpt-oss-120b",
+                temperature=0.4, max_completion_tokens=2048, top_p=1, reasoning_effort="medium"
+            )
+
+        content = await create_completion(
             model="openai/gpt-oss-120b",
             messages=[
                 {
@@ -264,19 +274,15 @@ async def generate_executive_summary(company_data: Dict[str, Any], current_date:
             max_completion_tokens=2048,
             top_p=1,
             reasoning_effort="medium",
-            stream=False,
             stop=None
         )
         
-        content = completion.choices[0].message.content
-        
         # Validate HTML structure asynchronously
         content = await validate_executive_summary_html(content)
         
         # Clean the response to remove markdown formatting asynchronously
         cleaned_content = await clean_html_response(content)
         
-        await asyncio.sleep(2)  # Non-blocking delay
         return cleaned_content
         
     except Exception as e:
@@ -2,11 +2,13 @@ import asyncio
 import random
 import aiohttp
 import aiofiles
-from groq import AsyncGroq
-from bs4 import BeautifulSoup
+from components.strategies.prompts.llm_stream import create_completion
+from components.strategies.prompts.prompt_budget import SECTION_BUDGETS
+from components.strategies.prompts.structured_sections import structured_output_enabled, generate_structured_section
+from components.strategies.prompts.research_cache import tavily_search
 from config.config import settings
 import logging
-from config.config import get_db_connection, get_db_cursor, release_db_connection
+from psycopg2.extras import execute_values
 from typing import List, Dict, Any, Optional
 import json
 import re
@@ -14,9 +16,6 @@ import os
 
 logger = logging.getLogger(__name__)
 
-# Initialize Groq client
-GROQ_API_KEY = settings.GROQ_API_KEY_4
-client = AsyncGroq(api_key=GROQ_API_KEY)
 
 # Firecrawl API configuration
 FIRECRAWL_API_KEY = settings.FIRECRAWL_API_KEY_2
@@ -385,31 +384,24 @@ async def search_additional_influencer_data(influencers: List[Dict[str, Any]]):
                 # Search for engagement data
                 search_query = f"{name} {handle} engagement rate growth Tunisia"
                 
-                payload = {
-                    "api_key": TAVILY_API_KEY,
-                    "query": search_query,
-                    "search_depth": "basic",
-                    "include_answer": True,
-                    "max_results": 2
-                }
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(TAVILY_API_URL, json=payload, timeout=30) as response:
-                        if response.ok:
-                            data = await response.json()
-                            
-                            # Try to extract engagement rate from results
-                            if data.get('results'):
-                                for result in data['results']:
-                                    content = result.get('content', '').lower()
-                                    if 'engagement' in content and '%' in content:
-                                        # Look for engagement rate pattern
-                                        engagement_match = re.search(r'(\d+\.?\d*)%', content)
-                                        if engagement_match:
-                                            enhanced_inf['engagement_rate'] = f"{engagement_match.group(1)}%"
-                                            break
+                data = await tavily_search(
+                    TAVILY_API_KEY,
+                    search_query,
+                    search_depth="basic",
+                    include_answer=True,
+                    max_results=2
+                )
                 
-                await asyncio.sleep(1)  # Rate limiting
+                # Try to extract engagement rate from results
+                if data.get('results'):
+                    for result in data['results']:
+                        content = result.get('content', '').lower()
+                        if 'engagement' in content and '%' in content:
+                            # Look for engagement rate pattern
+                            engagement_match = re.search(r'(\d+\.?\d*)%', content)
+                            if engagement_match:
+                                enhanced_inf['engagement_rate'] = f"{engagement_match.group(1)}%"
+                                break
                 
             except Exception as e:
                 logger.warning(f"Failed to search additional data for {name}: {str(e)}")
@@ -444,6 +436,11 @@ async def generate_influencer_recommendations(summary_part: str, budget_part: st
     """
     Generate influencer recommendations using both web scraped and JSON data
     """
+    # Fit the context into the section token budget
+    context_budget = SECTION_BUDGETS["influencer_section"]
+    company_data = context_budget.fit_profile(company_data)
+    products = company_data.get('products') or products
+    services = company_data.get('services') or services
     # Load influencers from both sources
     json_influencers_task = asyncio.create_task(load_json_influencers())
     web_influencers_task = asyncio.create_task(scrape_tunisian_influencers())
@@ -588,117 +585,121 @@ async def generate_influencer_recommendations(summary_part: str, budget_part: st
         - Tailor recommendations to match the company niche: {company_niche}
     """
 
+    context_budget.log_prompt(prompt, 8192)
+
     try:
-        completion = await client.chat.completions.create(
+        if structured_output_enabled():
+            # Schema-validated JSON rendered with the section template
+            return await generate_structured_section(
+                "influencer_section",
+                prompt,
+                context={"company_name": company_data['name']},
+                model="openai/gpt-oss-120b",
+                temperature=0.3, max_completion_tokens=8192, top_p=1
+            )
+
+        content = await create_completion(
             model="openai/gpt-oss-120b",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
             max_completion_tokens=8192,
             top_p=1,
-            stream=False
         )
-    
-        content = completion.choices[0].message.content
         
         # Clean the response to remove markdown formatting
         cleaned_content = await clean_html_response(content)
         
-        await asyncio.sleep(4)
         return cleaned_content
 
     except Exception as e:
         logger.error(f"Failed to generate influencer recommendations: {str(e)}")
         return "<section class='influencer-recommendations'><h2>Error: Could not generate recommendations</h2></section>"
 
-async def extract_and_save_influencers(strategy_id: int, company_id: int, user_id: int, strategy_content: str):
-    """Extract influencer data from strategy content and save to database"""
-    conn = None
-    cursor = None
+# Columns of an influencer, in insert order
+INFLUENCER_FIELDS = (
+    'name', 'email', 'followers', 'platform', 'handle', 'niche',
+    'engagement_rate', 'collaboration_type', 'price_range', 'email_text'
+)
 
-    try:
-        conn = get_db_connection()
-        cursor = get_db_cursor(conn)
-
-        soup = BeautifulSoup(strategy_content, 'html.parser')
-        influencer_section = soup.find('section', class_='influencer-recommendations')
-
-        if not influencer_section:
-            logger.warning("No influencer section found in strategy content")
-            return
-
-        influencer_cards = influencer_section.find_all('div', class_='influencer-card')
-        email_textareas = influencer_section.find_all('textarea', class_='editable-email')
-
-        logger.info(f"Found {len(influencer_cards)} influencer cards and {len(email_textareas)} email textareas")
-
-        for idx, card in enumerate(influencer_cards):
-            logger.info(f"Processing influencer {idx}")
-
-            # Extract data from each card
-            data = {
-                'name': extract_field(card, 'INFLUENCER_NAME:'),
-                'email': extract_field(card, 'EMAIL:'),
-                'followers': extract_field(card, 'FOLLOWERS:'),
-                'platform': extract_field(card, 'Platform:', after_key=True),
-                'handle': extract_field(card, 'HANDLE:'),
-                'niche': extract_field(card, 'NICHE:'),
-                'engagement_rate': extract_field(card, 'ENGAGEMENT_RATE:'),
-                'collaboration_type': extract_field(card, 'COLLABORATION_TYPE:'),
-                'price_range': extract_price_range(card),
-                'email_text': None,
-            }
-            
-            # Generate email from handle if email is missing or invalid
-            email = data.get('email', '')
-            if not email or email.lower() in ['n/a', 'null', 'none', '', 'dms']:
-                data['email'] = generate_email_from_handle(data.get('handle', ''))
-
-            # Get the corresponding email textarea content
-            if idx < len(email_textareas):
-                textarea = email_textareas[idx]
-                email_content = textarea.get_text() if textarea else None
-                if email_content:
-                    data['email_text'] = email_content.strip()
-                    logger.info(f"Extracted email for influencer {idx}: {len(email_content)} characters")
-                else:
-                    logger.warning(f"No email content found for influencer {idx}")
+def insert_influencers(cursor, strategy_id: int, company_id: int, user_id: int, influencers: List[Dict[str, Any]]):
+    """
+    Insert the influencers extracted from the strategy (see strategy_index)
+    in one batched statement (caller commits)
+    """
+    if not influencers:
+        return
+
+    rows = []
+    for email_index, influencer in enumerate(influencers):
+        # Generate email from handle if email is missing or invalid
+        email = influencer.get('email') or ''
+        if not email or email.lower() in ['n/a', 'null', 'none', '', 'dms']:
+            email = generate_email_from_handle(influencer.get('handle', ''))
+        rows.append(
+            (strategy_id, company_id, user_id, email_index)
+            + tuple(email if field == 'email' else influencer.get(field) for field in INFLUENCER_FIELDS)
+        )
+
+    execute_values(cursor, f"""
+        INSERT INTO influencers (
+            strategy_id, company_id, user_id, email_index, {', '.join(INFLUENCER_FIELDS)}
+        ) VALUES %s
+    """, rows)
+    logger.info(f"Saved {len(rows)} influencers for strategy {strategy_id}")
+
+def influencers_from_data(data: dict) -> List[Dict[str, Any]]:
+    """Influencers of a structured influencer section"""
+    return [
+        {field: influencer.get(field) for field in INFLUENCER_FIELDS}
+        for influencer in data.get('influencers', [])
+    ]
+
+def parse_influencers(soup) -> List[Dict[str, Any]]:
+    """Influencers of the influencer section of a parsed strategy document"""
+    influencer_section = soup.find('section', class_='influencer-recommendations')
+
+    if not influencer_section:
+        logger.warning("No influencer section found in strategy content")
+        return []
+
+    influencer_cards = influencer_section.find_all('div', class_='influencer-card')
+    email_textareas = influencer_section.find_all('textarea', class_='editable-email')
+
+    logger.info(f"Found {len(influencer_cards)} influencer cards and {len(email_textareas)} email textareas")
+
+    influencers = []
+    for idx, card in enumerate(influencer_cards):
+        logger.info(f"Processing influencer {idx}")
+
+        # Extract data from each card
+        data = {
+            'name': extract_field(card, 'INFLUENCER_NAME:'),
+            'email': extract_field(card, 'EMAIL:'),
+            'followers': extract_field(card, 'FOLLOWERS:'),
+            'platform': extract_field(card, 'Platform:', after_key=True),
+            'handle': extract_field(card, 'HANDLE:'),
+            'niche': extract_field(card, 'NICHE:'),
+            'engagement_rate': extract_field(card, 'ENGAGEMENT_RATE:'),
+            'collaboration_type': extract_field(card, 'COLLABORATION_TYPE:'),
+            'price_range': extract_price_range(card),
+            'email_text': None,
+        }
+
+        # Get the corresponding email textarea content
+        if idx < len(email_textareas):
+            textarea = email_textareas[idx]
+            email_content = textarea.get_text() if textarea else None
+            if email_content:
+                data['email_text'] = email_content.strip()
+                logger.info(f"Extracted email for influencer {idx}: {len(email_content)} characters")
             else:
-                logger.warning(f"No textarea found for influencer {idx}")
+                logger.warning(f"No email content found for influencer {idx}")
+        else:
+            logger.warning(f"No textarea found for influencer {idx}")
 
-            try:
-                # Save to database
-                cursor.execute("""
-                    INSERT INTO influencers (
-                        strategy_id, company_id, user_id, name, email, followers, 
-                        platform, handle, niche, engagement_rate, collaboration_type,
-                        price_range, email_text
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    strategy_id, company_id, user_id,
-                    data['name'], data['email'], data['followers'],
-                    data['platform'], data['handle'], data['niche'],
-                    data['engagement_rate'], data['collaboration_type'],
-                    data['price_range'], data['email_text']
-                ))
-
-                logger.info(f"Successfully saved influencer {idx}: {data['name']} with email length: {len(data['email_text']) if data['email_text'] else 0}")
-
-            except Exception as insert_error:
-                logger.error(f"Failed to insert influencer {idx}: {str(insert_error)}")
-                continue   
-
-        conn.commit()
-        logger.info(f"Successfully committed all influencers for strategy {strategy_id}")
+        influencers.append(data)
 
-    except Exception as e:
-        logger.error(f"Failed to extract influencers: {str(e)}")
-        if conn:
-            conn.rollback()
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            release_db_connection(conn)
+    return influencers
 
 def extract_field(card, key, after_key=False):
     """Helper to extract field values from influencer card"""
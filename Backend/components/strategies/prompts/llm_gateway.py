@@ -0,0 +1,152 @@
+# Imports
+import re
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+from groq import AsyncGroq, RateLimitError
+from config.config import settings
+from components.helpers.rate_limiter import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# Cool-down applied to a key after a 429 without retry-after header
+DEFAULT_RETRY_AFTER = 5.0
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Groq reset headers look like '2m59.56s', '7.66s' or '120ms', returns seconds"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    seconds = 0.0
+    for amount, unit in re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value):
+        seconds += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return seconds
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class GroqKey:
+    """One API key with its client, concurrency slots and last known rate-limit state"""
+
+    def __init__(self, name: str, api_key: str, max_concurrency: int):
+        self.name = name
+        self.bucket = rate_limiter.bucket("groq", api_key)
+        # Retries are done by the gateway, on another key
+        self.client = AsyncGroq(api_key=api_key, max_retries=0)
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+        self.cooldown_until = 0.0
+
+    def update_from_headers(self, headers):
+        now = time.monotonic()
+        remaining_requests = _int_header(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _int_header(headers, "x-ratelimit-remaining-tokens")
+        if remaining_requests is not None:
+            self.remaining_requests = remaining_requests
+            self.requests_reset_at = now + (parse_reset(headers.get("x-ratelimit-reset-requests")) or 0)
+        if remaining_tokens is not None:
+            self.remaining_tokens = remaining_tokens
+            self.tokens_reset_at = now + (parse_reset(headers.get("x-ratelimit-reset-tokens")) or 0)
+
+    def rate_limited(self, headers):
+        retry_after = parse_reset(headers.get("retry-after")) if headers is not None else None
+        self.cooldown_until = time.monotonic() + (retry_after or DEFAULT_RETRY_AFTER)
+        self.remaining_requests = 0
+
+    def headroom(self, now: float):
+        """Sort key, bigger is better. Unknown or expired counters count as a full window"""
+        tokens = self.remaining_tokens if self.remaining_tokens is not None and now < self.tokens_reset_at else float("inf")
+        requests = self.remaining_requests if self.remaining_requests is not None and now < self.requests_reset_at else float("inf")
+        return (
+            self.in_flight < self.max_concurrency,
+            min(requests, 1) > 0 and self.bucket.available() >= 1,
+            tokens, requests, -self.in_flight
+        )
+
+
+class LLMGateway:
+    """
+    Pool of every configured Groq key. Each call goes to the key with the most
+    rate-limit headroom (from the last response headers), with a concurrency
+    cap per key, and a 429 is retried on another key.
+    """
+
+    def __init__(self, api_keys: List[str], max_concurrency_per_key: int = 4):
+        self.keys = [
+            GroqKey(f"key_{n}", api_key, max_concurrency_per_key)
+            for n, api_key in enumerate(api_keys, start=1)
+        ]
+        self.max_attempts = max(len(self.keys), 2)
+
+    def _pick(self, tried: set) -> GroqKey:
+        now = time.monotonic()
+        candidates = [key for key in self.keys if key.name not in tried] or self.keys
+        ready = [key for key in candidates if key.cooldown_until <= now]
+        if ready:
+            return max(ready, key=lambda key: key.headroom(now))
+        # Every key is cooling down, take the one available first
+        return min(candidates, key=lambda key: key.cooldown_until)
+
+    async def create(self, consume: Optional[Callable[[Any], Awaitable[Any]]] = None, **kwargs) -> Any:
+        """
+        chat.completions.create on the best key. The key slot is held until consume()
+        returns, so a streamed response counts against its key while it is read.
+        """
+        if not self.keys:
+            raise RuntimeError("No Groq API key configured")
+
+        tried = set()
+        for attempt in range(1, self.max_attempts + 1):
+            key = self._pick(tried)
+            tried.add(key.name)
+
+            wait = key.cooldown_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            async with key.slots:
+                await key.bucket.acquire()
+                key.in_flight += 1
+                try:
+                    raw = await key.client.chat.completions.with_raw_response.create(**kwargs)
+                    key.update_from_headers(raw.headers)
+                    result = await raw.parse()
+                    return await consume(result) if consume else result
+
+                except RateLimitError as e:
+                    key.rate_limited(getattr(e.response, "headers", None))
+                    logger.warning(f"Groq {key.name} rate limited (attempt {attempt}/{self.max_attempts})")
+                    if attempt == self.max_attempts:
+                        raise
+                finally:
+                    key.in_flight -= 1
+
+
+def _configured_keys() -> List[str]:
+    keys = [
+        settings.GROQ_API_KEY_1, settings.GROQ_API_KEY_2, settings.GROQ_API_KEY_3,
+        settings.GROQ_API_KEY_4, settings.GROQ_API_KEY_5, settings.GROQ_API_KEY_6,
+        settings.GROQ_API_KEY_7
+    ]
+    # Same key configured twice shares one rate limit
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+llm_gateway = LLMGateway(_configured_keys(), settings.LLM_MAX_CONCURRENCY_PER_KEY)
@@ -0,0 +1,99 @@
+# Imports
+import re
+import time
+import logging
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+from components.strategies.prompts.llm_gateway import llm_gateway
+
+logger = logging.getLogger(__name__)
+
+# Sink receiving the partial (cleaned) HTML of the section being generated, as
+# sink(text, replace): the HTML written since the last call, or with replace=True the
+# whole HTML so far (cleaning rewrote what was already sent, rare).
+# Set per section task by the section executor, None means no streaming.
+section_stream: ContextVar[Optional[Callable[[str, bool], Awaitable[None]]]] = ContextVar("section_stream", default=None)
+
+# Minimum seconds between two partial pushes to the sink
+STREAM_FLUSH_INTERVAL = 0.25
+
+
+def clean_html_text(content: str) -> str:
+    """
+    Clean the AI response by removing markdown code blocks and extra formatting
+    (same rules as the prompt modules' clean_html_response, usable on partial output)
+    """
+    # Remove ```html and ``` markers
+    content = re.sub(r'```html\s*', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'```\s*$', '', content, flags=re.MULTILINE)
+    content = re.sub(r'```', '', content)
+
+    # Remove any leading/trailing whitespace
+    content = content.strip()
+
+    # Ensure content starts with <section
+    if not content.startswith('<section'):
+        # Find the first <section tag
+        section_match = re.search(r'<section.*?>', content, re.DOTALL)
+        if section_match:
+            start_index = content.find(section_match.group())
+            content = content[start_index:]
+
+    return content
+
+
+async def _push(sink, content: str, sent: str, final: bool = False) -> str:
+    """
+    Send the cleaned HTML written since the last push to the sink and return all the
+    HTML sent so far. Streaming problems never fail the generation.
+    """
+    cleaned = clean_html_text(content)
+    if not final:
+        # Held back until more text follows, a code fence could still strip them
+        cleaned = cleaned.rstrip(' \t\r\n`')
+    if not cleaned.startswith('<') or cleaned == sent:
+        return sent
+    try:
+        if cleaned.startswith(sent):
+            await sink(cleaned[len(sent):], False)
+        else:
+            await sink(cleaned, True)
+    except Exception as e:
+        logger.warning(f"Failed to relay partial section output: {str(e)}")
+    return cleaned
+
+
+async def create_completion(**kwargs) -> str:
+    """
+    Run a chat completion through the key-pool gateway and return the message content.
+    If a section stream is active the completion is streamed and the partial
+    HTML is relayed to it as tokens arrive.
+    """
+    sink = section_stream.get()
+
+    if sink is None:
+        completion = await llm_gateway.create(stream=False, **kwargs)
+        return completion.choices[0].message.content
+
+    async def read_stream(stream) -> str:
+        parts = []
+        sent = ""
+        last_flush = 0.0
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+
+            now = time.monotonic()
+            if now - last_flush >= STREAM_FLUSH_INTERVAL:
+                last_flush = now
+                sent = await _push(sink, "".join(parts), sent)
+
+        content = "".join(parts)
+        await _push(sink, content, sent, final=True)
+        return content
+
+    return await llm_gateway.create(consume=read_stream, stream=True, **kwargs)
@@ -1,6 +1,8 @@
 import asyncio
-import aiohttp
-from groq import AsyncGroq
+from components.strategies.prompts.llm_stream import create_completion
+from components.strategies.prompts.prompt_budget import SECTION_BUDGETS
+from components.strategies.prompts.structured_sections import structured_output_enabled, generate_structured_section
+from components.strategies.prompts.research_cache import tavily_search
 from config.config import settings
 from datetime import datetime
 import logging
@@ -9,10 +11,7 @@ from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
-# Initialize Async Groq client
-GROQ_API_KEY = settings.GROQ_API_KEY_6
 TAVILY_API_KEY = settings.TAVILY_API_KEY_2
-client = AsyncGroq(api_key=GROQ_API_KEY)
 
     
 # Tool Search Web :
@@ -21,8 +20,6 @@ async def search_web_for_marketing_trends(company_name: str, description: str, y
     Search the web for current marketing trends and expert advice
     """
     try:
-        tavily_url = "https://api.tavily.com/search"
-        
         search_queries = [
             f"marketing trends for {description} in {year} expert advice",
             f"marketing best practices in {year}",
@@ -34,48 +31,41 @@ async def search_web_for_marketing_trends(company_name: str, description: str, y
         
         all_results = []
         
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            
-            for query in search_queries:
-                payload = {
-                    "api_key": TAVILY_API_KEY,
-                    "query": query,
-                    "search_depth": "advanced",
-                    "include_answer": True,
-                    "include_images": False,
-                    "include_raw_content": False,
-                    "max_results": 3
-                }
+        tasks = [
+            tavily_search(
+                TAVILY_API_KEY,
+                query,
+                search_depth="advanced",
+                include_answer=True,
+                include_images=False,
+                include_raw_content=False,
+                max_results=3
+            )
+            for query in search_queries
+        ]
+        
+        responses = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for data in responses:
+            if isinstance(data, Exception):
+                logger.error(f"Search request failed: {data}")
+                continue
                 
-                task = session.post(tavily_url, json=payload, timeout=aiohttp.ClientTimeout(total=30))
-                tasks.append(task)
-            
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for response in responses:
-                if isinstance(response, Exception):
-                    logger.error(f"Search request failed: {response}")
-                    continue
-                    
-                try:
-                    async with response as resp:
-                        resp.raise_for_status()
-                        data = await resp.json()
-                        if data.get('results'):
-                            for result in data['results']:
-                                all_results.append({
-                                    'title': result.get('title', ''),
-                                    'content': result.get('content', ''),
-                                    'url': result.get('url', '')
-                                })
-                except Exception as e:
-                    logger.error(f"Failed to process response: {e}")
+            if data.get('results'):
+                for result in data['results']:
+                    all_results.append({
+                        'title': result.get('title', ''),
+                        'content': result.get('content', ''),
+                        'url': result.get('url', ''),
+                        'score': result.get('score', 0)
+                    })
         
         if all_results:
+            # Best snippets that fit the section research budget
+            insights = SECTION_BUDGETS["advices_tips"].fit_research(all_results, f"{company_name} {description}")
             return f"""
             Current Marketing Trends & Expert Insights ({year}):
-            {str(all_results)[:6144]}
+            {insights}
             """
         
         return None
@@ -89,6 +79,9 @@ async def generate_advices_and_tips(company_data: Dict[str, Any], current_date:
     """
     Generate marketing advice and tips with real-time trend data
     """
+    # Fit the context into the section token budget
+    context_budget = SECTION_BUDGETS["advices_tips"]
+    company_data = context_budget.fit_profile(company_data)
     current_year = current_date.year
     
     # Format target audience
@@ -207,8 +200,19 @@ async def generate_advices_and_tips(company_data: Dict[str, Any], current_date:
     - Max Generate 6000 characters (including spaces and all formatting) also don't use too much emojis.
     """
 
+    context_budget.log_prompt(prompt, 6144)
+
     try:
-        completion = await client.chat.completions.create(
+        if structured_output_enabled():
+            # Schema-validated JSON rendered with the section template
+            return await generate_structured_section(
+                "advices_tips",
+                prompt,
+                model="openai/gpt-oss-120b",
+                temperature=0.3, max_completion_tokens=6144, top_p=1, reasoning_effort="medium"
+            )
+
+        content = await create_completion(
             model="openai/gpt-oss-120b",
             messages=[
                 {
@@ -220,12 +224,9 @@ async def generate_advices_and_tips(company_data: Dict[str, Any], current_date:
             max_completion_tokens=6144,
             top_p=1,
             reasoning_effort="medium",
-            stream=False,
             stop=None
         )
         
-        content = completion.choices[0].message.content
-        
         # Validate and clean the HTML output
         content = await validate_html_structure(content)
         
@@ -1,7 +1,9 @@
 import re
 import asyncio
-import aiohttp
-from groq import AsyncGroq
+from components.strategies.prompts.llm_stream import create_completion
+from components.strategies.prompts.prompt_budget import SECTION_BUDGETS
+from components.strategies.prompts.structured_sections import structured_output_enabled, generate_structured_section
+from components.strategies.prompts.research_cache import tavily_search
 from config.config import settings
 from datetime import datetime, timedelta
 import logging
@@ -10,10 +12,7 @@ from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
-# Initialize Async Groq client
-GROQ_API_KEY = settings.GROQ_API_KEY_7
 TAVILY_API_KEY = settings.TAVILY_API_KEY_3
-client = AsyncGroq(api_key=GROQ_API_KEY)
 
 def get_season(month):
     if 3 <= month <= 5: return "Spring"
@@ -26,8 +25,6 @@ async def search_marketing_budget_insights(company_name: str, description: str,
     Search for marketing budget insights
     """
     try:
-        tavily_url = "https://api.tavily.com/search"
-        
         search_queries = [
             f"marketing budget allocation",
             f"content creation costs Tunisia",
@@ -38,40 +35,30 @@ async def search_marketing_budget_insights(company_name: str, description: str,
         
         all_results = []
         
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            
-            for query in search_queries:
-                payload = {
-                    "api_key": TAVILY_API_KEY,
-                    "query": query,
-                    "search_depth": "basic",
-                    "include_answer": True,
-                    "max_results": 2
-                }
+        tasks = [
+            tavily_search(
+                TAVILY_API_KEY,
+                query,
+                search_depth="basic",
+                include_answer=True,
+                max_results=2
+            )
+            for query in search_queries
+        ]
+        
+        responses = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for data in responses:
+            if isinstance(data, Exception):
+                logger.error(f"Search request failed: {data}")
+                continue
                 
-                task = session.post(tavily_url, json=payload, timeout=aiohttp.ClientTimeout(total=30))
-                tasks.append(task)
-            
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for response in responses:
-                if isinstance(response, Exception):
-                    logger.error(f"Search request failed: {response}")
-                    continue
-                    
-                try:
-                    async with response as resp:
-                        resp.raise_for_status()
-                        data = await resp.json()
-                        if data.get('results'):
-                            for result in data['results']:
-                                all_results.append(result.get('content', ''))
-                except Exception as e:
-                    logger.error(f"Failed to process response: {e}")
+            if data.get('results'):
+                all_results.extend(data['results'])
         
         if all_results:
-            return " | ".join(all_results)[:1000]
+            # Best snippets that fit the section research budget
+            return SECTION_BUDGETS["budget_plan"].fit_research(all_results, f"{company_name} {description} {company_slogan}")
         
         return None
         
@@ -105,6 +92,10 @@ async def generate_budget_plan(summary_part: str, company_data: Dict[str, Any],
     """
     Generate marketing budget allocation plan
     """
+    # Fit the context into the section token budget
+    context_budget = SECTION_BUDGETS["budget_plan"]
+    company_data = context_budget.fit_profile(company_data)
+    relevant_events = context_budget.fit_events(relevant_events)
     current_season = get_season(current_date.month)
     
     # Format target audience
@@ -215,8 +206,19 @@ async def generate_budget_plan(summary_part: str, company_data: Dict[str, Any],
     - Only generate the table nothing more
     """
 
+    context_budget.log_prompt(prompt, 2048)
+
     try:
-        completion = await client.chat.completions.create(
+        if structured_output_enabled():
+            # Schema-validated JSON rendered with the section template
+            return await generate_structured_section(
+                "budget_plan",
+                prompt,
+                model="openai/gpt-oss-120b",
+                temperature=0.4, max_completion_tokens=2048, top_p=1
+            )
+
+        content = await create_completion(
             model="openai/gpt-oss-120b",
             messages=[
                 {
@@ -227,12 +229,9 @@ async def generate_budget_plan(summary_part: str, company_data: Dict[str, Any],
             temperature=0.4,
             max_completion_tokens=2048,
             top_p=1,
-            stream=False,
             stop=None
         )
         
-        content = completion.choices[0].message.content
-        
         # Clean the response to remove markdown formatting
         cleaned_content = await clean_html_response(content)
         
@@ -1,15 +1,12 @@
-import asyncio
-from groq import AsyncGroq
-from config.config import settings
+from components.strategies.prompts.llm_stream import create_completion
+from components.strategies.prompts.prompt_budget import SECTION_BUDGETS
+from components.strategies.prompts.structured_sections import structured_output_enabled, generate_structured_section
 from datetime import datetime, timedelta
-from config.config import get_db_connection, get_db_cursor, release_db_connection
+from config.async_db import db_connection
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize Async Groq client
-GROQ_API_KEY = settings.GROQ_API_KEY_2
-client = AsyncGroq(api_key=GROQ_API_KEY)
 
 async def get_season(month):
     if 3 <= month <= 5: return "Spring"
@@ -19,34 +16,26 @@ async def get_season(month):
 
 async def get_relevant_events(company_id, limit=4):
     """Get relevant upcoming events for a company"""
-    loop = asyncio.get_event_loop()
-    
-    def db_operation():
-        conn = get_db_connection()
-        cursor = get_db_cursor(conn)
-        
-        today = datetime.now().date()
-        cursor.execute("""
+    today = datetime.now().date()
+    async with db_connection() as db:
+        rows = await db.fetchall("""
             SELECT title, event_date, event_url
             FROM scraped_events
             WHERE company_id = %s AND (event_date >= %s OR event_date IS NULL)
             ORDER BY event_date ASC
             LIMIT %s
         """, (company_id, today, limit))
-        
-        events = []
-        for title, event_date, event_url in cursor.fetchall():
-            date_str = event_date.strftime("%Y-%m-%d") if event_date else "Date not specified"
-            events.append({
-                "title": title,
-                "date": date_str,
-                "url": event_url
-            })
-        
-        release_db_connection(conn)
-        return events
     
-    return await loop.run_in_executor(None, db_operation)
+    events = []
+    for title, event_date, event_url in rows:
+        date_str = event_date.strftime("%Y-%m-%d") if event_date else "Date not specified"
+        events.append({
+            "title": title,
+            "date": date_str,
+            "url": event_url
+        })
+    
+    return events
 
 def format_events_text(events):
     """Format events data into text for the prompt"""
@@ -61,11 +50,14 @@ def format_events_text(events):
 
 async def generate_marketing_calendar(summary_part: str, budget_part: str, events_marketing_part: str, company_data, current_date, logo_description, company_id):
     """Generate a comprehensive marketing calendar with events, influencer collabs, and ad campaigns"""
+    # Fit the context into the section token budget
+    context_budget = SECTION_BUDGETS["content_calendar"]
+    company_data = context_budget.fit_profile(company_data)
     current_season = await get_season(current_date.month)
     
     # Get relevant events asynchronously
     relevant_events = await get_relevant_events(company_id)
-    events_text = format_events_text(relevant_events)
+    events_text = context_budget.fit_events_text(format_events_text(relevant_events))
     
     # Format target audience
     target_audience = f"""
@@ -189,8 +181,20 @@ async def generate_marketing_calendar(summary_part: str, budget_part: str, event
     - No additional explanations
     """
 
+    context_budget.log_prompt(prompt, 4096)
+
     try:
-        completion = await client.chat.completions.create(
+        if structured_output_enabled():
+            # Schema-validated JSON rendered with the section template
+            return await generate_structured_section(
+                "content_calendar",
+                prompt,
+                context={"season": current_season},
+                model="openai/gpt-oss-120b",
+                temperature=0.3, max_completion_tokens=4096, top_p=1
+            )
+
+        content = await create_completion(
             model="openai/gpt-oss-120b",
             messages=[
                 {
@@ -201,11 +205,8 @@ async def generate_marketing_calendar(summary_part: str, budget_part: str, event
             temperature=0.3,
             max_completion_tokens=4096,
             top_p=1,
-            stream=False,
             stop=None
         )
-        
-        content = completion.choices[0].message.content
         return content
         
     except Exception as e:
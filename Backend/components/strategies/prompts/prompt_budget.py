@@ -0,0 +1,152 @@
+# Imports
+import re
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:
+    # tiktoken is optional, fall back to an estimate
+    _encoding = None
+
+#---------------------------------------------------------------------------------------
+
+# Company fields that can be long free text, trimmed when the profile is over budget
+PROFILE_TEXT_FIELDS = ["description", "products", "services", "marketing_goals", "special_events", "slogan"]
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    # ~4 characters per token for English text
+    return (len(text) + 3) // 4
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """Cut text to max_tokens, on a word boundary"""
+    text = text or ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    if _encoding is not None:
+        cut = _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[:max_tokens * 4]
+    return cut.rsplit(" ", 1)[0].rstrip() + "..."
+
+
+def _terms(text: str) -> set:
+    return {word for word in re.findall(r'[a-z0-9]+', (text or "").lower()) if len(word) > 3}
+
+
+class PromptBudget:
+    """Token budget of one section's prompt context"""
+
+    def __init__(self, section: str, profile: int, research: int = 0, events: int = 0):
+        self.section = section
+        self.profile = profile
+        self.research = research
+        self.events = events
+
+    def fit_profile(self, company_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy of company_data whose long text fields fit the profile budget.
+        Short fields are kept whole, the remaining budget is shared by the long ones.
+        """
+        fields = {
+            name: str(company_data.get(name) or "")
+            for name in PROFILE_TEXT_FIELDS if company_data.get(name)
+        }
+        sizes = {name: count_tokens(value) for name, value in fields.items()}
+        if sum(sizes.values()) <= self.profile:
+            return company_data
+
+        fitted = dict(company_data)
+        remaining = self.profile
+        pending = sorted(sizes, key=sizes.get)
+        while pending:
+            share = remaining // len(pending)
+            name = pending.pop(0)
+            if sizes[name] > share:
+                fitted[name] = fit_text(fields[name], share)
+            remaining -= min(sizes[name], share)
+
+        logger.info(f"[{self.section}] company profile trimmed from {sum(sizes.values())} to ~{self.profile} tokens")
+        return fitted
+
+    def fit_research(self, results: List[Dict[str, Any]], context: str = "") -> str:
+        """
+        Rank research snippets (Tavily score + overlap with the company context),
+        drop duplicates and keep the best ones that fit the research budget.
+        """
+        context_terms = _terms(context)
+        seen = set()
+        ranked = []
+        for result in results:
+            content = (result.get("content") or "").strip()
+            key = result.get("url") or content[:200]
+            if not content or key in seen:
+                continue
+            seen.add(key)
+            overlap = len(context_terms & _terms(content)) / (len(context_terms) or 1)
+            ranked.append((float(result.get("score") or 0) + overlap, result))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        lines = []
+        remaining = self.research
+        for _, result in ranked:
+            title = result.get("title", "")
+            url = result.get("url", "")
+            line = f"- {title}: {result.get('content', '').strip()}" + (f" ({url})" if url else "")
+            size = count_tokens(line)
+            if size > remaining:
+                # Keep a trimmed version of the snippet if there is still room for it
+                if remaining >= 60:
+                    lines.append(fit_text(line, remaining))
+                break
+            lines.append(line)
+            remaining -= size
+
+        return "\n".join(lines)
+
+    def fit_events(self, events: Iterable[Any]) -> List[Any]:
+        """Keep the first events (already sorted by date) that fit the events budget"""
+        fitted = []
+        remaining = self.events
+        for event in events or []:
+            size = count_tokens(str(event))
+            if size > remaining:
+                break
+            fitted.append(event)
+            remaining -= size
+        return fitted
+
+    def fit_events_text(self, events_text: str) -> str:
+        return fit_text(events_text, self.events)
+
+    def log_prompt(self, prompt: str, max_completion_tokens: Optional[int] = None):
+        tokens = count_tokens(prompt)
+        estimate = "" if _encoding is not None else " (estimated)"
+        logger.info(
+            f"[{self.section}] prompt: {tokens} tokens{estimate}"
+            + (f", max completion: {max_completion_tokens}" if max_completion_tokens else "")
+        )
+        return tokens
+
+
+# Context budget of every section prompt, in tokens
+SECTION_BUDGETS: Dict[str, PromptBudget] = {
+    "executive_summary": PromptBudget("executive_summary", profile=600, research=600),
+    "budget_plan": PromptBudget("budget_plan", profile=500, research=300, events=300),
+    "events_marketing": PromptBudget("events_marketing", profile=400, events=1200),
+    "content_calendar": PromptBudget("content_calendar", profile=600, events=600),
+    "influencer_section": PromptBudget("influencer_section", profile=400),
+    "platform_strategies": PromptBudget("platform_strategies", profile=600),
+    "advices_tips": PromptBudget("advices_tips", profile=600, research=1500),
+}
@@ -0,0 +1,168 @@
+# Imports
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import aiohttp
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config.config import settings, get_db_connection, get_db_cursor, release_db_connection
+from config.async_db import run_pooled
+from components.helpers.rate_limiter import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+
+class ResearchCache:
+    """
+    Process-wide cache for web research results.
+    In-memory TTL + LRU, optional Postgres tier shared between worker processes,
+    and concurrent lookups of the same key share a single fetch. The fetch runs in
+    its own task, a cancelled generation never fails the others waiting on it.
+    """
+
+    def __init__(self, ttl: int, max_entries: int, persist: bool = False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get_local(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    #--------------------------------- Postgres tier --------------------------------------------#
+
+    def _load_db(self, key: str) -> Optional[Any]:
+        conn = get_db_connection()
+        cursor = get_db_cursor(conn)
+        try:
+            cursor.execute("""
+                SELECT response FROM research_cache
+                WHERE cache_key = %s AND expires_at > NOW()
+            """, (key,))
+            row = cursor.fetchone()
+            conn.commit()
+            return row[0] if row else None
+        finally:
+            cursor.close()
+            release_db_connection(conn)
+
+    def _store_db(self, key: str, query: str, value: Any):
+        conn = get_db_connection()
+        cursor = get_db_cursor(conn)
+        try:
+            cursor.execute("""
+                INSERT INTO research_cache (cache_key, query, response, expires_at)
+                VALUES (%s, %s, %s, NOW() + make_interval(secs => %s))
+                ON CONFLICT (cache_key)
+                DO UPDATE SET response = EXCLUDED.response, query = EXCLUDED.query,
+                              created_at = NOW(), expires_at = EXCLUDED.expires_at
+            """, (key, query, json.dumps(value), self.ttl))
+            cursor.execute("DELETE FROM research_cache WHERE expires_at < NOW()")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            release_db_connection(conn)
+
+    async def _run_db(self, func: Callable, *args):
+        try:
+            return await run_pooled(func, *args)
+        except Exception as e:
+            # The persistent tier is only an optimization, a failed write still returns the value
+            logger.warning(f"Research cache database tier failed: {str(e)}")
+            return None
+
+    async def _fill(self, key: str, query: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Load or fetch the value of key and cache it, runs detached from the callers"""
+        try:
+            value = await self._run_db(self._load_db, key) if self.persist else None
+            if value is not None:
+                self.hits += 1
+                self._set_local(key, value)
+                return value
+
+            self.misses += 1
+            value = await fetch()
+            self._set_local(key, value)
+            if self.persist:
+                await self._run_db(self._store_db, key, query, value)
+            return value
+        finally:
+            # Failures are not cached, the next lookup tries again
+            self._inflight.pop(key, None)
+
+    #---------------------------------------------------------------------------------------
+
+    async def get_or_fetch(self, key: str, query: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, or run fetch() once and cache its result"""
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        # Another generation may already be fetching it
+        fill = self._inflight.get(key)
+        if fill is None:
+            fill = asyncio.create_task(self._fill(key, query, fetch))
+            # Waiters may all be gone, don't log the unretrieved error
+            fill.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = fill
+        else:
+            self.hits += 1
+
+        # Cancelling this caller leaves the fetch running for the others
+        return await asyncio.shield(fill)
+
+
+research_cache = ResearchCache(
+    ttl=settings.RESEARCH_CACHE_TTL,
+    max_entries=settings.RESEARCH_CACHE_MAX_ENTRIES,
+    persist=settings.RESEARCH_CACHE_PERSIST
+)
+
+
+def research_cache_key(query: str, params: Dict[str, Any]) -> str:
+    """Same key for queries differing only by case/spacing, api keys are left out"""
+    normalized = re.sub(r'\s+', ' ', query).strip().lower()
+    raw = json.dumps({"query": normalized, **params}, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def tavily_search(api_key: str, query: str, timeout: int = 30, **params) -> Dict[str, Any]:
+    """
+    Tavily search through the research cache, returns the response JSON.
+    Raises aiohttp.ClientError / asyncio.TimeoutError like a direct call.
+    """
+    async def fetch():
+        await rate_limiter.acquire("tavily", api_key)
+        payload = {"api_key": api_key, "query": query, **params}
+        async with aiohttp.ClientSession() as session:
+            async with session.post(settings.TAVILY_API_URL, json=payload, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                return await response.json()
+
+    return await research_cache.get_or_fetch(research_cache_key(query, params), query, fetch)
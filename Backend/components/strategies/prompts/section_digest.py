@@ -0,0 +1,109 @@
+# Imports
+import re
+import logging
+from typing import Callable, Dict
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# Length cap of the plain-text fallback when a section doesn't have the expected structure
+FALLBACK_MAX_CHARS = 1200
+
+# Length cap of the executive summary overview paragraph
+OVERVIEW_MAX_WORDS = 80
+
+
+def _text(tag) -> str:
+    return re.sub(r'\s+', ' ', tag.get_text(" ", strip=True)).strip() if tag else ""
+
+
+def _truncate_words(text: str, max_words: int) -> str:
+    words = text.split()
+    return text if len(words) <= max_words else " ".join(words[:max_words]) + "..."
+
+
+def _fallback(soup: BeautifulSoup) -> str:
+    text = _text(soup)
+    return text[:FALLBACK_MAX_CHARS] + ("..." if len(text) > FALLBACK_MAX_CHARS else "")
+
+
+def digest_executive_summary(soup: BeautifulSoup) -> str:
+    """Overview + objectives"""
+    lines = []
+    title = soup.find("h1")
+    if title:
+        lines.append(_text(title))
+
+    overview = soup.select_one(".summary-card > p") or soup.find("p")
+    if overview:
+        lines.append(f"Overview: {_truncate_words(_text(overview), OVERVIEW_MAX_WORDS)}")
+
+    objectives = [_text(li) for li in soup.select(".key-focus li")]
+    lines.extend(f"- {objective}" for objective in objectives if objective)
+
+    return "\n".join(lines) if objectives else ""
+
+
+def digest_budget_plan(soup: BeautifulSoup) -> str:
+    """Total + one line per budget category"""
+    lines = []
+    title = soup.find("h2")
+    if title:
+        lines.append(_text(title))
+
+    for row in soup.find_all("tr"):
+        cells = [_text(cell) for cell in row.find_all("td")]
+        if len(cells) >= 3:
+            lines.append(f"- {cells[0]}: {cells[1]} = {cells[2]}")
+
+    return "\n".join(lines) if len(lines) > 1 else ""
+
+
+def digest_events_marketing(soup: BeautifulSoup) -> str:
+    """Chosen events with their date/location and unique angle"""
+    lines = []
+    for event in soup.select(".event"):
+        title = _text(event.find("h3"))
+        if not title:
+            continue
+        line = f"- {title}"
+        for item in event.find_all("li"):
+            label = _text(item.find("strong"))
+            if label.startswith("Date"):
+                line += f" | {_text(item).replace(label, '', 1).strip()}"
+            elif label.startswith("Unique Angle"):
+                line += f" | Angle: {_truncate_words(_text(item).replace(label, '', 1).strip(), 30)}"
+        lines.append(line)
+
+    return "\n".join(["Selected events:"] + lines) if lines else ""
+
+
+SECTION_DIGESTS: Dict[str, Callable[[BeautifulSoup], str]] = {
+    "executive_summary": digest_executive_summary,
+    "budget_plan": digest_budget_plan,
+    "events_marketing": digest_events_marketing,
+}
+
+
+def digest_section(section_key: str, html: str) -> str:
+    """
+    Compact text digest of a finished section, passed to the later sections'
+    prompts instead of the section's full HTML.
+    """
+    if not html:
+        return ""
+
+    soup = BeautifulSoup(html, "html.parser")
+    try:
+        digest = SECTION_DIGESTS[section_key](soup)
+    except Exception as e:
+        logger.warning(f"Digest of {section_key} failed: {str(e)}")
+        digest = ""
+
+    if not digest:
+        digest = _fallback(soup)
+
+    logger.info(f"Digest of {section_key}: {len(html)} -> {len(digest)} chars")
+    return digest
@@ -0,0 +1,224 @@
+# Imports
+import re
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from pydantic import BaseModel, Field, ValidationError
+from components.strategies.prompts.llm_stream import create_completion, section_stream
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# Templates rendering the structured sections to the same HTML as the free-form output
+BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent.parent
+SECTION_TEMPLATES_DIR = BASE_DIR / "static" / "templates" / "strategy_sections"
+
+jinja_env = Environment(
+    loader=FileSystemLoader(str(SECTION_TEMPLATES_DIR)),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+
+#--------------------------------- Section schemas --------------------------------------------#
+
+
+class ExecutiveSummary(BaseModel):
+    overview: str = Field(description="One paragraph connecting the company profile to the strategy, in 'we' language")
+    primary_objective: str
+    secondary_objectives: List[str]
+
+
+class BudgetLine(BaseModel):
+    category: str = Field(description="Category name with the details the table asks for")
+    percentage: str = Field(description="e.g. 25%")
+    amount: str = Field(description="e.g. 1,250 TND")
+
+
+class BudgetPlan(BaseModel):
+    total_budget: str
+    lines: List[BudgetLine] = Field(description="Exactly the 4 budget categories")
+
+
+class CalendarEntry(BaseModel):
+    dates: str
+    theme: str
+    actions: str
+    collaborations: str
+    platforms: str
+    kpis: str
+
+
+class MarketingCalendar(BaseModel):
+    title: str
+    seasonal_opportunities: str
+    entries: List[CalendarEntry]
+
+
+class EventPlan(BaseModel):
+    title: str
+    date_location: str = Field(description="Format: 23 May 2025 – Location")
+    strategic_value: List[str]
+    participation_plan: List[str]
+    unique_angle: str
+
+
+class EventStrategy(BaseModel):
+    events: List[EventPlan]
+
+
+class Influencer(BaseModel):
+    name: str
+    email: Optional[str] = None
+    followers: Optional[str] = None
+    platform: Optional[str] = None
+    handle: Optional[str] = None
+    niche: Optional[str] = None
+    engagement_rate: Optional[str] = None
+    collaboration_type: Optional[str] = None
+    price_range: Optional[str] = Field(default=None, description="Only the range, e.g. 800 – 2,000 TND")
+    email_text: str = Field(description="Full outreach email, starting with the Subject line")
+
+
+class Outreach(BaseModel):
+    timing: str
+    approach: str
+    budget_allocation: str
+    campaign_duration: str
+
+
+class InfluencerRecommendations(BaseModel):
+    influencers: List[Influencer]
+    outreach: Outreach
+
+
+class ContentItem(BaseModel):
+    post_idea: Optional[str] = None
+    video_idea: Optional[str] = None
+    story_idea: Optional[str] = None
+    image_prompt: Optional[str] = None
+    video_placeholder: Optional[str] = None
+    caption: Optional[str] = None
+    hashtags: Optional[str] = None
+    schedule: Optional[str] = Field(default=None, description="Format: Day HourAM/PM, e.g. Thursday 9AM")
+
+
+class ContentType(BaseModel):
+    name: str
+    description: str
+    frequency: str
+    best_time: str
+    items: List[ContentItem]
+
+
+class PlatformPlan(BaseModel):
+    platform: str
+    content_types: List[ContentType]
+
+
+class PlatformStrategies(BaseModel):
+    platforms: List[PlatformPlan]
+
+
+class AdviceItem(BaseModel):
+    label: str = Field(description="Bold label of the list item, e.g. KPIs")
+    text: str
+
+
+class MarketingAdvice(BaseModel):
+    growth: List[AdviceItem]
+    content: List[AdviceItem]
+    advantage: List[AdviceItem]
+    outreach: List[AdviceItem]
+    budget: List[AdviceItem]
+
+
+# Schema and template of each section (keys of SECTION_ORDER)
+SECTION_SCHEMAS = {
+    "executive_summary": (ExecutiveSummary, "executive_summary.html"),
+    "budget_plan": (BudgetPlan, "budget_plan.html"),
+    "content_calendar": (MarketingCalendar, "content_calendar.html"),
+    "events_marketing": (EventStrategy, "events_marketing.html"),
+    "influencer_section": (InfluencerRecommendations, "influencer_section.html"),
+    "platform_strategies": (PlatformStrategies, "platform_strategies.html"),
+    "advices_tips": (MarketingAdvice, "advices_tips.html"),
+}
+
+
+#--------------------------------- Generation --------------------------------------------#
+
+
+class StructuredSection(str):
+    """Rendered section HTML that keeps the validated data it was rendered from"""
+
+    def __new__(cls, html: str, data: Dict[str, Any]):
+        section = super().__new__(cls, html)
+        section.data = data
+        return section
+
+
+def structured_output_enabled() -> bool:
+    return settings.STRATEGY_OUTPUT_MODE == "json"
+
+
+def json_instructions(section_key: str) -> str:
+    model, _ = SECTION_SCHEMAS[section_key]
+    schema = json.dumps(model.model_json_schema())
+    return f"""
+    STRUCTURED OUTPUT (replaces every HTML output format above):
+    - Do NOT return HTML. Return ONLY one JSON object, without markdown fences or comments.
+    - The object must validate against this JSON schema: {schema}
+    - Fill each field with the content the HTML format above asks for, as plain text without HTML tags.
+    """
+
+
+def parse_section(section_key: str, content: str) -> Dict[str, Any]:
+    """Validate the model output against the section schema"""
+    model, _ = SECTION_SCHEMAS[section_key]
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', content.strip(), flags=re.IGNORECASE)
+    return model.model_validate_json(text).model_dump()
+
+
+def render_section(section_key: str, data: Dict[str, Any]) -> str:
+    _, template_name = SECTION_SCHEMAS[section_key]
+    return jinja_env.get_template(template_name).render(**data).strip()
+
+
+async def generate_structured_section(section_key: str, prompt: str, context: Optional[Dict[str, Any]] = None, **kwargs) -> StructuredSection:
+    """
+    Generate a section as schema-validated JSON and render it with its template.
+    An invalid answer is sent back once with the validation error before giving up.
+    """
+    messages = [{"role": "user", "content": prompt + json_instructions(section_key)}]
+
+    # Partial JSON can't be shown as HTML, structured sections are not streamed
+    token = section_stream.set(None)
+    try:
+        for attempt in range(2):
+            content = await create_completion(
+                messages=messages,
+                response_format={"type": "json_object"},
+                **kwargs
+            )
+            try:
+                data = parse_section(section_key, content)
+                break
+            except (ValueError, ValidationError) as e:
+                if attempt:
+                    raise
+                logger.warning(f"Invalid {section_key} JSON, asking for a correction: {str(e)}")
+                messages = messages + [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": f"This JSON does not match the schema: {str(e)}. Return the corrected JSON object only."},
+                ]
+    finally:
+        section_stream.reset(token)
+
+    # The render context is stored with the data so the section can be rendered again
+    data.update(context or {})
+    return StructuredSection(render_section(section_key, data), data)
@@ -0,0 +1,133 @@
+# Imports
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from components.strategies.prompts.llm_stream import section_stream
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+
+class StrategySection:
+    """One section of the strategy: how to generate it and which sections it reads"""
+
+    def __init__(
+        self,
+        key: str,
+        label: str,
+        generator: Callable[[Dict[str, Any]], Awaitable[Any]],
+        depends_on: Iterable[str] = ()
+    ):
+        self.key = key
+        self.label = label
+        # Called with the dict of finished section results once all dependencies are done
+        self.generator = generator
+        self.depends_on = tuple(depends_on)
+
+
+def _validate_sections(sections: List[StrategySection]):
+    """Make sure every dependency exists and the graph has no cycle"""
+    keys = [section.key for section in sections]
+    if len(keys) != len(set(keys)):
+        raise ValueError(f"Duplicate section keys: {keys}")
+
+    for section in sections:
+        missing = [dep for dep in section.depends_on if dep not in keys]
+        if missing:
+            raise ValueError(f"Section '{section.key}' depends on unknown sections: {missing}")
+
+    # Kahn's algorithm - if we can't resolve every section there is a cycle
+    resolved = set()
+    remaining = list(sections)
+    while remaining:
+        ready = [s for s in remaining if all(dep in resolved for dep in s.depends_on)]
+        if not ready:
+            raise ValueError(f"Circular section dependencies: {[s.key for s in remaining]}")
+        for section in ready:
+            resolved.add(section.key)
+            remaining.remove(section)
+
+
+async def run_sections(
+    sections: List[StrategySection],
+    on_progress: Optional[Callable[[str, int], Awaitable[None]]] = None,
+    on_partial: Optional[Callable[[str, str, bool], Awaitable[None]]] = None,
+    on_section_done: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+    completed: Optional[Dict[str, Any]] = None,
+    start_pct: int = 10,
+    end_pct: int = 95
+) -> Dict[str, Any]:
+    """
+    Run the sections concurrently, starting each one as soon as the sections it
+    depends on are finished. Returns a dict of results keyed by section key.
+    If any section fails, the ones still running are cancelled and the error is raised.
+    When on_partial is given, each section's LLM output is streamed to it as
+    (key, html, replace): the HTML appended since the last call, or the whole HTML if replace.
+    on_section_done is awaited with (key, result) as each section finishes (checkpointing),
+    sections already in completed are not generated again.
+    """
+    _validate_sections(sections)
+
+    total = len(sections)
+    results: Dict[str, Any] = {}
+    pending = {section.key: section for section in sections}
+
+    # Resume from checkpoints
+    for key, result in (completed or {}).items():
+        if key in pending:
+            del pending[key]
+            results[key] = result
+    if results:
+        logger.info(f"Resuming with {len(results)}/{total} sections already generated")
+    running: Dict[asyncio.Task, StrategySection] = {}
+
+    def start(section: StrategySection) -> asyncio.Task:
+        async def run():
+            # Runs inside the section's own task context, so the sink is per section
+            if on_partial is not None:
+                async def sink(html: str, replace: bool):
+                    await on_partial(section.key, html, replace)
+                section_stream.set(sink)
+            return await section.generator(results)
+        return asyncio.create_task(run())
+
+    async def report():
+        if on_progress is None:
+            return
+        pct = start_pct + int((end_pct - start_pct) * len(results) / total) if total else end_pct
+        labels = ", ".join(section.label for section in running.values())
+        await on_progress(f"Generating {labels}" if labels else "Finalizing...", pct)
+
+    try:
+        while pending or running:
+            # Start every section whose inputs are ready
+            ready = [s for s in pending.values() if all(dep in results for dep in s.depends_on)]
+            for section in ready:
+                del pending[section.key]
+                logger.info(f"Generating {section.label}")
+                running[start(section)] = section
+
+            if ready:
+                await report()
+
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                section = running.pop(task)
+                # Raises if the section failed
+                results[section.key] = task.result()
+                logger.info(f"Done {section.label}")
+                if on_section_done is not None:
+                    await on_section_done(section.key, results[section.key])
+
+            await report()
+
+        return results
+
+    finally:
+        # Cancel whatever is still running if we leave early (error or cancellation)
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running.keys(), return_exceptions=True)
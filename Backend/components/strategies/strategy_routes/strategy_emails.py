@@ -0,0 +1,73 @@
+# Imports
+import re
+import html
+import logging
+import itertools
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# Influencer email textareas of the strategy document, in document order
+EMAIL_TEXTAREA_PATTERN = re.compile(
+    r'(<textarea\b[^>]*\bclass=(["\'])[^"\']*\beditable-email\b[^"\']*\2[^>]*>)(.*?)(</textarea>)',
+    re.DOTALL | re.IGNORECASE
+)
+
+
+def save_strategy_email(cursor, strategy_id: int, email_index: int, email_text: str) -> bool:
+    """
+    Store one edited email and copy it to its influencer (caller commits).
+    Returns False when the strategy has no influencer at that index.
+    """
+    cursor.execute("""
+        UPDATE influencers
+        SET email_text = %s
+        WHERE strategy_id = %s AND email_index = %s
+    """, (email_text, strategy_id, email_index))
+    if cursor.rowcount == 0:
+        return False
+
+    cursor.execute("""
+        INSERT INTO strategy_emails (strategy_id, email_index, email_text)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (strategy_id, email_index) DO UPDATE
+        SET email_text = EXCLUDED.email_text, updated_at = NOW()
+    """, (strategy_id, email_index, email_text))
+    return True
+
+
+def load_strategy_emails(cursor, strategy_id: int) -> Dict[int, str]:
+    """Edited emails of a strategy, by influencer index"""
+    cursor.execute("""
+        SELECT email_index, email_text FROM strategy_emails
+        WHERE strategy_id = %s
+    """, (strategy_id,))
+    return {email_index: email_text for email_index, email_text in cursor.fetchall()}
+
+
+def clear_strategy_emails(cursor, strategy_id: int):
+    """Drop the stored emails once the document itself holds them (caller commits)"""
+    cursor.execute("DELETE FROM strategy_emails WHERE strategy_id = %s", (strategy_id,))
+
+
+def render_emails(content: str, emails: Dict[int, str]) -> str:
+    """Write the stored emails into their textareas without parsing the document"""
+    if not emails or not content:
+        return content
+
+    position = itertools.count()
+
+    def replace(match):
+        idx = next(position)
+        if idx not in emails:
+            return match.group(0)
+        return f"{match.group(1)}{html.escape(emails[idx], quote=False)}{match.group(4)}"
+
+    return EMAIL_TEXTAREA_PATTERN.sub(replace, content)
+
+
+def render_strategy_emails(cursor, strategy_id: int, content: str) -> str:
+    """The strategy document with its edited emails applied"""
+    return render_emails(content, load_strategy_emails(cursor, strategy_id))
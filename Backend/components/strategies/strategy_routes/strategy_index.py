@@ -0,0 +1,108 @@
+# Imports
+import logging
+from typing import Any, Dict, Optional, Tuple
+from bs4 import BeautifulSoup, NavigableString
+from psycopg2.extras import execute_values
+from components.strategies.prompts.digital_marketing import parse_content_items, content_items_from_data
+from components.strategies.prompts.influencers_emails_marketing import parse_influencers, influencers_from_data
+from components.strategies.prompts.structured_sections import StructuredSection, render_section
+from components.strategies.launch_strategy_routes.strategy_execution_fncs import parse_strategy_soup, strategy_content_from_data
+from components.strategies.strategy_routes.strategy_sections import split_strategy, replace_section
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# Bumped when the index layout changes, older indexes are ignored
+INDEX_VERSION = 1
+
+
+def patch_emails(soup, emails: Dict[int, str]):
+    """Write the edited influencer emails into their textareas"""
+    for idx, textarea in enumerate(soup.find_all('textarea', class_='editable-email')):
+        if idx in emails:
+            textarea.clear()
+            textarea.append(NavigableString(emails[idx]))
+
+
+def extract_image_prompts(soup) -> Dict[str, str]:
+    """Extract image prompts from a parsed strategy document"""
+    prompts = {}
+
+    prompt_section = soup.find('section', class_='image-prompts')
+    if prompt_section:
+        for card in prompt_section.find_all('div', class_='prompt-card'):
+            prompt_type = card.find('h3').get_text(strip=True)
+            prompt_text = card.find('code').get_text(strip=True)
+            prompts[prompt_type] = prompt_text
+
+    return prompts
+
+
+def insert_image_prompts(cursor, strategy_id: int, company_id: int, user_id: int, image_prompts: Dict[str, str]):
+    """Insert the extracted image prompts in one batched statement (caller commits)"""
+    if not image_prompts:
+        return
+
+    execute_values(cursor, """
+        INSERT INTO image_prompts (strategy_id, company_id, user_id, prompt_text, prompt_type)
+        VALUES %s
+    """, [
+        (strategy_id, company_id, user_id, prompt_text, prompt_type)
+        for prompt_type, prompt_text in image_prompts.items()
+    ])
+
+
+def build_strategy_index(
+    content: str,
+    emails: Optional[Dict[int, str]] = None,
+    section_data: Optional[Dict[str, dict]] = None,
+) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+    """
+    Apply the edited emails and collect everything approval and the launch page need
+    (content items, influencers, image prompts, launch data) from one parse
+    of the document. Sections with structured data are read from it, so a strategy
+    generated in json output mode isn't parsed at all.
+    Returns the updated document, its index and the re-rendered structured sections.
+    """
+    emails = emails or {}
+    section_data = section_data or {}
+    rendered = {}
+
+    influencer_data = section_data.get("influencer_section")
+    if influencer_data and "influencer_section" in split_strategy(content):
+        # Apply the edited emails to the influencer data and render the section again
+        for idx, influencer in enumerate(influencer_data["influencers"]):
+            if idx in emails:
+                influencer["email_text"] = emails[idx]
+        rendered["influencer_section"] = StructuredSection(
+            render_section("influencer_section", influencer_data), influencer_data
+        )
+        content = replace_section(content, "influencer_section", rendered["influencer_section"])
+    else:
+        influencer_data = None
+
+    platform_data = section_data.get("platform_strategies")
+    launch = strategy_content_from_data(section_data)
+
+    soup = None
+    if influencer_data is None or platform_data is None or launch is None or 'image-prompts' in content:
+        soup = BeautifulSoup(content, 'html.parser')
+        if influencer_data is None:
+            patch_emails(soup, emails)
+            content = str(soup)
+
+    influencers = influencers_from_data(influencer_data) if influencer_data else parse_influencers(soup)
+    index = {
+        "version": INDEX_VERSION,
+        "content_items": content_items_from_data(platform_data) if platform_data else parse_content_items(soup),
+        "influencers": influencers,
+        "image_prompts": extract_image_prompts(soup) if soup is not None else {},
+        "launch": launch if launch is not None else parse_strategy_soup(soup),
+    }
+
+    logger.info(
+        f"Indexed strategy: {len(index['content_items'])} content items, "
+        f"{len(influencers)} influencers, parsed={soup is not None}"
+    )
+    return content, index, rendered
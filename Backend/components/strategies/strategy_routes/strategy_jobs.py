@@ -0,0 +1,345 @@
+# Imports
+import asyncio
+import logging
+import os
+import socket
+import psycopg2
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config.config import get_db_connection, get_db_cursor, release_db_connection
+from config.async_db import run_pooled
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# A running job whose heartbeat is older than this is considered lost (worker died)
+STALE_JOB_SECONDS = 600
+
+# How many times a lost job is put back in the queue before giving up
+MAX_JOB_ATTEMPTS = 3
+
+# Seconds between two heartbeats of a running job
+HEARTBEAT_INTERVAL = 30
+
+# A failed job with checkpointed sections younger than this is resumed instead of restarted
+RESUME_WINDOW_HOURS = 24
+
+JOB_COLUMNS = """
+    id, company_id, user_id, status, progress, current_step,
+    strategy_id, error, attempts, created_at, started_at, finished_at, worker_id
+"""
+
+
+class JobLost(Exception):
+    """The job was taken back from this worker (stale heartbeat) and is no longer its to finish"""
+
+
+def _row_to_job(row) -> Optional[Dict[str, Any]]:
+    if not row:
+        return None
+    return {
+        "id": row[0],
+        "company_id": row[1],
+        "user_id": row[2],
+        "status": row[3],
+        "progress": row[4],
+        "current_step": row[5],
+        "strategy_id": row[6],
+        "error": row[7],
+        "attempts": row[8],
+        "created_at": row[9],
+        "started_at": row[10],
+        "finished_at": row[11],
+        "worker_id": row[12]
+    }
+
+
+def _run(query: str, params: tuple = (), fetch: bool = False):
+    """Run one statement on a pooled connection and commit"""
+    conn = get_db_connection()
+    cursor = get_db_cursor(conn)
+    try:
+        cursor.execute(query, params)
+        row = cursor.fetchone() if fetch else None
+        conn.commit()
+        return row
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        release_db_connection(conn)
+
+
+async def run_db(func: Callable, *args, **kwargs):
+    """Run a blocking job query, it checks out its own connection (off the database threads)"""
+    return await run_pooled(func, *args, **kwargs)
+
+
+#--------------------------------- Queue operations --------------------------------------------#
+
+
+def resume_failed_job(company_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """Put the company's last failed job back in the queue if it has checkpointed sections"""
+    return _row_to_job(_run(f"""
+        UPDATE strategy_jobs
+        SET status = 'queued', error = NULL, finished_at = NULL, attempts = 0,
+            progress = 0, current_step = 'Waiting in queue...', worker_id = NULL
+        WHERE id = (
+            SELECT id FROM strategy_jobs
+            WHERE company_id = %s
+            ORDER BY created_at DESC
+            LIMIT 1
+        )
+        AND user_id = %s
+        AND status = 'error'
+        AND created_at > NOW() - make_interval(hours => %s)
+        AND EXISTS (
+            SELECT 1 FROM strategy_sections
+            WHERE strategy_sections.job_id = strategy_jobs.id
+        )
+        RETURNING {JOB_COLUMNS}
+    """, (company_id, user_id, RESUME_WINDOW_HOURS), fetch=True))
+
+
+def enqueue_job(company_id: int, user_id: int) -> Dict[str, Any]:
+    """Queue a generation for the company, or return the job already queued/running for it"""
+    try:
+        job = resume_failed_job(company_id, user_id)
+        if job:
+            logger.info(f"Resuming failed strategy job {job['id']} from its checkpoints")
+            return job
+    except psycopg2.IntegrityError:
+        # Another request queued a job for the company in the meantime
+        pass
+
+    row = _run(f"""
+        INSERT INTO strategy_jobs (company_id, user_id, status, current_step)
+        VALUES (%s, %s, 'queued', 'Waiting in queue...')
+        ON CONFLICT (company_id) WHERE status IN ('queued', 'running') DO NOTHING
+        RETURNING {JOB_COLUMNS}
+    """, (company_id, user_id), fetch=True)
+
+    if row:
+        return _row_to_job(row)
+
+    # A generation is already active for this company
+    return _row_to_job(_run(f"""
+        SELECT {JOB_COLUMNS} FROM strategy_jobs
+        WHERE company_id = %s AND status IN ('queued', 'running')
+    """, (company_id,), fetch=True))
+
+
+def claim_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    """Take the oldest queued job, concurrent workers skip the rows already locked"""
+    return _row_to_job(_run(f"""
+        UPDATE strategy_jobs
+        SET status = 'running', worker_id = %s, attempts = attempts + 1,
+            started_at = NOW(), heartbeat_at = NOW(),
+            current_step = 'Initializing...', progress = 0
+        WHERE id = (
+            SELECT id FROM strategy_jobs
+            WHERE status = 'queued'
+            ORDER BY created_at
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING {JOB_COLUMNS}
+    """, (worker_id,), fetch=True))
+
+
+def update_job_progress(job_id: int, worker_id: str, step: str, progress: int):
+    _run("""
+        UPDATE strategy_jobs
+        SET current_step = %s, progress = %s, heartbeat_at = NOW()
+        WHERE id = %s AND worker_id = %s AND status = 'running'
+    """, (step, progress, job_id, worker_id))
+
+
+def heartbeat_job(job_id: int, worker_id: str):
+    _run("""
+        UPDATE strategy_jobs SET heartbeat_at = NOW()
+        WHERE id = %s AND worker_id = %s AND status = 'running'
+    """, (job_id, worker_id))
+
+
+def complete_job(cursor, job_id: int, worker_id: str, strategy_id: int):
+    """
+    Mark the job done, runs on the caller's cursor so it commits with the strategy insert.
+    Raises JobLost if the job was requeued or claimed by another worker in the meantime,
+    the caller rolls back its insert so the strategy is saved once.
+    """
+    cursor.execute("""
+        UPDATE strategy_jobs
+        SET status = 'completed', strategy_id = %s, progress = 100,
+            current_step = NULL, finished_at = NOW()
+        WHERE id = %s AND worker_id = %s AND status = 'running'
+    """, (strategy_id, job_id, worker_id))
+    if cursor.rowcount == 0:
+        raise JobLost(f"Strategy job {job_id} is no longer run by {worker_id}")
+
+
+def fail_job(job_id: int, worker_id: str, error: str):
+    """Mark the job failed, unless another worker took it over"""
+    _run("""
+        UPDATE strategy_jobs
+        SET status = 'error', error = %s, finished_at = NOW()
+        WHERE id = %s AND worker_id = %s AND status = 'running'
+    """, (error, job_id, worker_id))
+
+
+def requeue_stale_jobs() -> int:
+    """Put back jobs whose worker stopped sending heartbeats, fail the ones retried too often"""
+    conn = get_db_connection()
+    cursor = get_db_cursor(conn)
+    try:
+        cursor.execute("""
+            UPDATE strategy_jobs
+            SET status = CASE WHEN attempts >= %s THEN 'error' ELSE 'queued' END,
+                error = CASE WHEN attempts >= %s THEN 'Generation worker lost' ELSE error END,
+                finished_at = CASE WHEN attempts >= %s THEN NOW() ELSE NULL END,
+                current_step = CASE WHEN attempts >= %s THEN 'Generation failed' ELSE 'Waiting in queue...' END,
+                worker_id = NULL
+            WHERE status = 'running'
+            AND heartbeat_at < NOW() - make_interval(secs => %s)
+        """, (MAX_JOB_ATTEMPTS, MAX_JOB_ATTEMPTS, MAX_JOB_ATTEMPTS, MAX_JOB_ATTEMPTS, STALE_JOB_SECONDS))
+        count = cursor.rowcount
+        conn.commit()
+        if count:
+            logger.warning(f"Recovered {count} stale strategy jobs")
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        release_db_connection(conn)
+
+
+def get_job(job_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    return _row_to_job(_run(f"""
+        SELECT {JOB_COLUMNS} FROM strategy_jobs
+        WHERE id = %s AND user_id = %s
+    """, (job_id, user_id), fetch=True))
+
+
+def get_latest_company_job(company_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    return _row_to_job(_run(f"""
+        SELECT {JOB_COLUMNS} FROM strategy_jobs
+        WHERE company_id = %s AND user_id = %s
+        ORDER BY created_at DESC
+        LIMIT 1
+    """, (company_id, user_id), fetch=True))
+
+
+def job_progress(job: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Shape a job row like the generation_progress entries the front-end reads"""
+    if not job:
+        return None
+
+    if job["status"] == "completed":
+        return {"status": "completed", "strategy_id": job["strategy_id"], "progress": 100, "job_id": job["id"]}
+
+    if job["status"] == "error":
+        return {"status": "error", "error": job["error"], "progress": 0, "job_id": job["id"]}
+
+    return {
+        "status": "generating",
+        "progress": job["progress"],
+        "currentStep": job["current_step"],
+        "job_id": job["id"]
+    }
+
+
+#--------------------------------- Worker pool --------------------------------------------#
+
+
+class StrategyWorkerPool:
+    """Fixed number of workers claiming jobs from the strategy_jobs table"""
+
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any]], Awaitable[None]],
+        size: int = 2,
+        poll_interval: float = 2.0
+    ):
+        self.handler = handler
+        self.size = size
+        self.poll_interval = poll_interval
+        self.tasks = []
+        self.wakeup = asyncio.Event()
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        if self.tasks:
+            return
+        for n in range(self.size):
+            self.tasks.append(asyncio.create_task(self._worker(f"{self.worker_prefix}:{n}")))
+        self.tasks.append(asyncio.create_task(self._recover_stale_jobs()))
+        logger.info(f"Started {self.size} strategy generation workers")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def notify(self):
+        """A job was queued by this process, don't wait for the next poll"""
+        self.wakeup.set()
+
+    async def _wait_for_work(self):
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self.wakeup.clear()
+
+    async def _worker(self, worker_id: str):
+        while True:
+            try:
+                job = await run_db(claim_job, worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to claim a job: {str(e)}")
+                job = None
+
+            if not job:
+                await self._wait_for_work()
+                continue
+
+            logger.info(f"Worker {worker_id} running strategy job {job['id']} (company {job['company_id']})")
+            heartbeat = asyncio.create_task(self._heartbeat(job["id"], worker_id))
+            try:
+                await self.handler(job)
+            except asyncio.CancelledError:
+                # Shutting down, the job is picked up again once its heartbeat is stale
+                raise
+            except JobLost as e:
+                logger.warning(f"{str(e)}, dropping its result")
+            except Exception as e:
+                logger.error(f"Strategy job {job['id']} failed: {str(e)}")
+                try:
+                    await run_db(fail_job, job["id"], worker_id, str(e))
+                except Exception as db_error:
+                    logger.error(f"Could not mark job {job['id']} as failed: {str(db_error)}")
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: int, worker_id: str):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                await run_db(heartbeat_job, job_id, worker_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job_id}: {str(e)}")
+
+    async def _recover_stale_jobs(self):
+        while True:
+            try:
+                if await run_db(requeue_stale_jobs):
+                    self.notify()
+            except Exception as e:
+                logger.error(f"Stale job recovery failed: {str(e)}")
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
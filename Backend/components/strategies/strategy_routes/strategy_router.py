@@ -9,7 +9,8 @@ from slowapi.util import get_remote_address
 import psycopg2
 import requests
 from auth.auth import get_current_user
-from config.config import get_db_cursor, get_db_connection, release_db_connection
+from config.config import settings
+from config.async_db import get_async_db, db_connection
 import asyncio
 import logging
 from datetime import datetime
@@ -24,18 +25,42 @@ from components.helpers.image_analyzer import get_logo_description
 
 # Import strategy generation functions
 from components.strategies.prompts.marketing_calendar import generate_marketing_calendar
-from components.strategies.prompts.digital_marketing import generate_platform_strategies,save_content_items_to_db
+from components.strategies.prompts.digital_marketing import generate_platform_strategies,insert_content_items
 from components.strategies.prompts.executive_summary import generate_executive_summary
 from components.strategies.prompts.maketing_trends_advices_tips import generate_advices_and_tips
-from components.strategies.prompts.influencers_emails_marketing import generate_influencer_recommendations,extract_and_save_influencers
+from components.strategies.prompts.influencers_emails_marketing import generate_influencer_recommendations,insert_influencers
 from components.strategies.prompts.marketing_budget_plan import generate_budget_plan
 from components.strategies.prompts.events_marketing import generate_event_strategy
+from components.strategies.prompts.section_digest import digest_section
 
 #---------------------------------------------------------------------------------------
 
 # Import scraping helper
 from components.strategies.strategy_routes.web_scraping_helper import scrape_events_firecrawl
 
+# Import section executor
+from components.strategies.strategy_routes.section_executor import StrategySection, run_sections
+
+# Import generation job queue
+from components.strategies.strategy_routes.strategy_jobs import (
+    StrategyWorkerPool, JobLost, run_db, enqueue_job, update_job_progress, complete_job,
+    get_job, get_latest_company_job, job_progress
+)
+
+# Import per-section storage
+from components.strategies.strategy_routes.strategy_sections import (
+    SECTION_ORDER, assemble_strategy, save_job_section, load_job_sections, attach_job_sections,
+    load_strategy_sections, load_section_data, load_strategy_content, save_strategy_section, sync_strategy_sections
+)
+
+# Import the document index built at approval
+from components.strategies.strategy_routes.strategy_index import build_strategy_index, insert_image_prompts
+from components.strategies.strategy_routes.strategy_emails import (
+    save_strategy_email, load_strategy_emails, clear_strategy_emails, render_strategy_emails
+)
+from components.strategies.launch_strategy_routes.strategy_content_cache import strategy_content_cache
+from components.company.company_profile_cache import company_profile_cache
+
 #---------------------------------------------------------------------------------------
 
 
@@ -51,19 +76,6 @@ templates = Jinja2Templates(directory="../static/templates")
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Dependency to get database cursor
-async def get_cursor():
-    conn = get_db_connection()
-    cursor = get_db_cursor(conn)
-    try:
-        yield cursor
-    finally:
-        release_db_connection(conn)
-        
-# === DB Setup ===
-conn = get_db_connection()
-cursor = get_db_cursor(conn)
-
 #---------------------------------------------------------------------------------------
    
    
@@ -92,66 +104,67 @@ async def scrape_events_data(company_id: int):
         events_added = 0
         today = datetime.now().date()
         
-        for row in event_rows:
-            try:
-                # Extract event details
-                title = row.select_one('div.field-title a')
-                date_day = row.select_one('span.date-day')
-                date_month = row.select_one('span.date-month')
-                image = row.select_one('img[data-src]')
-                link = row.select_one('div.field-title a')
-                read_more = row.select_one('div.field-link-readmore a')
+        async with db_connection() as db:
+            for row in event_rows:
+                try:
+                    # Extract event details
+                    title = row.select_one('div.field-title a')
+                    date_day = row.select_one('span.date-day')
+                    date_month = row.select_one('span.date-month')
+                    image = row.select_one('img[data-src]')
+                    link = row.select_one('div.field-title a')
+                    read_more = row.select_one('div.field-link-readmore a')
                 
-                if not (title and link):
-                    continue
+                    if not (title and link):
+                        continue
                     
-                # Parse the date
-                event_date = None
-                day = date_day.get_text(strip=True) if date_day else None
-                month = date_month.get_text(strip=True) if date_month else None
+                    # Parse the date
+                    event_date = None
+                    day = date_day.get_text(strip=True) if date_day else None
+                    month = date_month.get_text(strip=True) if date_month else None
                 
-                month_map = {
-                    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-                    'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
-                }
+                    month_map = {
+                        'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+                        'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
+                    }
                 
-                if day and month and month.upper() in month_map:
-                    current_year = today.year
-                    month_num = month_map[month.upper()]
-                    try:
-                        event_date = datetime(current_year, month_num, int(day)).date()
-                        # If event date is in past, skip it
-                        if event_date < today:
+                    if day and month and month.upper() in month_map:
+                        current_year = today.year
+                        month_num = month_map[month.upper()]
+                        try:
+                            event_date = datetime(current_year, month_num, int(day)).date()
+                            # If event date is in past, skip it
+                            if event_date < today:
+                                continue
+                        except ValueError:
                             continue
-                    except ValueError:
-                        continue
                 
-                # Insert event if it doesn't exist
-                cursor.execute("""
-                    INSERT INTO scraped_events (
-                        company_id, title, event_date, date_day, date_month, 
-                        image_url, event_url, read_more_url
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (company_id, event_url) DO NOTHING
-                """, (
-                    company_id,
-                    title.get_text(strip=True),
-                    event_date,
-                    day,
-                    month,
-                    image['data-src'] if image else None,
-                    'https://www.discovertunisia.com' + link['href'],
-                    'https://www.discovertunisia.com' + read_more['href'] if read_more else None
-                ))
+                    # Insert event if it doesn't exist
+                    added = await db.execute("""
+                        INSERT INTO scraped_events (
+                            company_id, title, event_date, date_day, date_month, 
+                            image_url, event_url, read_more_url
+                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (company_id, event_url) DO NOTHING
+                    """, (
+                        company_id,
+                        title.get_text(strip=True),
+                        event_date,
+                        day,
+                        month,
+                        image['data-src'] if image else None,
+                        'https://www.discovertunisia.com' + link['href'],
+                        'https://www.discovertunisia.com' + read_more['href'] if read_more else None
+                    ))
                 
-                if cursor.rowcount > 0:
-                    events_added += 1
+                    if added > 0:
+                        events_added += 1
                     
-            except Exception as e:
-                logger.error(f"Error processing event: {e}")
-                continue
+                except Exception as e:
+                    logger.error(f"Error processing event: {e}")
+                    continue
                 
-        conn.commit()
+            await db.commit()
         logger.info(f"Added {events_added} new events for company {company_id}")
         return events_added
         
@@ -164,16 +177,17 @@ async def scrape_events_data(company_id: int):
 async def get_relevant_events(company_id: int, limit: int = 4) -> list:
     """Get relevant upcoming events for a company"""
     today = datetime.now().date()
-    cursor.execute("""
-        SELECT title, event_date, event_url
-        FROM scraped_events
-        WHERE company_id = %s AND (event_date >= %s OR event_date IS NULL)
-        ORDER BY event_date ASC
-        LIMIT %s
-    """, (company_id, today, limit))
+    async with db_connection() as db:
+        rows = await db.fetchall("""
+            SELECT title, event_date, event_url
+            FROM scraped_events
+            WHERE company_id = %s AND (event_date >= %s OR event_date IS NULL)
+            ORDER BY event_date ASC
+            LIMIT %s
+        """, (company_id, today, limit))
     
     events = []
-    for title, event_date, event_url in cursor.fetchall():
+    for title, event_date, event_url in rows:
         date_str = event_date.strftime("%Y-%m-%d") if event_date else "Date not specified"
         events.append({
             "title": title,
@@ -194,22 +208,6 @@ async def format_events_text(events):
     return text
 
 
-# Extract image prompts -> Image gen model
-def extract_image_prompts(content):
-    """Extract image prompts from strategy content"""
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(content, 'html.parser')
-    prompts = {}
-    
-    prompt_section = soup.find('section', class_='image-prompts')
-    if prompt_section:
-        for card in prompt_section.find_all('div', class_='prompt-card'):
-            prompt_type = card.find('h3').get_text(strip=True)
-            prompt_text = card.find('code').get_text(strip=True)
-            prompts[prompt_type] = prompt_text
-    
-    return prompts    
-
 #--------------------------------- End Helper Functions --------------------------------------------#  
     
     
@@ -221,49 +219,144 @@ def extract_image_prompts(content):
 # Var for gen progress
 generation_progress = {}
 
+# Partial HTML of the sections being generated, as the chunks streamed so far
+# (company_id -> {section_key: [html, ...]}). A rewritten section gets a new list.
+generation_partials = {}
+
+# Events waking the SSE streams as soon as something changes (company_id -> asyncio.Event)
+generation_updates = {}
+
+
+def notify_progress(company_id):
+    """Wake every SSE stream waiting on this company"""
+    event = generation_updates.pop(company_id, None)
+    if event:
+        event.set()
+
+
+async def stream_progress(load_progress, company_id):
+    """
+    SSE generator shared by the company and job streams.
+    load_progress() returns the generation state (local memory or strategy_jobs row),
+    partial section HTML only exists in the process running the generation.
+    """
+    # section_key -> (chunk list, number of its chunks already sent)
+    sent_partials = {}
+    sent_progress = None
+    timed_out = True
+    try:
+        while True:
+            # Grab the event before reading the state so no update is missed
+            update_event = generation_updates.setdefault(company_id, asyncio.Event())
+
+            progress_data = await load_progress()
+            if progress_data:
+                # Relay the partial HTML written since last time, the client appends it.
+                # A section this stream hasn't seen yet, or that was rewritten, is sent whole.
+                for section_key, chunks in list(generation_partials.get(company_id, {}).items()):
+                    sent_chunks, sent_count = sent_partials.get(section_key, (None, 0))
+                    count = len(chunks)
+                    if sent_chunks is chunks and sent_count == count:
+                        continue
+                    if sent_chunks is chunks:
+                        update = {'section': section_key, 'append': "".join(chunks[sent_count:count])}
+                    else:
+                        update = {'section': section_key, 'html': "".join(chunks[:count])}
+                    sent_partials[section_key] = (chunks, count)
+                    yield f"event: section\ndata: {json.dumps(update)}\n\n"
+
+                if progress_data.get('status') == 'completed':
+                    yield f"event: complete\ndata: {json.dumps(progress_data)}\n\n"
+                    break
+                elif timed_out or progress_data != sent_progress:
+                    # Progress when it changes, and every second as a keep-alive
+                    sent_progress = dict(progress_data)
+                    yield f"data: {json.dumps(progress_data)}\n\n"
+
+            try:
+                await asyncio.wait_for(update_event.wait(), timeout=1)
+                timed_out = False
+            except asyncio.TimeoutError:
+                timed_out = True
+    except asyncio.CancelledError:
+        pass
+
+
 # SSE endpoint
 @router.get("/strategy_progress/{company_id}")
 async def strategy_progress(
     company_id: int,
     user: dict = Depends(get_current_user)
 ):
-    async def event_generator():
-        try:
-            while True:
-                if company_id in generation_progress:
-                    progress_data = generation_progress[company_id]
-                    
-                    if progress_data.get('status') == 'completed':
-                        yield f"event: complete\ndata: {json.dumps(progress_data)}\n\n"
-                        break
-                    else:
-                        yield f"data: {json.dumps(progress_data)}\n\n"
-                
-                await asyncio.sleep(1)
-        except asyncio.CancelledError:
-            pass
-    
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    async def load_progress():
+        if company_id in generation_progress:
+            return generation_progress[company_id]
+        # Queued, or running in another worker process
+        return job_progress(await run_db(get_latest_company_job, company_id, user["user_id"]))
+
+    return StreamingResponse(stream_progress(load_progress, company_id), media_type="text/event-stream")
+
+
+# SSE endpoint by job id
+@router.get("/strategy_job/{job_id}/stream")
+async def strategy_job_stream(
+    job_id: int,
+    user: dict = Depends(get_current_user)
+):
+    job = await run_db(get_job, job_id, user["user_id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    company_id = job["company_id"]
+
+    async def load_progress():
+        local = generation_progress.get(company_id)
+        if local and local.get("job_id") == job_id:
+            return local
+        return job_progress(await run_db(get_job, job_id, user["user_id"]))
+
+    return StreamingResponse(stream_progress(load_progress, company_id), media_type="text/event-stream")
+
+
+# Job status endpoint (poll)
+@router.get("/strategy_job/{job_id}")
+async def strategy_job_status(
+    job_id: int,
+    user: dict = Depends(get_current_user)
+):
+    job = await run_db(get_job, job_id, user["user_id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    local = generation_progress.get(job["company_id"])
+    if local and local.get("job_id") == job_id:
+        return local
+    return job_progress(job)
+
 
 # Status check endpoint (fallback)
 @router.get("/check_strategy_status/{company_id}")
 async def check_strategy_status(
     company_id: int,
     user: dict = Depends(get_current_user),
-    cursor = Depends(get_cursor)
+    db = Depends(get_async_db)
 ):
     if company_id in generation_progress:
         return generation_progress[company_id]
+
+    # Queued or generated by another worker process
+    job = await run_db(get_latest_company_job, company_id, user["user_id"])
+    if job and job["status"] in ("queued", "running", "error"):
+        return job_progress(job)
     
     # Check database for completed strategy
-    cursor.execute("""
+    result = await db.fetchone("""
         SELECT id FROM strategies 
         WHERE company_id = %s 
         ORDER BY created_at DESC 
         LIMIT 1
     """, (company_id,))
     
-    result = cursor.fetchone()
     if result:
         return {"status": "completed", "strategy_id": result[0]}
     
@@ -274,15 +367,151 @@ async def check_strategy_status(
 @router.post("/generate_strategy/{company_id}")
 async def generate_strategy(
     company_id: int, 
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
+    """Queue the generation, a worker picks it up and the client follows it by SSE or polling"""
+    if not await db.fetchone("SELECT id FROM companies WHERE id = %s AND user_id = %s", (company_id, user["user_id"])):
+        return JSONResponse({"success": False, "error": "Company not found"}, status_code=404)
+
+    try:
+        job = await run_db(enqueue_job, company_id, user["user_id"])
+    except Exception as e:
+        logger.error(f"Failed to queue strategy generation: {str(e)}")
+        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
+    # Drop the state of a previous generation so the streams read the new job
+    local = generation_progress.get(company_id)
+    if local and local.get("job_id") != job["id"]:
+        generation_progress.pop(company_id, None)
+    notify_progress(company_id)
+    strategy_workers.notify()
+
+    return JSONResponse({
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/strategy_job/{job['id']}",
+        "stream_url": f"/strategy_job/{job['id']}/stream"
+    })
+
+
+async def prepare_strategy_sections(company_id, user_id):
+    """Load the company context and declare the strategy sections (shared by generation and regeneration)"""
+    relevant_events = await get_relevant_events(company_id)
+    # Format events text
+    events_text = await format_events_text(relevant_events)
+
+    async with db_connection() as db:
+        # Get company data
+        company = await db.run(company_profile_cache.get, company_id)
+        
+        if not company or company.user_id != user_id:
+            raise HTTPException(status_code=404, detail="Company not found")
+        
+        # ✅ Fetch all rows
+        events_rows = await db.fetchall("""
+            SELECT title, event_date, event_url
+            FROM scraped_events
+            WHERE company_id = %s
+            ORDER BY event_date ASC
+        """, (company_id,))  # 👈 Notice the comma after company_id (tuple)
+
+    # ✅ Convert to JSON-like list of dicts
+    events_list = [
+        {
+            "title": row[0],
+            "event_date": row[1].strftime("%m/%d/%Y") if row[1] else None,  # formatted date
+            "event_url": row[2]
+        }
+        for row in events_rows
+    ]
+                
+    company_data = company.as_dict()
+    
+    # Format target audience
+    target_audience = f"""
+        - Age Groups: {company_data.get('target_age_groups', 'Not specified')}
+        - Audience Types: {company_data.get('target_audience_types', 'Not specified')}
+        - Business Types: {company_data.get('target_business_types', 'Not specified')}
+        - Geographic Targets: {company_data.get('target_geographics', 'Not specified')}
+        """
     
+    # Get additional data
+    current_date = datetime.now()
+    logo_description = get_logo_description(company_data['logo_url']) if company_data['logo_url'] else ""
+    
+    # Later sections read compact digests of the earlier ones, not their full HTML
+    digests = {}
+
+    def digest(r, section_key):
+        if section_key not in digests:
+            digests[section_key] = digest_section(section_key, r[section_key])
+        return digests[section_key]
+
+    # Declare each section with the sections it reads, independent ones run concurrently
+    sections = [
+        StrategySection(
+            "executive_summary", "Executive Summary",
+            lambda r: generate_executive_summary(company_data, current_date, logo_description)
+        ),
+        StrategySection(
+            "budget_plan", "Budget Plan",
+            lambda r: generate_budget_plan(digest(r, "executive_summary"), company_data, current_date, relevant_events),
+            depends_on=["executive_summary"]
+        ),
+        StrategySection(
+            "events_marketing", "Event Marketing",
+            lambda r: generate_event_strategy(digest(r, "executive_summary"), digest(r, "budget_plan"), company_data, events_text, current_date, events_list),
+            depends_on=["executive_summary", "budget_plan"]
+        ),
+        StrategySection(
+            "content_calendar", "Content Calendar",
+            lambda r: generate_marketing_calendar(digest(r, "executive_summary"), digest(r, "budget_plan"), digest(r, "events_marketing"), company_data, current_date, logo_description, company_id),
+            depends_on=["executive_summary", "budget_plan", "events_marketing"]
+        ),
+        StrategySection(
+            "influencer_section", "Influencer Recommendations",
+            lambda r: generate_influencer_recommendations(
+                digest(r, "executive_summary"),
+                digest(r, "budget_plan"),
+                current_date,
+                company_data,
+                target_audience,
+                company_data['products'],
+                company_data['services']
+            ),
+            depends_on=["executive_summary", "budget_plan"]
+        ),
+        StrategySection(
+            "platform_strategies", "Platform Strategies",
+            lambda r: generate_platform_strategies(company_data, current_date, logo_description)
+        ),
+        StrategySection(
+            "advices_tips", "Marketing Tips & Advice",
+            lambda r: generate_advices_and_tips(company_data, current_date, logo_description)
+        ),
+    ]
+
+    return sections
+
+
+async def run_strategy_job(job):
+    """Generate the strategy of a claimed job (called by the worker pool)"""
+    job_id = job["id"]
+    company_id = job["company_id"]
+    user_id = job["user_id"]
+    worker_id = job["worker_id"]
+
     # Initialize progress tracking
     generation_progress[company_id] = {
         "status": "generating",
         "progress": 0,
-        "currentStep": "Initializing..."
+        "currentStep": "Initializing...",
+        "job_id": job_id
     }
+    generation_partials[company_id] = {}
+    notify_progress(company_id)
     
     ''' Old- backup
     # Web Scraping for events
@@ -299,203 +528,135 @@ async def generate_strategy(
         logger.warning("Event scraping timed out, using existing events")
     '''
     
-    # Web Scraping for events
-    scrape_task = asyncio.create_task(scrape_events_data(company_id))
-    scrape_task_firecrawl = asyncio.create_task(scrape_events_firecrawl(company_id))
-   
     try:
-        await asyncio.wait_for(
-        asyncio.gather(scrape_task, scrape_task_firecrawl, return_exceptions=True),
-        timeout=10
-    )
-    except asyncio.TimeoutError:
-        logger.warning("Event scraping timed out, using existing events")
-        
-    relevant_events = await get_relevant_events(company_id)
-    # Format events text
-    events_text = await format_events_text(relevant_events)
-    
-    try:
-        # Get company data
-        cursor.execute("""
-            SELECT id, name, slogan, description, website, phone_number, products, services,
-                   marketing_goals, target_age_groups, target_audience_types,
-                   target_business_types, target_geographics, preferred_platforms, 
-                   special_events, brand_tone, monthly_budget, logo_url
-            FROM companies WHERE id = %s AND user_id = %s
-        """, (company_id, user["user_id"]))
-        
-        company = cursor.fetchone()
-        if not company:
-            raise HTTPException(status_code=404, detail="Company not found")
-        
-        cursor.execute("""
-            SELECT title, event_date, event_url
-            FROM scraped_events
-            WHERE company_id = %s
-            ORDER BY event_date ASC
-        """, (company_id,))  # 👈 Notice the comma after company_id (tuple)
+        # Web Scraping for events
+        scrape_task = asyncio.create_task(scrape_events_data(company_id))
+        scrape_task_firecrawl = asyncio.create_task(scrape_events_firecrawl(company_id))
+       
+        try:
+            await asyncio.wait_for(
+            asyncio.gather(scrape_task, scrape_task_firecrawl, return_exceptions=True),
+            timeout=10
+        )
+        except asyncio.TimeoutError:
+            logger.warning("Event scraping timed out, using existing events")
+            
+        sections = await prepare_strategy_sections(company_id, user_id)
+
+        # Sections checkpointed by a previous attempt of this job
+        completed = await run_db(load_job_sections, job_id)
 
-        # ✅ Fetch all rows
-        events_rows = cursor.fetchall()
-
-        # ✅ Convert to JSON-like list of dicts
-        events_list = [
-            {
-                "title": row[0],
-                "event_date": row[1].strftime("%m/%d/%Y") if row[1] else None,  # formatted date
-                "event_url": row[2]
-            }
-            for row in events_rows
-        ]
-                    
-        company_data = {
-            'id': company[0],
-            'name': company[1],
-            'slogan': company[2],
-            'description': company[3],
-            'website': company[4],
-            'phone_number': company[5],
-            'products': company[6],
-            'services': company[7],
-            'marketing_goals': company[8],
-            'target_age_groups': company[9],
-            'target_audience_types': company[10],
-            'target_business_types': company[11],
-            'target_geographics': company[12],
-            'preferred_platforms': company[13],
-            'special_events': company[14],
-            'brand_tone': company[15],
-            'monthly_budget': company[16],
-            'logo_url': company[17]
-        }
-        
-        # Format target audience
-        target_audience = f"""
-        - Age Groups: {company_data.get('target_age_groups', 'Not specified')}
-        - Audience Types: {company_data.get('target_audience_types', 'Not specified')}
-        - Business Types: {company_data.get('target_business_types', 'Not specified')}
-        - Geographic Targets: {company_data.get('target_geographics', 'Not specified')}
-        """
-        
-        # Get additional data
-        current_date = datetime.now()
-        logo_description = get_logo_description(company_data['logo_url']) if company_data['logo_url'] else ""
-        relevant_events = await get_relevant_events(company_id)
-        
         # Update progress for each section
         async def update_progress(step, progress_pct):
             generation_progress[company_id] = {
                 "status": "generating",
                 "progress": progress_pct,
-                "currentStep": step
+                "currentStep": step,
+                "job_id": job_id
             }
-        
-        # Generate each section
-        logger.info("Generating executive summary")
-        await update_progress("Generating Executive Summary", 10)
-        executive_summary = await generate_executive_summary(company_data, current_date, logo_description)
-        logger.info("Done executive summary")
-        
-        logger.info("Generating budget plan")
-        await update_progress("Generating Budget Plan", 25)
-        budget_plan = await generate_budget_plan(executive_summary, company_data, current_date, relevant_events)
-        logger.info("Done budget plan")
-        
-        logger.info("Generating event marketing")
-        await update_progress("Generating Event Marketing", 40)
-        events_marketing = await generate_event_strategy(executive_summary, budget_plan, company_data, events_text, current_date, events_list)
-        logger.info("Done event marketing")
-        
-        logger.info("Generating content calendar")
-        await update_progress("Generating Content Calendar", 55)
-        content_calendar = await generate_marketing_calendar(executive_summary, budget_plan, events_marketing, company_data, current_date, logo_description, company_id)
-        logger.info("Done content calendar")
-        
-        logger.info("Generating influencer recommendations")
-        await update_progress("Generating Influencer Recommendations", 70)
-        influencer_section = await generate_influencer_recommendations(
-            executive_summary,
-            budget_plan,
-            current_date,
-            company_data,
-            target_audience,
-            company_data['products'],
-            company_data['services']
+            notify_progress(company_id)
+            # Persist it for the streams served by other worker processes
+            try:
+                await run_db(update_job_progress, job_id, worker_id, step, progress_pct)
+            except Exception as e:
+                logger.warning(f"Could not save progress of job {job_id}: {str(e)}")
+
+        # Relay partial section HTML to the SSE stream as tokens arrive
+        async def update_partial(section_key, html, replace):
+            partials = generation_partials.setdefault(company_id, {})
+            if replace or section_key not in partials:
+                partials[section_key] = [html]
+            else:
+                partials[section_key].append(html)
+            notify_progress(company_id)
+
+        # Persist each section as soon as it is done, a retry resumes from there
+        async def checkpoint_section(section_key, html):
+            try:
+                await run_db(save_job_section, job_id, section_key, html)
+            except Exception as e:
+                logger.warning(f"Could not checkpoint {section_key} of job {job_id}: {str(e)}")
+
+        # Generate all sections
+        results = await run_sections(
+            sections,
+            on_progress=update_progress,
+            on_partial=update_partial if settings.STRATEGY_STREAMING else None,
+            on_section_done=checkpoint_section,
+            completed=completed
         )
-        logger.info("Done influencer recommendations")
-        
-        logger.info("Generating platform strategies")
-        await update_progress("Generating Platform Strategies", 85)
-        platform_strategies = await generate_platform_strategies(company_data, current_date, logo_description)
-        logger.info("Done platform strategies")
-        
-        logger.info("Generating advice and tips")
-        await update_progress("Generating Marketing Tips & Advice", 95)
-        advices_tips = await generate_advices_and_tips(company_data, current_date, logo_description)
-        logger.info("Done advice and tips")
-        
+
         # Combine all sections
-        full_strategy = f"""
-        <div class="marketing-strategy">
-            {executive_summary}
-            {budget_plan}
-            {content_calendar}
-            {events_marketing}
-            {influencer_section}
-            {platform_strategies}
-            {advices_tips}
-        </div>
-        """
+        full_strategy = assemble_strategy(results)
         
         # Save to database
-        cursor.execute("""
-            INSERT INTO strategies (company_id, content, created_at, status)
-            VALUES (%s, %s, NOW(), 'new')
-            RETURNING id
-        """, (company_id, full_strategy))
-        
-        strategy_id = cursor.fetchone()[0]
-        conn.commit()
+        async with db_connection() as db, db.transaction():
+            row = await db.fetchone("""
+                INSERT INTO strategies (company_id, content, created_at, status)
+                VALUES (%s, %s, NOW(), 'new')
+                RETURNING id
+            """, (company_id, full_strategy))
+            
+            strategy_id = row[0]
+            # Same transaction, the job is completed only if the strategy is saved
+            await db.run(attach_job_sections, job_id, strategy_id)
+            # Raises JobLost (rolling the insert back) if another worker took the job over
+            await db.run(complete_job, job_id, worker_id, strategy_id)
         
         # Mark as complete
         generation_progress[company_id] = {
             "status": "completed",
             "strategy_id": strategy_id,
-            "progress": 100
+            "progress": 100,
+            "job_id": job_id
         }
+        notify_progress(company_id)
         
-        # Return JSON instead of redirect
-        return JSONResponse({
-            "success": True,
-            "strategy_id": strategy_id,
-            "redirect_url": f"/strategy/{strategy_id}"
-        })
-        
+    except JobLost:
+        # The worker now running the job reports its progress
+        generation_progress.pop(company_id, None)
+        raise
     except Exception as e:
         logger.error(f"Strategy generation failed: {str(e)}")
         generation_progress[company_id] = {
             "status": "error",
             "error": str(e),
-            "progress": 0
+            "progress": 0,
+            "job_id": job_id
         }
-        return JSONResponse({
-            "success": False,
-            "error": str(e)
-        }, status_code=500)
-        raise HTTPException(status_code=500, detail=str(e))
+        notify_progress(company_id)
+        # The worker pool marks the job as failed
+        raise
     finally:
+        # Partial output is only useful while generating
+        generation_partials.pop(company_id, None)
         # Clean up after 5 minutes
-        asyncio.create_task(cleanup_progress(company_id))
+        asyncio.create_task(cleanup_progress(company_id, job_id))
 
 
 # Cleanup
-async def cleanup_progress(company_id):
+async def cleanup_progress(company_id, job_id=None):
     await asyncio.sleep(300)
-    if company_id in generation_progress:
+    local = generation_progress.get(company_id)
+    # Keep the state of a newer generation of the same company
+    if local and (job_id is None or local.get("job_id") == job_id):
         del generation_progress[company_id] 
 
 
+# Bounded pool of generation workers fed by the strategy_jobs table
+strategy_workers = StrategyWorkerPool(run_strategy_job, size=settings.STRATEGY_WORKERS)
+
+
+@router.on_event("startup")
+async def start_strategy_workers():
+    strategy_workers.start()
+
+
+@router.on_event("shutdown")
+async def stop_strategy_workers():
+    await strategy_workers.stop()
+
+
 '''
 # Old Strategy generation
 @router.post("/generate_strategy/{company_id}")
@@ -641,11 +802,10 @@ async def new_strategy_page(
     request: Request, 
     company_id: int, 
     user: dict = Depends(get_current_user),
-    cursor = Depends(get_cursor)
+    db = Depends(get_async_db)
 ):
     # Check if company belongs to user
-    cursor.execute("SELECT name FROM companies WHERE id = %s AND user_id = %s", (company_id, user["user_id"]))
-    company = cursor.fetchone()
+    company = await db.fetchone("SELECT name FROM companies WHERE id = %s AND user_id = %s", (company_id, user["user_id"]))
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -667,32 +827,36 @@ async def view_strategy(
     request: Request, 
     strategy_id: int, 
     user: dict = Depends(get_current_user),
-    cursor = Depends(get_cursor)
+    db = Depends(get_async_db)
 ):
-    cursor.execute("""
-        SELECT s.id, s.content, s.created_at, s.status, s.approved_at, s.archived_at,
+    strategy = await db.fetchone("""
+        SELECT s.id, s.created_at, s.status, s.approved_at, s.archived_at,
             c.id as company_id, c.name as company_name
         FROM strategies s
         JOIN companies c ON s.company_id = c.id
         WHERE s.id = %s AND c.user_id = %s
     """, (strategy_id, user["user_id"]))
 
-    
-    strategy = cursor.fetchone()
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
     strategy_dict = {
         "id": strategy[0],
-        "content": strategy[1], 
-        "created_at": strategy[2],
-        "status": strategy[3],
-        "approved_at": strategy[4],
-        "archived_at": strategy[5],
-        "company_id": strategy[6],
-        "company_name": strategy[7]
+        "created_at": strategy[1],
+        "status": strategy[2],
+        "approved_at": strategy[3],
+        "archived_at": strategy[4],
+        "company_id": strategy[5],
+        "company_name": strategy[6]
     }
     
+    # Render from the stored sections, only older strategies load the full document
+    sections = await db.run(load_strategy_sections, strategy_id)
+    if sections:
+        content = assemble_strategy(sections)
+    else:
+        content = await db.run(load_strategy_content, strategy_id)
+    strategy_dict["content"] = await db.run(render_strategy_emails, strategy_id, content)
     
     return templates.TemplateResponse("strategy.html", {
         "request": request,
@@ -703,6 +867,73 @@ async def view_strategy(
 #---------------------------------------------------------------------------------------
 
 
+# Regenerate one section of a strategy
+@router.post("/regenerate_section/{strategy_id}/{section_key}")
+async def regenerate_section(
+    strategy_id: int,
+    section_key: str,
+    user: dict = Depends(get_current_user)
+):
+    """Generate one section again, the other sections are used as its inputs and kept"""
+    if section_key not in SECTION_ORDER:
+        return JSONResponse({"success": False, "error": "Unknown section"}, status_code=400)
+
+    # No connection is held while the section is generated
+    async with db_connection() as db:
+        strategy = await db.fetchone("""
+            SELECT s.id, s.status, s.company_id
+            FROM strategies s
+            JOIN companies c ON s.company_id = c.id
+            WHERE s.id = %s AND c.user_id = %s
+        """, (strategy_id, user["user_id"]))
+        if not strategy:
+            return JSONResponse({"success": False, "error": "Strategy not found"}, status_code=404)
+
+        # Approved strategies already have their posts and influencers extracted
+        if strategy[1] != 'new':
+            return JSONResponse(
+                {"success": False, "error": "Can only regenerate sections of new strategies"},
+                status_code=400
+            )
+
+        stored = await db.run(load_strategy_sections, strategy_id)
+
+    if set(stored) != set(SECTION_ORDER):
+        return JSONResponse(
+            {"success": False, "error": "This strategy has no stored sections, regenerate the whole strategy"},
+            status_code=409
+        )
+
+    try:
+        sections = await prepare_strategy_sections(strategy[2], user["user_id"])
+        section = next(s for s in sections if s.key == section_key)
+
+        logger.info(f"Regenerating {section.label} of strategy {strategy_id}")
+        html = await section.generator(dict(stored))
+        stored[section_key] = html
+
+        async with db_connection() as db, db.transaction():
+            # The strategy may have been approved while the section was generated
+            updated = await db.execute(
+                "UPDATE strategies SET content = %s WHERE id = %s AND status = 'new'",
+                (assemble_strategy(stored), strategy_id)
+            )
+            if not updated:
+                return JSONResponse(
+                    {"success": False, "error": "Can only regenerate sections of new strategies"},
+                    status_code=400
+                )
+            await db.run(save_strategy_section, strategy_id, section_key, html)
+
+        return JSONResponse({"success": True, "section": section_key, "html": html})
+
+    except Exception as e:
+        logger.error(f"Section regeneration failed: {str(e)}")
+        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
+#---------------------------------------------------------------------------------------
+
+
 # Save edited Influncers E-mails
 
 # Create limiter instance
@@ -715,6 +946,7 @@ async def save_email(
     strategy_id: int, 
     request: Request,
     user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     """Save individual email content for a strategy"""
     
@@ -731,73 +963,40 @@ async def save_email(
             )
         
         # Verify strategy belongs to user
-        cursor.execute("""
-            SELECT s.id, s.content, s.status, c.user_id 
+        strategy = await db.fetchone("""
+            SELECT s.id, s.status, c.user_id 
             FROM strategies s
             JOIN companies c ON s.company_id = c.id
             WHERE s.id = %s
         """, (strategy_id,))
         
-        strategy = cursor.fetchone()
         if not strategy:
             return JSONResponse(
                 {"success": False, "error": "Strategy not found"},
                 status_code=404
             )
         
-        if strategy[3] != user["user_id"]:
+        if strategy[2] != user["user_id"]:
             return JSONResponse(
                 {"success": False, "error": "Unauthorized"},
                 status_code=403
             )
         
         # Only allow saving for approved strategies
-        if strategy[2] != 'approved':
+        if strategy[1] != 'approved':
             return JSONResponse(
                 {"success": False, "error": "Can only save emails for approved strategies"},
                 status_code=400
             )
         
-        # Parse the strategy content
-        soup = BeautifulSoup(strategy[1], 'html.parser')
-        
-        # Find all email textareas
-        email_textareas = soup.find_all('textarea', class_='editable-email')
-        
-        if email_index >= len(email_textareas):
+        # Only the one email row and its influencer are written, the document is rendered from them
+        if not await db.run(save_strategy_email, strategy_id, email_index, email_content):
             return JSONResponse(
                 {"success": False, "error": "Invalid email index"},
                 status_code=400
             )
         
-        # Update the specific textarea
-        textarea = email_textareas[email_index]
-        textarea.clear()
-        from bs4 import NavigableString
-        textarea.append(NavigableString(email_content))
-        
-        # Update the strategy content in database
-        updated_content = str(soup)
-        cursor.execute("""
-            UPDATE strategies 
-            SET content = %s
-            WHERE id = %s
-        """, (updated_content, strategy_id))
-        
-        # Also update the influencer email in the influencers table
-        cursor.execute("""
-            UPDATE influencers 
-            SET email_text = %s
-            WHERE strategy_id = %s 
-            AND id = (
-                SELECT id FROM influencers 
-                WHERE strategy_id = %s 
-                ORDER BY id 
-                LIMIT 1 OFFSET %s
-            )
-        """, (email_content, strategy_id, strategy_id, email_index))
-        
-        conn.commit()
+        await db.commit()
         
         return JSONResponse({
             "success": True, 
@@ -826,14 +1025,14 @@ async def approve_strategy(
     request: Request, 
     strategy_id: int, 
     user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     
-    # First get the strategy content before archiving others
-    cursor.execute("""
-        SELECT id, content, company_id FROM strategies 
+    # First check the strategy exists before archiving others
+    strategy = await db.fetchone("""
+        SELECT id, company_id FROM strategies 
         WHERE id = %s
     """, (strategy_id,))
-    strategy = cursor.fetchone()
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
@@ -847,65 +1046,59 @@ async def approve_strategy(
         print(f"{key}: {len(str(value))} characters - {str(value)[:100]}...")
     print("=== END DEBUG ===")
     
-    # Parse the original strategy content
-    soup = BeautifulSoup(strategy[1], 'html.parser')
+    # Edited emails, by influencer index
+    emails = {
+        int(key[len("email_"):]): value
+        for key, value in form_data.items()
+        if key.startswith("email_") and key[len("email_"):].isdigit()
+    }
     
-    # Update ALL email textareas with the form data
-    email_textareas = soup.find_all('textarea', class_='editable-email')
-    print(f"Found {len(email_textareas)} textareas in HTML")
+    # Structured data of sections generated in json output mode
+    section_data = await db.run(load_section_data, strategy_id)
     
-    for idx, textarea in enumerate(email_textareas):
-        email_key = f"email_{idx}"
-        if email_key in form_data:
-            print(f"Updating textarea {idx} with {len(form_data[email_key])} characters")
-            # Clear and update textarea content
-            textarea.clear()
-            from bs4 import NavigableString
-            textarea.append(NavigableString(form_data[email_key]))
-        else:
-            print(f"No form data found for {email_key}")
+    # Emails saved while the strategy was approved before, the form edits come on top
+    stored_emails = await db.run(load_strategy_emails, strategy_id)
+    emails = {**stored_emails, **emails}
     
-    # Get the updated strategy content
-    updated_strategy_content = str(soup)
+    # One pass over the document: edited emails applied, everything to save extracted
+    content = await db.run(load_strategy_content, strategy_id)
+    loop = asyncio.get_event_loop()
+    updated_strategy_content, document_index, rendered = await loop.run_in_executor(
+        None, build_strategy_index, content, emails, section_data
+    )
     
     # --------------------------------------------
     
-    # Extract image prompts from strategy content
-    image_prompts = extract_image_prompts(updated_strategy_content)
-    
-    # Archive any existing approved strategy for this company
-    cursor.execute("""
-        UPDATE strategies 
-        SET status = 'denied - archived', archived_at = NOW()
-        WHERE company_id = %s 
-        AND status = 'approved'
-    """, (strategy[2],))
-    
-    # Then approve the selected strategy
-    cursor.execute("""
-        UPDATE strategies 
-        SET content = %s, status = 'approved', approved_at = NOW()
-        WHERE id = %s
-        RETURNING company_id
-    """, (updated_strategy_content, strategy_id))
-    
-    company_id = cursor.fetchone()[0]
-    
-    # Now save the content items to database
-    await save_content_items_to_db(strategy_id, company_id, user["user_id"], updated_strategy_content)
-    
-    # Save extracted image prompts
-    for prompt_type, prompt_text in image_prompts.items():
-        cursor.execute("""
-            INSERT INTO image_prompts (strategy_id, company_id, user_id, prompt_text, prompt_type)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (strategy_id, company_id, user["user_id"], prompt_text, prompt_type))
-        
-    # Extract and save influencers - using strategy_content instead of full_strategy
-    print("About to extract influencers...")
-    await extract_and_save_influencers(strategy_id, company_id, user["user_id"], updated_strategy_content)
-    
-    conn.commit()
+    # Everything below is one transaction: the strategy is approved with all its rows or not at all
+    try:
+        async with db.transaction():
+            # Archive any existing approved strategy for this company
+            await db.execute("""
+                UPDATE strategies 
+                SET status = 'denied - archived', archived_at = NOW()
+                WHERE company_id = %s 
+                AND status = 'approved'
+            """, (strategy[1],))
+            
+            # Then approve the selected strategy
+            row = await db.fetchone("""
+                UPDATE strategies 
+                SET content = %s, document_index = %s, status = 'approved', approved_at = NOW()
+                WHERE id = %s
+                RETURNING company_id
+            """, (updated_strategy_content, json.dumps(document_index), strategy_id))
+            
+            company_id = row[0]
+            await db.run(sync_strategy_sections, strategy_id, updated_strategy_content, rendered)
+            await db.run(clear_strategy_emails, strategy_id)
+            
+            # Content items, image prompts and influencers, one batched insert each
+            await db.run(insert_content_items, strategy_id, company_id, user["user_id"], document_index["content_items"])
+            await db.run(insert_image_prompts, strategy_id, company_id, user["user_id"], document_index["image_prompts"])
+            await db.run(insert_influencers, strategy_id, company_id, user["user_id"], document_index["influencers"])
+    except Exception as e:
+        logger.error(f"Strategy approval failed, nothing was saved: {str(e)}")
+        raise HTTPException(status_code=500, detail="Strategy approval failed")
     
     return RedirectResponse(url=f"/company/{company_id}", status_code=303) 
 
@@ -916,9 +1109,10 @@ async def approve_strategy(
 async def archive_and_regenerate(
     strategy_id: int, 
     user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     # Archive the current strategy
-    cursor.execute("""
+    result = await db.fetchone("""
         UPDATE strategies 
         SET status = 'denied - archived', archived_at = NOW()
         WHERE id = %s AND company_id IN (
@@ -927,12 +1121,11 @@ async def archive_and_regenerate(
         RETURNING company_id
     """, (strategy_id, user["user_id"]))
     
-    result = cursor.fetchone()
     if not result:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
     company_id = result[0]
-    conn.commit()
+    await db.commit()
     
     # Old Backup return
     #return RedirectResponse(url=f"/strategy/new/{company_id}", status_code=303)  
@@ -950,11 +1143,11 @@ async def archive_and_regenerate(
 async def check_strategy_status_by_id(
     strategy_id: int,
     user: dict = Depends(get_current_user),
-    cursor = Depends(get_cursor)
+    db = Depends(get_async_db)
 ):
     """Check strategy status by strategy ID"""
     try:
-        cursor.execute("""
+        result = await db.fetchone("""
             SELECT status 
             FROM strategies 
             WHERE id = %s AND company_id IN (
@@ -962,7 +1155,6 @@ async def check_strategy_status_by_id(
             )
         """, (strategy_id, user["user_id"]))
         
-        result = cursor.fetchone()
         if not result:
             return JSONResponse({"status": "not_found"}, status_code=404)
         
@@ -982,10 +1174,11 @@ async def check_strategy_status_by_id(
 @router.get("/get_last_approved_strategy_date/{company_id}")
 async def get_last_approved_strategy_date(
     company_id: int,
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     try:
-        cursor.execute("""
+        result = await db.fetchone("""
             SELECT approved_at 
             FROM strategies 
             WHERE company_id = %s 
@@ -994,7 +1187,6 @@ async def get_last_approved_strategy_date(
             LIMIT 1
         """, (company_id,))
         
-        result = cursor.fetchone()
         if result and result[0]:
             return {"approved_date": result[0].strftime("%Y-%m-%d %H:%M:%S")}
         else:
@@ -1007,16 +1199,16 @@ async def get_last_approved_strategy_date(
 # Helper to get the company then get the approved strategy 
 @router.get("/get_user_companies")
 async def get_user_companies(
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     try:
-        cursor.execute("""
+        companies = await db.fetchall("""
             SELECT id, name FROM companies 
             WHERE user_id = %s 
             ORDER BY created_at DESC
         """, (user["user_id"],))
         
-        companies = cursor.fetchall()
         return {
             "companies": [
                 {"id": company[0], "name": company[1]} 
@@ -1037,21 +1229,21 @@ async def edit_strategy_form(
     request: Request, 
     strategy_id: int, 
     user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
-    cursor.execute("""
+    strategy = await db.fetchone("""
         SELECT s.id, s.content, s.created_at, c.id as company_id, c.name as company_name
         FROM strategies s
         JOIN companies c ON s.company_id = c.id
         WHERE s.id = %s AND c.user_id = %s
     """, (strategy_id, user["user_id"]))
     
-    strategy = cursor.fetchone()
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
     strategy_dict = {
         "id": strategy[0],
-        "content": strategy[1],
+        "content": await db.run(render_strategy_emails, strategy_id, strategy[1]),
         "created_at": strategy[2].strftime("%Y-%m-%d %H:%M"),
         "company_id": strategy[3],
         "company_name": strategy[4]
@@ -1069,21 +1261,26 @@ async def update_strategy(
     strategy_id: int,
     content: str = Form(...),
     user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     
     # Check if strategy belongs to user
-    cursor.execute("""
+    strategy = await db.fetchone("""
         SELECT s.id
         FROM strategies s
         JOIN companies c ON s.company_id = c.id
         WHERE s.id = %s AND c.user_id = %s
     """, (strategy_id, user["user_id"]))
     
-    if not cursor.fetchone():
+    if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
-    cursor.execute("UPDATE strategies SET content = %s WHERE id = %s", (content, strategy_id))
-    conn.commit()
+    async with db.transaction():
+        await db.execute("UPDATE strategies SET content = %s, document_index = NULL WHERE id = %s", (content, strategy_id))
+        await db.run(sync_strategy_sections, strategy_id, content)
+        await db.run(strategy_content_cache.invalidate, strategy_id)
+        # The edit form showed the stored emails, the submitted document holds them now
+        await db.run(clear_strategy_emails, strategy_id)
     
     return RedirectResponse(url=f"/strategy/{strategy_id}", status_code=303)
 
@@ -1095,32 +1292,29 @@ async def update_strategy(
 async def delete_strategy(
     strategy_id: int, 
     user: dict = Depends(get_current_user),
-    cursor = Depends(get_cursor)
+    db = Depends(get_async_db)
 ):
     try:
         # Check if strategy belongs to user and get company_id
-        cursor.execute("""
+        result = await db.fetchone("""
             SELECT s.id, c.id as company_id
             FROM strategies s
             JOIN companies c ON s.company_id = c.id
             WHERE s.id = %s AND c.user_id = %s
         """, (strategy_id, user["user_id"]))
         
-        result = cursor.fetchone()
         if not result:
             raise HTTPException(status_code=404, detail="Strategy not found")
         
         company_id = result[1]
         
         # Just delete the strategy - related records cascade automatically
-        cursor.execute("DELETE FROM strategies WHERE id = %s", (strategy_id,))
+        await db.execute("DELETE FROM strategies WHERE id = %s", (strategy_id,))
         
-        cursor.connection.commit()
+        await db.commit()
         
         return RedirectResponse(url=f"/company/{company_id}", status_code=303)
         
     except Exception as e:
-        if cursor.connection:
-            cursor.connection.rollback()
         logger.error(f"Error deleting strategy: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to delete strategy")
\ No newline at end of file
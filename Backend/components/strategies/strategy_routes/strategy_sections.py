@@ -0,0 +1,178 @@
+# Imports
+import re
+import json
+import logging
+from typing import Dict, Optional
+from config.config import get_db_connection, get_db_cursor, release_db_connection
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# Order of the sections in the strategy document
+SECTION_ORDER = [
+    "executive_summary",
+    "budget_plan",
+    "content_calendar",
+    "events_marketing",
+    "influencer_section",
+    "platform_strategies",
+    "advices_tips",
+]
+
+# Each section is wrapped in comments so the document can be split back into sections
+SECTION_PATTERN = re.compile(
+    r'<!-- section:(?P<key>[a-z_]+) -->(?P<html>.*?)<!-- /section:(?P=key) -->',
+    re.DOTALL
+)
+
+
+def assemble_strategy(sections: Dict[str, str]) -> str:
+    """Build the full strategy document from its sections"""
+    parts = [
+        f"<!-- section:{key} -->\n{sections[key]}\n<!-- /section:{key} -->"
+        for key in SECTION_ORDER if key in sections
+    ]
+    body = "\n".join(parts)
+    return f"""
+        <div class="marketing-strategy">
+            {body}
+        </div>
+        """
+
+
+def split_strategy(content: str) -> Dict[str, str]:
+    """Sections of a document built by assemble_strategy (empty for older strategies)"""
+    return {
+        match.group("key"): match.group("html").strip()
+        for match in SECTION_PATTERN.finditer(content or "")
+        if match.group("key") in SECTION_ORDER
+    }
+
+
+def replace_section(content: str, section_key: str, html: str) -> str:
+    """Swap the HTML of one section in a document built by assemble_strategy"""
+    pattern = re.compile(
+        rf'(<!-- section:{section_key} -->).*?(<!-- /section:{section_key} -->)',
+        re.DOTALL
+    )
+    return pattern.sub(lambda m: f"{m.group(1)}\n{html}\n{m.group(2)}", content, count=1)
+
+
+def section_data_json(html):
+    """Structured data of a section generated in json output mode (None for HTML sections)"""
+    data = getattr(html, "data", None)
+    return json.dumps(data) if data is not None else None
+
+
+#--------------------------------- Job checkpoints --------------------------------------------#
+
+
+def save_job_section(job_id: int, section_key: str, html: str):
+    """Checkpoint a finished section so a retried job doesn't generate it again"""
+    conn = get_db_connection()
+    cursor = get_db_cursor(conn)
+    try:
+        cursor.execute("""
+            INSERT INTO strategy_sections (job_id, section_key, content, data)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (job_id, section_key)
+            DO UPDATE SET content = EXCLUDED.content, data = EXCLUDED.data, updated_at = NOW()
+        """, (job_id, section_key, html, section_data_json(html)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        release_db_connection(conn)
+
+
+def load_job_sections(job_id: int) -> Dict[str, str]:
+    conn = get_db_connection()
+    cursor = get_db_cursor(conn)
+    try:
+        cursor.execute("""
+            SELECT section_key, content FROM strategy_sections
+            WHERE job_id = %s AND strategy_id IS NULL
+        """, (job_id,))
+        return {key: html for key, html in cursor.fetchall()}
+    finally:
+        cursor.close()
+        release_db_connection(conn)
+
+
+def attach_job_sections(cursor, job_id: int, strategy_id: int):
+    """Link the job's checkpoints to the saved strategy (caller commits)"""
+    cursor.execute("""
+        UPDATE strategy_sections SET strategy_id = %s, updated_at = NOW()
+        WHERE job_id = %s
+    """, (strategy_id, job_id))
+
+
+#--------------------------------- Strategy sections --------------------------------------------#
+
+
+def load_strategy_sections(cursor, strategy_id: int) -> Dict[str, str]:
+    cursor.execute("""
+        SELECT section_key, content FROM strategy_sections
+        WHERE strategy_id = %s
+    """, (strategy_id,))
+    return {key: html for key, html in cursor.fetchall()}
+
+
+def load_section_data(cursor, strategy_id: int) -> Dict[str, dict]:
+    """Structured data of the strategy sections generated in json output mode"""
+    cursor.execute("""
+        SELECT section_key, data FROM strategy_sections
+        WHERE strategy_id = %s AND data IS NOT NULL
+    """, (strategy_id,))
+    return {key: data for key, data in cursor.fetchall()}
+
+
+def load_strategy_content(cursor, strategy_id: int) -> Optional[str]:
+    """Full strategy document, metadata queries never select it"""
+    cursor.execute("SELECT content FROM strategies WHERE id = %s", (strategy_id,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def save_strategy_section(cursor, strategy_id: int, section_key: str, html: str):
+    """
+    Store a regenerated or edited section (caller commits).
+    Without new structured data the stored data is kept only if the HTML didn't change.
+    """
+    cursor.execute("""
+        INSERT INTO strategy_sections (strategy_id, section_key, content, data)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (strategy_id, section_key)
+        DO UPDATE SET
+            content = EXCLUDED.content,
+            data = CASE
+                WHEN EXCLUDED.data IS NOT NULL THEN EXCLUDED.data
+                WHEN strategy_sections.content = EXCLUDED.content THEN strategy_sections.data
+                ELSE NULL
+            END,
+            updated_at = NOW()
+    """, (strategy_id, section_key, html, section_data_json(html)))
+
+
+def sync_strategy_sections(cursor, strategy_id: int, content: str, rendered: Dict[str, str] = None):
+    """
+    Keep the stored sections in line with an edited document (emails, manual edit).
+    If the markers were lost in the edit, the sections are dropped and the
+    document itself is shown again (caller commits).
+    rendered holds sections re-rendered from updated structured data.
+    """
+    sections = split_strategy(content)
+    sections.update({key: html for key, html in (rendered or {}).items() if key in sections})
+    if not sections:
+        cursor.execute("DELETE FROM strategy_sections WHERE strategy_id = %s", (strategy_id,))
+        return
+
+    cursor.execute("""
+        DELETE FROM strategy_sections
+        WHERE strategy_id = %s AND NOT (section_key = ANY(%s))
+    """, (strategy_id, list(sections)))
+    for section_key, html in sections.items():
+        save_strategy_section(cursor, strategy_id, section_key, html)
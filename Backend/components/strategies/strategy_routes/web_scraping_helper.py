@@ -5,7 +5,7 @@ import requests
 from config.config import settings
 from datetime import datetime, timedelta
 import logging
-from config.config import get_db_connection, get_db_cursor, release_db_connection
+from config.async_db import db_connection
 
 # Initialize router
 router = APIRouter(
@@ -21,19 +21,6 @@ FIRECRAWL_API_KEY = settings.FIRECRAWL_API_KEY_3
 FIRECRAWL_API_URL = settings.FIRECRAWL_API_URL
 
 
-# Dependency to get database cursor
-async def get_cursor():
-    conn = get_db_connection()
-    cursor = get_db_cursor(conn)
-    try:
-        yield cursor
-    finally:
-        release_db_connection(conn)
-        
-# === DB Setup ===
-conn = get_db_connection()
-cursor = get_db_cursor(conn)
-
 # Firecrawl Events Scraping
 async def scrape_events_firecrawl(company_id: int):
     """Scrape events data using Firecrawl API and store in database"""
@@ -148,35 +135,38 @@ async def process_firecrawl_events(company_id: int, markdown_content: str) -> in
         events.append(current_event)
     
     # Insert events into database
-    for event in events:
-        if not event.get('event_date') or event['event_date'] < today:
-            continue
-            
-        try:
-            cursor.execute("""
-                INSERT INTO scraped_events (
-                    company_id, title, event_date, date_day, date_month, 
-                    image_url, event_url, read_more_url
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                company_id,
-                event['title'],
-                event.get('event_date'),
-                event.get('date_day'),
-                event.get('date_month'),
-                None,  # Firecrawl doesn't provide image URLs in markdown
-                event.get('event_url'),
-                event.get('event_url')  # Use same URL for read_more_url
-            ))
-            
-            if cursor.rowcount > 0:
-                events_added += 1
+    async with db_connection() as db:
+        for event in events:
+            if not event.get('event_date') or event['event_date'] < today:
+                continue
                 
-        except Exception as e:
-            logger.error(f"Error inserting Firecrawl event: {e}")
-            continue
-    
-    conn.commit()
+            try:
+                # Already scraped events are skipped, a failed insert would abort the others
+                added = await db.execute("""
+                    INSERT INTO scraped_events (
+                        company_id, title, event_date, date_day, date_month, 
+                        image_url, event_url, read_more_url
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (company_id, event_url) DO NOTHING
+                """, (
+                    company_id,
+                    event['title'],
+                    event.get('event_date'),
+                    event.get('date_day'),
+                    event.get('date_month'),
+                    None,  # Firecrawl doesn't provide image URLs in markdown
+                    event.get('event_url'),
+                    event.get('event_url')  # Use same URL for read_more_url
+                ))
+                
+                if added > 0:
+                    events_added += 1
+                    
+            except Exception as e:
+                logger.error(f"Error inserting Firecrawl event: {e}")
+                continue
+        
+        await db.commit()
     logger.info(f"Added {events_added} new events from Firecrawl for company {company_id}")
     return events_added
 
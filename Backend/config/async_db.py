@@ -0,0 +1,113 @@
+# Imports
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Callable, List, Optional
+from fastapi import Request
+from config.config import settings, get_db_connection, get_db_cursor, release_db_connection
+from config.db_pool import caller_owner
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# Database work runs on its own threads, never on the event loop or the default executor
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_MAX_CONNECTIONS,
+    thread_name_prefix="db"
+)
+
+# Threads that may wait for a free connection: checkouts, and helpers taking their own
+# pooled connection. A waiter never takes a database thread, so the holders can always
+# run the queries that let them release their connections.
+pool_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_MAX_CONNECTIONS * 2,
+    thread_name_prefix="db-pool"
+)
+
+
+async def run_pooled(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking helper that checks out (and returns) its own connection"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool_executor, partial(func, *args, **kwargs))
+
+
+class AsyncDB:
+    """
+    One pooled connection owned by a single request or task.
+    Statements run on the database threads one at a time, so a slow query doesn't
+    stall the event loop and concurrent requests never share a cursor.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = get_db_cursor(conn)
+        self._lock = asyncio.Lock()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func(cursor, *args) on the database threads (for helpers taking a cursor)"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(db_executor, partial(func, self.cursor, *args, **kwargs))
+
+    async def execute(self, query: str, params: tuple = None) -> int:
+        """Run one statement, returns the affected row count"""
+        def work(cursor):
+            cursor.execute(query, params)
+            return cursor.rowcount
+        return await self.run(work)
+
+    async def fetchone(self, query: str, params: tuple = None) -> Optional[tuple]:
+        def work(cursor):
+            cursor.execute(query, params)
+            return cursor.fetchone()
+        return await self.run(work)
+
+    async def fetchall(self, query: str, params: tuple = None) -> List[tuple]:
+        def work(cursor):
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        return await self.run(work)
+
+    async def commit(self):
+        await self.run(lambda cursor: self.conn.commit())
+
+    async def rollback(self):
+        await self.run(lambda cursor: self.conn.rollback())
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Commit the block's statements together, roll them back if it raises"""
+        try:
+            yield self
+            await self.commit()
+        except BaseException:
+            await self.rollback()
+            raise
+
+
+@asynccontextmanager
+async def db_connection(owner: Optional[str] = None):
+    """Pooled connection for a block of async code, anything left uncommitted is rolled back"""
+    loop = asyncio.get_running_loop()
+    conn = await loop.run_in_executor(pool_executor, get_db_connection, owner or caller_owner())
+    db = AsyncDB(conn)
+    try:
+        yield db
+    finally:
+        try:
+            await db.rollback()
+            db.cursor.close()
+        except Exception as e:
+            logger.warning(f"Could not reset database connection: {str(e)}")
+        finally:
+            # Returning a connection never waits, no thread is needed for it
+            release_db_connection(conn)
+
+
+async def get_async_db(request: Request):
+    """FastAPI dependency: a connection scoped to the request"""
+    async with db_connection(f"{request.method} {request.url.path}") as db:
+        yield db
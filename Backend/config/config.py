@@ -1,9 +1,10 @@
 import os
+import tempfile
 import cloudinary
-import psycopg2
-from psycopg2 import pool
 from dotenv import load_dotenv
 from pathlib import Path
+from typing import Optional
+from config.db_pool import InstrumentedConnectionPool
 
 # 1. Load environment variables
 env_path = Path(__file__).parent / '.env'
@@ -71,6 +72,33 @@ class Settings:
         self.DB_HOST = get_env("DB_HOST", "localhost")
         self.DB_MIN_CONNECTIONS = int(get_env("DB_MIN_CONNECTIONS", "1"))
         self.DB_MAX_CONNECTIONS = int(get_env("DB_MAX_CONNECTIONS", "10"))
+        # Seconds to wait for a free connection, and before a checkout is reported as a leak (0 disables)
+        self.DB_POOL_TIMEOUT = float(get_env("DB_POOL_TIMEOUT", "30"))
+        self.DB_LEAK_TIMEOUT = float(get_env("DB_LEAK_TIMEOUT", "120"))
+        
+        # Strategy generation
+        self.STRATEGY_STREAMING = get_env("STRATEGY_STREAMING", "true").lower() == "true"
+        self.STRATEGY_WORKERS = int(get_env("STRATEGY_WORKERS", "2"))
+        # "html" (free-form section HTML) or "json" (schema-validated sections rendered with templates)
+        self.STRATEGY_OUTPUT_MODE = get_env("STRATEGY_OUTPUT_MODE", "html").lower()
+        self.LLM_MAX_CONCURRENCY_PER_KEY = int(get_env("LLM_MAX_CONCURRENCY_PER_KEY", "4"))
+        self.GROQ_REQUESTS_PER_MINUTE = int(get_env("GROQ_REQUESTS_PER_MINUTE", "30"))
+        
+        # Tavily research cache
+        self.RESEARCH_CACHE_TTL = int(get_env("RESEARCH_CACHE_TTL", "43200"))
+        self.RESEARCH_CACHE_MAX_ENTRIES = int(get_env("RESEARCH_CACHE_MAX_ENTRIES", "512"))
+        self.RESEARCH_CACHE_PERSIST = get_env("RESEARCH_CACHE_PERSIST", "true").lower() == "true"
+        
+        # Parsed strategy (launch data) cache
+        self.STRATEGY_CONTENT_CACHE_MAX_ENTRIES = int(get_env("STRATEGY_CONTENT_CACHE_MAX_ENTRIES", "256"))
+        
+        # Company profile cache (seconds before a cached profile is checked against its version)
+        self.COMPANY_PROFILE_CACHE_MAX_ENTRIES = int(get_env("COMPANY_PROFILE_CACHE_MAX_ENTRIES", "512"))
+        self.COMPANY_PROFILE_CACHE_REVALIDATE = float(get_env("COMPANY_PROFILE_CACHE_REVALIDATE", "30"))
+        
+        # Brand kits (logo, palette, fitted logos) used to frame posts, empty dir keeps them in memory only
+        self.BRAND_KIT_CACHE_MAX_ENTRIES = int(get_env("BRAND_KIT_CACHE_MAX_ENTRIES", "32"))
+        self.BRAND_KIT_DIR = get_env("BRAND_KIT_DIR", os.path.join(tempfile.gettempdir(), "brand_kits"))
         
         
         print("✅ Configuration loaded successfully")
@@ -93,19 +121,21 @@ cloudinary.config(
     secure=True
 )
 
-# 7. Database Connection Pool
-db_pool = psycopg2.pool.SimpleConnectionPool(
+# 7. Database Connection Pool (thread-safe, reports checkout metrics)
+db_pool = InstrumentedConnectionPool(
     minconn=settings.DB_MIN_CONNECTIONS,
     maxconn=settings.DB_MAX_CONNECTIONS,
+    timeout=settings.DB_POOL_TIMEOUT,
+    leak_timeout=settings.DB_LEAK_TIMEOUT,
     dbname=settings.DB_NAME,
     user=settings.DB_USER,
     password=settings.DB_PASSWORD,
     host=settings.DB_HOST
 )
 
-def get_db_connection():
-    """Get a database connection from the pool"""
-    return db_pool.getconn()
+def get_db_connection(owner: Optional[str] = None):
+    """Get a database connection from the pool, waits while all of them are in use"""
+    return db_pool.getconn(owner)
 
 def release_db_connection(conn):
     """Release a connection back to the pool"""
@@ -0,0 +1,53 @@
+# Imports
+import logging
+from pathlib import Path
+from config.config import get_db_connection, get_db_cursor, release_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Folder holding the schema changes, applied in file name order (001_..., 002_...)
+SQL_DIR = Path(__file__).parent / "sql"
+
+# Any constant works, it only has to be the same for every worker
+MIGRATIONS_LOCK_ID = 815_001
+
+
+def apply_migrations():
+    """Apply the .sql files from config/sql that were not applied yet"""
+    conn = get_db_connection()
+    cursor = get_db_cursor(conn)
+    try:
+        # Several uvicorn workers start at the same time, only one migrates
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_ID,))
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name TEXT PRIMARY KEY,
+                applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+        """)
+        conn.commit()
+
+        cursor.execute("SELECT name FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+
+        for sql_file in sorted(SQL_DIR.glob("*.sql")):
+            if sql_file.name in applied:
+                continue
+
+            logger.info(f"Applying migration {sql_file.name}")
+            try:
+                cursor.execute(sql_file.read_text(encoding="utf-8"))
+                cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (sql_file.name,))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Migration {sql_file.name} failed: {str(e)}")
+                raise
+
+    finally:
+        conn.rollback()
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_ID,))
+        conn.commit()
+        cursor.close()
+        release_db_connection(conn)
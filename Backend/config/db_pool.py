@@ -0,0 +1,174 @@
+# Imports
+import os
+import sys
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from psycopg2 import pool
+
+logger = logging.getLogger(__name__)
+
+#---------------------------------------------------------------------------------------
+
+# Frames in these files are pool plumbing, the owner is the first caller outside them
+CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUMBING_DIRS = (CONFIG_DIR, os.path.dirname(threading.__file__))
+
+
+class PoolTimeout(pool.PoolError):
+    """No connection was returned to the pool in time"""
+
+
+@dataclass
+class Checkout:
+    owner: str
+    thread: str
+    acquired_at: float
+    leak_reported: bool = False
+
+
+def caller_owner(depth: int = 2) -> str:
+    """file:line (function) of the first frame outside the pool plumbing"""
+    frame = sys._getframe(depth)
+    while frame is not None and frame.f_code.co_filename.startswith(PLUMBING_DIRS):
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{frame.f_lineno} ({code.co_name})"
+
+
+class InstrumentedConnectionPool:
+    """
+    Thread-safe psycopg2 pool. A checkout waits up to `timeout` seconds for a free
+    connection instead of failing at once, and every checkout is recorded with its
+    owner so wait/hold times, usage and connections never returned can be reported.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float, leak_timeout: float, **kwargs):
+        self._pool = pool.ThreadedConnectionPool(minconn, maxconn, **kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._checkouts: Dict[int, Checkout] = {}
+
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.leak_timeout = leak_timeout
+
+        self._waiting = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._released = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._hold_total = 0.0
+        self._hold_max = 0.0
+
+        if leak_timeout > 0:
+            threading.Thread(target=self._watch_leaks, name="db-pool-leaks", daemon=True).start()
+
+    def getconn(self, owner: Optional[str] = None):
+        owner = owner or caller_owner()
+        start = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        waited = time.monotonic() - start
+
+        if not acquired:
+            with self._lock:
+                self._timeouts += 1
+            holders = ", ".join(f"{c['owner']} {c['held_s']}s" for c in self.checkouts())
+            logger.error(f"Database pool exhausted, {owner} waited {waited:.1f}s. Held by: {holders}")
+            raise PoolTimeout(f"No database connection available after {waited:.1f}s")
+
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._checkouts[id(conn)] = Checkout(owner, threading.current_thread().name, time.monotonic())
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        with self._lock:
+            checkout = self._checkouts.pop(id(conn), None)
+            if checkout is not None:
+                held = time.monotonic() - checkout.acquired_at
+                self._released += 1
+                self._hold_total += held
+                self._hold_max = max(self._hold_max, held)
+                if checkout.leak_reported:
+                    logger.info(f"Connection held by {checkout.owner} returned after {held:.1f}s")
+        try:
+            self._pool.putconn(conn, close=close)
+        finally:
+            if checkout is not None:
+                self._slots.release()
+
+    def closeall(self):
+        self._pool.closeall()
+
+    #--------------------------------- Metrics --------------------------------------------#
+
+    def checkouts(self) -> List[Dict[str, Any]]:
+        """Connections currently out of the pool, longest held first"""
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._checkouts.values())
+        return [
+            {"owner": c.owner, "thread": c.thread, "held_s": round(now - c.acquired_at, 1)}
+            for c in sorted(items, key=lambda c: c.acquired_at)
+        ]
+
+    def leaks(self) -> List[Dict[str, Any]]:
+        """Checkouts held longer than the leak timeout"""
+        return [c for c in self.checkouts() if self.leak_timeout > 0 and c["held_s"] >= self.leak_timeout]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_use = len(self._checkouts)
+            stats = {
+                "max": self.maxconn,
+                "in_use": in_use,
+                # Opened connections sitting in the pool, more can still be opened up to max
+                "idle": len(self._pool._pool),
+                "waiting": self._waiting,
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "wait_avg_ms": round(self._wait_total / self._acquired * 1000, 2) if self._acquired else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 2),
+                "hold_avg_ms": round(self._hold_total / self._released * 1000, 2) if self._released else 0.0,
+                "hold_max_ms": round(self._hold_max * 1000, 2),
+            }
+        stats["leaks"] = self.leaks()
+        return stats
+
+    def _watch_leaks(self):
+        """Log every checkout once it has been held longer than the leak timeout"""
+        while True:
+            time.sleep(max(self.leak_timeout / 4, 1))
+            now = time.monotonic()
+            with self._lock:
+                leaked = [
+                    c for c in self._checkouts.values()
+                    if not c.leak_reported and now - c.acquired_at >= self.leak_timeout
+                ]
+                for checkout in leaked:
+                    checkout.leak_reported = True
+            for checkout in leaked:
+                logger.warning(
+                    f"Possible connection leak: held by {checkout.owner} on thread "
+                    f"{checkout.thread} for {now - checkout.acquired_at:.0f}s"
+                )
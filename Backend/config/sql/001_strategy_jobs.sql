@@ -0,0 +1,31 @@
+-- Durable queue for strategy generation, workers claim jobs with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS strategy_jobs (
+    id SERIAL PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued, running, completed, error
+    progress INTEGER NOT NULL DEFAULT 0,
+    current_step TEXT,
+    strategy_id INTEGER REFERENCES strategies(id) ON DELETE SET NULL,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Claim order
+CREATE INDEX IF NOT EXISTS idx_strategy_jobs_queued
+    ON strategy_jobs (created_at)
+    WHERE status = 'queued';
+
+-- Latest job of a company (status checks / SSE)
+CREATE INDEX IF NOT EXISTS idx_strategy_jobs_company
+    ON strategy_jobs (company_id, created_at DESC);
+
+-- Only one active generation per company
+CREATE UNIQUE INDEX IF NOT EXISTS uq_strategy_jobs_active_company
+    ON strategy_jobs (company_id)
+    WHERE status IN ('queued', 'running');
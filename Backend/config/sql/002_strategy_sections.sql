@@ -0,0 +1,13 @@
+-- Each generated section stored on its own: checkpoints while the job runs,
+-- then attached to the strategy so single sections can be regenerated
+CREATE TABLE IF NOT EXISTS strategy_sections (
+    id SERIAL PRIMARY KEY,
+    job_id INTEGER REFERENCES strategy_jobs(id) ON DELETE SET NULL,
+    strategy_id INTEGER REFERENCES strategies(id) ON DELETE CASCADE,
+    section_key VARCHAR(50) NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    UNIQUE (job_id, section_key),
+    UNIQUE (strategy_id, section_key)
+);
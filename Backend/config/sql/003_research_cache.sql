@@ -0,0 +1,11 @@
+-- Persistent tier of the Tavily research cache, shared by every worker process
+CREATE TABLE IF NOT EXISTS research_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    query TEXT NOT NULL,
+    response JSONB NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_research_cache_expires
+    ON research_cache (expires_at);
@@ -0,0 +1,3 @@
+-- Structured (JSON) content of the sections generated in json output mode,
+-- read directly at approval instead of parsing the section HTML again
+ALTER TABLE strategy_sections ADD COLUMN IF NOT EXISTS data JSONB;
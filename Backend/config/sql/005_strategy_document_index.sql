@@ -0,0 +1,3 @@
+-- Everything extracted from an approved strategy in one pass (content items,
+-- influencers, emails, image prompts, launch page data)
+ALTER TABLE strategies ADD COLUMN IF NOT EXISTS document_index JSONB;
@@ -0,0 +1,23 @@
+-- Influencer emails edited after approval, one row per email, rendered over
+-- the strategy document instead of rewriting it on every autosave
+CREATE TABLE IF NOT EXISTS strategy_emails (
+    strategy_id INTEGER NOT NULL REFERENCES strategies(id) ON DELETE CASCADE,
+    email_index INTEGER NOT NULL,
+    email_text TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (strategy_id, email_index)
+);
+
+-- Position of the influencer (and its email textarea) in the strategy
+ALTER TABLE influencers ADD COLUMN IF NOT EXISTS email_index INTEGER;
+
+UPDATE influencers i
+SET email_index = ranked.position
+FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY strategy_id ORDER BY id) - 1 AS position
+    FROM influencers
+) ranked
+WHERE i.id = ranked.id AND i.email_index IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_influencers_strategy_email_index
+    ON influencers (strategy_id, email_index);
@@ -0,0 +1,8 @@
+-- Persistent tier of the parsed launch data cache, keyed by the document hash
+-- so entries of an edited strategy are never served again
+CREATE TABLE IF NOT EXISTS strategy_content_cache (
+    strategy_id INTEGER PRIMARY KEY REFERENCES strategies(id) ON DELETE CASCADE,
+    content_hash VARCHAR(32) NOT NULL,
+    content JSONB NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
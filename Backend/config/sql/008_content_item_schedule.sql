@@ -0,0 +1,24 @@
+-- Weekly slot of a content item parsed from best_time ("Thursday 9AM"), so the
+-- scheduling polls filter on indexed columns instead of LIKE '%Thursday%'
+ALTER TABLE content_items ADD COLUMN IF NOT EXISTS schedule_weekday SMALLINT;
+ALTER TABLE content_items ADD COLUMN IF NOT EXISTS schedule_hour SMALLINT;
+
+-- ISO weekday (1 = Monday) and hour 0-23, same rules as parse_schedule
+UPDATE content_items
+SET schedule_weekday = CASE
+        WHEN best_time LIKE '%Monday%' THEN 1
+        WHEN best_time LIKE '%Tuesday%' THEN 2
+        WHEN best_time LIKE '%Wednesday%' THEN 3
+        WHEN best_time LIKE '%Thursday%' THEN 4
+        WHEN best_time LIKE '%Friday%' THEN 5
+        WHEN best_time LIKE '%Saturday%' THEN 6
+        WHEN best_time LIKE '%Sunday%' THEN 7
+    END,
+    schedule_hour = (
+        SELECT m[1]::INTEGER % 12 + CASE WHEN UPPER(m[2]) = 'PM' THEN 12 ELSE 0 END
+        FROM regexp_match(best_time, '(\d{1,2})(?::\d{2})?\s*([AP]M)', 'i') AS m
+    )
+WHERE best_time IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_content_items_schedule
+    ON content_items (company_id, strategy_id, status, schedule_weekday, schedule_hour);
@@ -0,0 +1,74 @@
+-- Per-company strategy counts kept up to date by a trigger on strategies,
+-- so the dashboard reads them by key instead of aggregating every strategy
+CREATE TABLE IF NOT EXISTS company_strategy_stats (
+    company_id INTEGER PRIMARY KEY REFERENCES companies(id) ON DELETE CASCADE,
+    strategy_count INTEGER NOT NULL DEFAULT 0,
+    approved_count INTEGER NOT NULL DEFAULT 0,
+    archived_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION bump_company_strategy_stats(p_company_id INTEGER, p_status TEXT, p_delta INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF p_delta < 0 THEN
+        -- No row to create when the company itself is being deleted (cascade)
+        UPDATE company_strategy_stats
+        SET strategy_count = strategy_count + p_delta,
+            approved_count = approved_count + CASE WHEN p_status = 'approved' THEN p_delta ELSE 0 END,
+            archived_count = archived_count + CASE WHEN p_status = 'archived' THEN p_delta ELSE 0 END,
+            updated_at = NOW()
+        WHERE company_id = p_company_id;
+    ELSE
+        INSERT INTO company_strategy_stats AS st (company_id, strategy_count, approved_count, archived_count)
+        VALUES (
+            p_company_id,
+            p_delta,
+            CASE WHEN p_status = 'approved' THEN p_delta ELSE 0 END,
+            CASE WHEN p_status = 'archived' THEN p_delta ELSE 0 END
+        )
+        ON CONFLICT (company_id) DO UPDATE SET
+            strategy_count = st.strategy_count + EXCLUDED.strategy_count,
+            approved_count = st.approved_count + EXCLUDED.approved_count,
+            archived_count = st.archived_count + EXCLUDED.archived_count,
+            updated_at = NOW();
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION strategies_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_company_strategy_stats(OLD.company_id, OLD.status, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_company_strategy_stats(NEW.company_id, NEW.status, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS strategies_stats ON strategies;
+CREATE TRIGGER strategies_stats
+    AFTER INSERT OR DELETE OR UPDATE OF status, company_id ON strategies
+    FOR EACH ROW EXECUTE PROCEDURE strategies_stats_trigger();
+
+-- Counts of the existing strategies
+INSERT INTO company_strategy_stats (company_id, strategy_count, approved_count, archived_count)
+SELECT
+    company_id,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE status = 'approved'),
+    COUNT(*) FILTER (WHERE status = 'archived')
+FROM strategies
+GROUP BY company_id
+ON CONFLICT (company_id) DO UPDATE SET
+    strategy_count = EXCLUDED.strategy_count,
+    approved_count = EXCLUDED.approved_count,
+    archived_count = EXCLUDED.archived_count,
+    updated_at = NOW();
+
+-- The dashboard lists a user's companies newest first
+CREATE INDEX IF NOT EXISTS idx_companies_user_created
+    ON companies (user_id, created_at DESC);
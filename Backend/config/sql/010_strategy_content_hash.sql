@@ -0,0 +1,4 @@
+-- Hash of the strategy document kept next to the metadata, so cache lookups
+-- don't read (and detoast) the document to hash it
+ALTER TABLE strategies
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32) GENERATED ALWAYS AS (md5(content)) STORED;
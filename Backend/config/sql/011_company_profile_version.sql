@@ -0,0 +1,16 @@
+-- Version of the company profile, bumped on every update so cached profiles
+-- held by other workers can be revalidated with a single-column read
+ALTER TABLE companies ADD COLUMN IF NOT EXISTS profile_version INTEGER NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION companies_profile_version_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.profile_version := OLD.profile_version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS companies_profile_version ON companies;
+CREATE TRIGGER companies_profile_version
+    BEFORE UPDATE ON companies
+    FOR EACH ROW EXECUTE PROCEDURE companies_profile_version_trigger();
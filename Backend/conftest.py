@@ -0,0 +1,2 @@
+# Keeps the Backend directory on sys.path, tests import the app packages from there:
+#     cd Backend && python -m pytest tests
@@ -23,11 +23,14 @@ from auth.login import router as login_router
 from auth.signup import router as signup_router
 from auth.logout import router as logout_router
 from auth.auth import get_current_user
+from auth.auth_middleware import AuthMiddleware
 
 from components.users.user_settings import router as settings_router
 
 # DB & settings Import
-from config.config import get_db_connection, get_db_cursor, release_db_connection,settings
+from config.config import settings, db_pool
+from config.async_db import get_async_db
+from config.db_migrations import apply_migrations
 
 # Company router 
 from components.company.company_router import router as company_router
@@ -86,6 +89,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Verifies the token cookie once per request, the user is on request.state.auth
+app.add_middleware(AuthMiddleware)
 
 
 # Mount the static directory
@@ -118,9 +123,8 @@ FIRECRAWL_API_URL= settings.FIRECRAWL_API_KEY_2
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# === DB Setup ===
-conn = get_db_connection()
-cursor = get_db_cursor(conn)
+# Schema changes (config/sql) before any router starts its background work
+apply_migrations()
 
 # === Auth ===
 # Include auth routers
@@ -153,22 +157,20 @@ def landing_page(request: Request):
 
 # Home - Dashboard routes
 @app.get("/home", response_class=HTMLResponse)
-def home(request: Request, user: dict = Depends(get_current_user)):
-    # Fetch companies with accurate strategy counts
-    cursor.execute("""
+async def home(request: Request, user: dict = Depends(get_current_user), db = Depends(get_async_db)):
+    # Fetch companies with their strategy counts (maintained by a trigger, see 009_company_strategy_stats.sql)
+    rows = await db.fetchall("""
         SELECT 
             c.id, 
             c.name, 
             c.created_at,
             c.monthly_budget,
-            COUNT(s.id) as strategy_count,
-            SUM(CASE WHEN s.status = 'approved' THEN 1 ELSE 0 END) as approved_count,
-            SUM(CASE WHEN s.status = 'archived' THEN 1 ELSE 0 END) as archived_count,
-            SUM(CASE WHEN s.status NOT IN ('approved', 'archived') THEN 1 ELSE 0 END) as other_count
+            st.strategy_count,
+            st.approved_count,
+            st.archived_count
         FROM companies c
-        LEFT JOIN strategies s ON c.id = s.company_id
+        LEFT JOIN company_strategy_stats st ON st.company_id = c.id
         WHERE c.user_id = %s
-        GROUP BY c.id, c.name, c.created_at, c.monthly_budget
         ORDER BY c.created_at DESC
     """, (user["user_id"],))
     
@@ -177,7 +179,7 @@ def home(request: Request, user: dict = Depends(get_current_user)):
     total_approved = 0
     total_archived = 0
     
-    for row in cursor.fetchall():
+    for row in rows:
         monthly_budget = float(row[3]) if row[3] is not None else 0
         strategy_count = row[4] or 0
         approved_count = row[5] or 0
@@ -213,16 +215,18 @@ def home(request: Request, user: dict = Depends(get_current_user)):
 @app.get("/get_facebook_analytics")
 async def get_facebook_analytics_endpoint(
     days: int = Query(default=30, ge=1, le=90),
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
-    return await get_facebook_analytics(user["user_id"], cursor, days)
+    return await get_facebook_analytics(user["user_id"], db, days)
 
 @app.get("/get_instagram_analytics")
 async def get_instagram_analytics_endpoint(
     days: int = Query(default=14, ge=1, le=90),
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
-    return await get_instagram_analytics(user["user_id"], cursor, days)
+    return await get_instagram_analytics(user["user_id"], db, days)
 
 @app.get("/get_linkedin_analytics")
 async def get_linkedin_analytics_endpoint(
@@ -231,3 +235,10 @@ async def get_linkedin_analytics_endpoint(
 ):
     return await get_linkedin_analytics(user["user_id"], days)
 
+
+# Database pool checkout metrics (in use / idle, wait and hold times, leaks)
+@app.get("/db_pool_stats")
+def db_pool_stats(user: dict = Depends(get_current_user)):
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return {**db_pool.stats(), "checkouts": db_pool.checkouts()}
\ No newline at end of file
@@ -0,0 +1,195 @@
+# Imports
+from bs4 import BeautifulSoup
+from components.strategies.prompts.digital_marketing import CONTENT_ITEM_FIELDS, parse_content_items
+
+#---------------------------------------------------------------------------------------
+
+
+def nested_scan_parse_content_items(soup):
+    """
+    The extractor parse_content_items replaced, unchanged apart from returning the rows
+    it used to insert: a find/find_all scan inside every div of the whole document.
+    """
+    items = []
+
+    # Find all platform divs
+    platform_divs = soup.find_all('div')
+
+    for platform_div in platform_divs:
+        # Look for h3 with platform name
+        platform_h3 = platform_div.find('h3')
+        if not platform_h3 or 'PLATFORM:' not in platform_h3.get_text():
+            continue
+
+        platform_name = platform_h3.get_text().replace('PLATFORM:', '').strip()
+
+        # Find all content type divs within this platform
+        content_type_divs = platform_div.find_all('div', recursive=False)
+
+        for content_type_div in content_type_divs:
+            # Look for h4 with content type
+            type_h4 = content_type_div.find('h4')
+            if not type_h4 or 'TYPE:' not in type_h4.get_text():
+                continue
+
+            type_name = type_h4.get_text().replace('TYPE:', '').strip()
+
+            # Extract description, frequency, and best_time
+            description_p = content_type_div.find('p', string=lambda t: t and t.startswith('DESCRIPTION:'))
+            frequency_p = content_type_div.find('p', string=lambda t: t and t.startswith('FREQUENCY:'))
+            best_time_p = content_type_div.find('p', string=lambda t: t and t.startswith('BEST TIME:'))
+
+            description = description_p.get_text().replace('DESCRIPTION:', '').strip() if description_p else None
+            frequency = frequency_p.get_text().replace('FREQUENCY:', '').strip() if frequency_p else None
+            best_time = best_time_p.get_text().replace('BEST TIME:', '').strip() if best_time_p else None
+
+            # Find all item divs (look for h5 with ITEM)
+            item_divs = []
+            for item_h5 in content_type_div.find_all('h5', string=lambda t: t and 'ITEM' in t):
+                item_div = item_h5.find_parent('div')
+                if item_div and item_div not in item_divs:
+                    item_divs.append(item_div)
+
+            for item_div in item_divs:
+                # Initialize all fields
+                image_prompt = None
+                video_idea = None
+                video_placeholder = None
+                story_idea = None
+                post_idea = None
+                caption = None
+                hashtags = None
+                schedule_time = None
+
+                # Extract all paragraphs in this item
+                all_ps = item_div.find_all('p')
+
+                for p in all_ps:
+                    text = p.get_text().strip()
+
+                    if text.startswith('IMAGE_PROMPT:'):
+                        image_prompt = text.replace('IMAGE_PROMPT:', '').strip()
+                    elif text.startswith('VIDEO_IDEA:'):
+                        video_idea = text.replace('VIDEO_IDEA:', '').strip()
+                    elif text.startswith('VIDEO_PLACEHOLDER:'):
+                        video_placeholder = text.replace('VIDEO_PLACEHOLDER:', '').strip()
+                    elif text.startswith('STORY_IDEA:'):
+                        story_idea = text.replace('STORY_IDEA:', '').strip()
+                    elif text.startswith('POST_IDEA:'):
+                        post_idea = text.replace('POST_IDEA:', '').strip()
+                    elif text.startswith('Schedule:'):
+                        schedule_time = text.replace('Schedule:', '').strip()
+                        # Ensure the format is correct (Day HourAM/PM)
+                        if schedule_time:
+                            # Clean up any extra spaces or formatting issues
+                            schedule_time = ' '.join(schedule_time.split())
+                    elif text.startswith('CAPTION:'):
+                        caption = text.replace('CAPTION:', '').strip()
+                    elif text.startswith('HASHTAGS:'):
+                        hashtags = text.replace('HASHTAGS:', '').strip()
+
+                # Use schedule time if available, otherwise use best_time
+                final_time = schedule_time if schedule_time else best_time
+
+                items.append(dict(zip(CONTENT_ITEM_FIELDS, (
+                    platform_name, type_name, description,
+                    frequency, final_time, image_prompt,
+                    video_idea, video_placeholder, story_idea,
+                    post_idea, caption, hashtags
+                ))))
+
+    return items
+
+
+# A platform plan quoted in another section of the document (e.g. the executive summary)
+OUTSIDE_PLATFORM_SECTION = (
+    '<section class="executive-summary"><h2>Summary</h2>'
+    '<div><h3>PLATFORM: Example</h3><div><h4>TYPE: Example type</h4>'
+    '<p>DESCRIPTION: quoted plan</p><div><h5>ITEM 1</h5>'
+    '<p>POST_IDEA: outside the platform section</p></div></div></div></section>'
+)
+
+
+def strategy_document(platforms=10, types_per_platform=4, items_per_type=5, before=''):
+    """
+    Platform section shaped like the generated one, with the field variations it produces.
+    before is HTML placed ahead of the section (other sections of the document).
+    """
+    html = [f'<div class="marketing-strategy">{before}'
+            '<section class="social-media-strategy"><h2>Platform Plans</h2>']
+    for p in range(platforms):
+        html.append(f'<div class="platform"><h3 data-platform="P{p}">PLATFORM: Platform {p}</h3>')
+        for t in range(types_per_platform):
+            html.append(f'<div class="content-type"><h4>TYPE: Type {t}</h4>'
+                        f'<p>DESCRIPTION: description {p}-{t}</p>'
+                        f'<p>FREQUENCY: {items_per_type} times/week</p>'
+                        f'<p>BEST TIME: Monday 9AM</p>')
+            for i in range(items_per_type):
+                html.append(f'<div class="item"><h5>ITEM {i + 1}</h5><p>POST_IDEA: idea {p}-{t}-{i}</p>')
+                if t % 2:
+                    html.append(f'<p>VIDEO_IDEA: video {i}</p><p>VIDEO_PLACEHOLDER: clip {i}.mp4</p>')
+                else:
+                    html.append(f'<p style="display: none;">IMAGE_PROMPT: prompt {i}</p>')
+                if i == 2:
+                    html.append(f'<p>STORY_IDEA: story {i}</p>')
+                html.append(f'<p style="display: none;">CAPTION: {"caption text " * 40}</p>'
+                            '<p style="display: none;">HASHTAGS: #brand #launch</p>')
+                # Some items keep the content type's best time
+                if i % 3:
+                    html.append(f'<p>Schedule:  Tuesday   {i % 12 + 1}PM </p>')
+                html.append('</div>')
+            html.append('</div>')
+        html.append('</div>')
+    html.append('</section></div>')
+    return ''.join(html)
+
+
+def test_matches_nested_scan():
+    soup = BeautifulSoup(strategy_document(), 'html.parser')
+
+    items = parse_content_items(soup)
+
+    assert len(items) == 10 * 4 * 5
+    assert items == nested_scan_parse_content_items(soup)
+
+
+def test_fields():
+    soup = BeautifulSoup(strategy_document(platforms=1, types_per_platform=2, items_per_type=3), 'html.parser')
+
+    items = parse_content_items(soup)
+
+    assert [item['post_idea'] for item in items] == [f'idea 0-{t}-{i}' for t in range(2) for i in range(3)]
+    first, second = items[0], items[1]
+    assert first['platform'] == 'Platform 0'
+    assert first['content_type'] == 'Type 0'
+    assert first['description'] == 'description 0-0'
+    assert first['frequency'] == '3 times/week'
+    assert first['image_prompt'] == 'prompt 0'
+    assert first['hashtags'] == '#brand #launch'
+    # No schedule: the content type's best time, otherwise the schedule with its spaces cleaned
+    assert first['best_time'] == 'Monday 9AM'
+    assert second['best_time'] == 'Tuesday 2PM'
+    assert items[3]['video_placeholder'] == 'clip 0.mp4'
+    assert items[5]['story_idea'] == 'story 2'
+
+
+def test_only_the_platform_section_holds_items():
+    soup = BeautifulSoup(strategy_document(platforms=2, before=OUTSIDE_PLATFORM_SECTION), 'html.parser')
+
+    items = parse_content_items(soup)
+    scanned = nested_scan_parse_content_items(soup)
+
+    # Intended difference: the whole document scan also saved plans quoted elsewhere,
+    # the extractor reads the social-media-strategy section only
+    assert [item['platform'] for item in scanned if item['platform'] == 'Example'] == ['Example']
+    assert items == [item for item in scanned if item['platform'] != 'Example']
+    assert len(items) == 2 * 4 * 5
+
+
+def test_no_platform_section():
+    # Documents without the platform section are scanned whole, like before
+    soup = BeautifulSoup(strategy_document(platforms=3).replace('section class="social-media-strategy"', 'section'), 'html.parser')
+
+    assert parse_content_items(soup) == nested_scan_parse_content_items(soup)
+    assert len(parse_content_items(soup)) == 3 * 4 * 5
+    assert parse_content_items(BeautifulSoup('<div><p>POST_IDEA: nothing</p></div>', 'html.parser')) == []
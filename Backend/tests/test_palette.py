@@ -0,0 +1,82 @@
+# Imports
+import numpy as np
+from PIL import Image, ImageDraw
+from components.helpers.palette import extract_palette
+
+#---------------------------------------------------------------------------------------
+
+RED = (220, 30, 40)
+BLUE = (20, 60, 200)
+
+
+def two_color_logo(mode="RGB", background=(255, 255, 255, 255)):
+    """Red disc over a third of a blue bar, on a white or transparent background"""
+    img = Image.new("RGBA", (400, 200), background)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 50, 399, 149), fill=BLUE + (255,))
+    draw.ellipse((20, 20, 180, 180), fill=RED + (255,))
+    return img.convert(mode)
+
+
+def close(a, b, tolerance=12):
+    return all(abs(x - y) <= tolerance for x, y in zip(a, b))
+
+
+def test_two_colors_on_white():
+    palette = extract_palette(two_color_logo(), max_colors=3)
+
+    assert len(palette) == 3
+    colors = [color.rgb for color in palette]
+    assert close(colors[0], (255, 255, 255))
+    assert any(close(c, RED) for c in colors)
+    assert any(close(c, BLUE) for c in colors)
+
+
+def test_transparent_background_is_ignored():
+    palette = extract_palette(two_color_logo("RGBA", (0, 0, 0, 0)), max_colors=3)
+
+    # Only the opaque pixels count, the blue bar covers more of them than the disc
+    assert len(palette) == 2
+    assert close(palette[0].rgb, BLUE)
+    assert close(palette[1].rgb, RED)
+
+
+def test_shares_are_sorted_and_sum_to_one():
+    palette = extract_palette(two_color_logo("RGBA", (0, 0, 0, 0)), max_colors=3)
+
+    shares = [color.share for color in palette]
+    assert shares == sorted(shares, reverse=True)
+    assert abs(sum(shares) - 1.0) < 1e-6
+    # Share of the blue pixels in the drawing, at the size the palette samples it
+    sample = np.asarray(two_color_logo("RGBA", (0, 0, 0, 0)).resize((128, 64), Image.Resampling.NEAREST))
+    opaque = sample.reshape(-1, 4)
+    opaque = opaque[opaque[:, 3] > 0][:, :3]
+    assert abs(palette[0].share - (opaque == BLUE).all(axis=1).mean()) < 0.01
+
+
+def test_single_color():
+    img = Image.new("RGB", (64, 64), BLUE)
+
+    assert extract_palette(img, max_colors=3) == [(BLUE, 1.0)]
+
+
+def test_deterministic():
+    img = two_color_logo()
+
+    assert extract_palette(img) == extract_palette(img.copy())
+    # Same colours whatever the size the logo was uploaded at
+    small = extract_palette(img.resize((200, 100), Image.Resampling.NEAREST))
+    assert [close(a.rgb, b.rgb) for a, b in zip(extract_palette(img), small)] == [True] * 3
+
+
+def test_fully_transparent_image():
+    img = Image.new("RGBA", (300, 300), (255, 0, 0, 0))
+
+    assert extract_palette(img) == []
+
+
+def test_palette_and_grayscale_modes():
+    img = two_color_logo()
+
+    assert len(extract_palette(img.convert("P"))) == 3
+    assert len(extract_palette(img.convert("L"))) >= 2
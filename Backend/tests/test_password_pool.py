@@ -0,0 +1,81 @@
+# Imports
+import asyncio
+import os
+import threading
+import pytest
+from fastapi import HTTPException
+
+# auth.auth refuses to load without a signing key
+os.environ.setdefault("SECRET_KEY", "test-secret")
+from auth.auth import PASSWORD_HASH_MAX_PENDING, PasswordPool, password_pool
+
+#---------------------------------------------------------------------------------------
+
+
+def test_pool_uses_the_configured_limit():
+    assert password_pool.max_pending == PASSWORD_HASH_MAX_PENDING
+
+
+def test_rejects_past_max_pending():
+    pool = PasswordPool(workers=1, max_pending=3)
+    release = threading.Event()
+
+    async def burst():
+        # One hash running and two queued behind it
+        hashes = [asyncio.create_task(pool.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert pool.pending == 3
+
+        with pytest.raises(HTTPException) as refused:
+            await pool.run(release.wait, 5)
+
+        release.set()
+        return refused.value, await asyncio.gather(*hashes)
+
+    refused, results = asyncio.run(burst())
+
+    assert refused.status_code == 503
+    assert refused.headers == {"Retry-After": "1"}
+    assert results == [True, True, True]
+    assert pool.pending == 0
+
+
+def test_accepts_again_once_drained():
+    pool = PasswordPool(workers=2, max_pending=2)
+
+    async def sequential():
+        return [await pool.run(lambda n: n * 2, n) for n in range(5)]
+
+    assert asyncio.run(sequential()) == [0, 2, 4, 6, 8]
+    assert pool.pending == 0
+
+
+def test_run_sync_shares_the_limit():
+    pool = PasswordPool(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def hold_and_call_sync():
+        held = asyncio.create_task(pool.run(release.wait, 5))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(HTTPException) as refused:
+                pool.run_sync(release.wait, 5)
+        finally:
+            release.set()
+        await held
+        return refused.value
+
+    assert asyncio.run(hold_and_call_sync()).status_code == 503
+    assert pool.run_sync(lambda: "hashed") == "hashed"
+    assert pool.pending == 0
+
+
+def test_failed_hash_releases_its_slot():
+    pool = PasswordPool(workers=1, max_pending=1)
+
+    def broken():
+        raise ValueError("bad hash")
+
+    with pytest.raises(ValueError):
+        asyncio.run(pool.run(broken))
+    assert pool.pending == 0
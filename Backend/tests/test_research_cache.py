@@ -0,0 +1,111 @@
+# Imports
+import asyncio
+import pytest
+from components.strategies.prompts import research_cache as research_cache_module
+from components.strategies.prompts.research_cache import ResearchCache
+
+#---------------------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def inline_db(monkeypatch):
+    """The database tier runs its helpers inline instead of on the pool threads"""
+    async def run_pooled(func, *args):
+        return func(*args)
+    monkeypatch.setattr(research_cache_module, "run_pooled", run_pooled)
+
+
+def counting_fetch(release: asyncio.Event, value="result"):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return value
+    return fetch, calls
+
+
+def test_concurrent_lookups_share_one_fetch():
+    cache = ResearchCache(ttl=60, max_entries=10)
+
+    async def lookups():
+        release = asyncio.Event()
+        fetch, calls = counting_fetch(release)
+        waiting = [asyncio.create_task(cache.get_or_fetch("k", "q", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiting), calls
+
+    results, calls = asyncio.run(lookups())
+
+    assert results == ["result"] * 3
+    assert len(calls) == 1
+
+
+def test_cancelled_owner_does_not_fail_waiters():
+    cache = ResearchCache(ttl=60, max_entries=10)
+
+    async def cancel_owner():
+        release = asyncio.Event()
+        fetch, calls = counting_fetch(release)
+        owner = asyncio.create_task(cache.get_or_fetch("k", "q", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_fetch("k", "q", fetch))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await waiter, calls
+
+    value, calls = asyncio.run(cancel_owner())
+
+    assert value == "result"
+    assert len(calls) == 1
+    # The fetch finished and was cached although its owner was gone
+    assert cache._get_local("k") == "result"
+
+
+def test_failed_fetch_is_shared_and_not_cached():
+    cache = ResearchCache(ttl=60, max_entries=10)
+
+    async def failing():
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            raise ValueError("search failed")
+
+        waiting = [asyncio.create_task(cache.get_or_fetch("k", "q", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiting, return_exceptions=True)
+        retry = await cache.get_or_fetch("k", "q", counting_fetch(release, "second")[0])
+        return results, retry
+
+    results, retry = asyncio.run(failing())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert retry == "second"
+
+
+def test_failed_database_write_still_returns_the_value(monkeypatch):
+    cache = ResearchCache(ttl=60, max_entries=10, persist=True)
+
+    def store_db(key, query, value):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(cache, "_load_db", lambda key: None)
+    monkeypatch.setattr(cache, "_store_db", store_db)
+
+    async def lookups():
+        release = asyncio.Event()
+        fetch, calls = counting_fetch(release)
+        waiting = [asyncio.create_task(cache.get_or_fetch("k", "q", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiting)
+
+    assert asyncio.run(lookups()) == ["result", "result"]
+    assert cache._get_local("k") == "result"
@@ -8,6 +8,8 @@ class StrategyNotificationManager {
         this.autoCheckInterval = null;
         this.failureCount = 0;
         this.maxFailures = 3;
+        // Partial HTML received for each section being generated
+        this.sectionHtml = {};
         this.currentStrategyId = null;
         this.userCompanies = []; // Store user's companies
         this.init();
@@ -353,6 +355,7 @@ class StrategyNotificationManager {
                         <div class="step-indicator" id="stepIndicator">
                             Initializing...
                         </div>
+                        <div class="section-preview" id="sectionPreview"></div>
                     </div>
                     <div class="notification-footer" id="notificationFooter">
                         <div class="loading-spinner-small"></div>
@@ -572,6 +575,8 @@ class StrategyNotificationManager {
         }
 
         this.eventSource = new EventSource(`/strategy_progress/${companyId}`);
+        // A new stream starts by sending each section whole
+        this.sectionHtml = {};
 
         this.eventSource.onmessage = (event) => {
             try {
@@ -583,6 +588,23 @@ class StrategyNotificationManager {
             }
         };
 
+        // Partial HTML of the section being written, streamed as it is generated:
+        // the text appended since the last event, or the whole section (html)
+        this.eventSource.addEventListener('section', (event) => {
+            try {
+                const data = JSON.parse(event.data);
+                if (data.append !== undefined) {
+                    this.sectionHtml[data.section] = (this.sectionHtml[data.section] || '') + data.append;
+                } else {
+                    this.sectionHtml[data.section] = data.html;
+                }
+                this.updateSectionPreview(data.section, this.sectionHtml[data.section]);
+                this.failureCount = 0;
+            } catch (error) {
+                console.error('Error parsing section data:', error);
+            }
+        });
+
         this.eventSource.addEventListener('complete', (event) => {
             try {
                 const data = JSON.parse(event.data);
@@ -672,6 +694,15 @@ class StrategyNotificationManager {
         }
     }
 
+    updateSectionPreview(section, html) {
+        const preview = document.getElementById('sectionPreview');
+        if (!preview) return;
+
+        preview.dataset.section = section;
+        preview.innerHTML = html;
+        preview.scrollTop = preview.scrollHeight;
+    }
+
     onComplete(strategyId) {
         this.cleanup();
 
@@ -772,6 +803,11 @@ class StrategyNotificationManager {
             clearInterval(this.autoCheckInterval);
             this.autoCheckInterval = null;
         }
+        this.sectionHtml = {};
+        const preview = document.getElementById('sectionPreview');
+        if (preview) {
+            preview.innerHTML = '';
+        }
     }
 }
 